@@ -0,0 +1,116 @@
+import anyio.to_thread
+from fastapi import APIRouter, Response
+
+from app.core import metrics
+from app.core.archive import archiver
+from app.core.broker import broker
+from app.core.cache import cache
+from app.core.ingest import message_writer
+from app.core.ratelimit import rate_limiter
+from app.core.scheduler import lifecycle_scheduler
+from app.core.search import search_engine
+from app.core.security import hashing_pool
+
+router = APIRouter(tags=["metrics"])
+
+
+def _cache_stats():
+    stats = cache.stats()
+    # RedisCache reports its per-worker tier under "local"
+    stats = stats.get("local", stats)
+    for key in ("hits", "misses", "evictions", "expirations", "entries", "bytes"):
+        if key in stats:
+            yield f"cache_{key}", f"Cache {key} in this worker", {}, stats[key]
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    if lookups:
+        yield "cache_hit_ratio", "Cache hits / lookups since start", {}, stats["hits"] / lookups
+    for key, value in cache.load_stats().items():
+        yield f"cache_{key}", f"Cache read-through {key.replace('_', ' ')}", {}, value
+
+
+def _threadpool_stats():
+    # sync dependencies/routes still run on anyio's shared threadpool
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    yield "threadpool_busy_threads", "Threadpool tokens in use", {}, limiter.borrowed_tokens
+    yield "threadpool_total_threads", "Threadpool size", {}, limiter.total_tokens
+    yield "threadpool_waiting_tasks", "Tasks waiting for a thread", {}, limiter.statistics().tasks_waiting
+
+
+def _hashing_stats():
+    stats = hashing_pool.stats()
+    yield "password_hash_in_flight", "Argon2 jobs running or queued", {}, stats["in_flight"]
+    yield "password_hash_capacity", "Argon2 jobs accepted before shedding", {}, stats["capacity"]
+    yield "password_hash_rejected", "Argon2 jobs shed with 429", {}, stats["rejected"]
+
+
+def _ingest_stats():
+    stats = message_writer.stats()
+    yield "message_ingest_queue_depth", "Messages waiting for a group commit", {}, stats["queue_depth"]
+    yield "message_ingest_flushes", "Group commits since start", {}, stats["flushes"]
+    yield "message_ingest_failed_docs", "Messages whose group commit failed", {}, stats["failed_docs"]
+    yield "message_ingest_flush_seconds_max", "Slowest group commit", {}, stats["flush_seconds_max"]
+    if stats["flushes"]:
+        yield (
+            "message_ingest_flush_seconds_avg",
+            "Mean group commit latency",
+            {},
+            stats["flush_seconds_total"] / stats["flushes"],
+        )
+
+
+def _broker_stats():
+    yield (
+        "live_message_subscribers",
+        "Websocket subscribers in this worker",
+        {},
+        sum(len(s) for s in broker.subscribers.values()),
+    )
+
+
+def _search_stats():
+    # only the in-process engine has state worth reporting
+    stats = search_engine.stats()
+    if stats:
+        yield "search_index_documents", "Messages in this worker's search index", {}, stats["documents"]
+        yield "search_index_terms", "Distinct terms in this worker's search index", {}, stats["terms"]
+
+
+def _scheduler_stats():
+    stats = lifecycle_scheduler.stats()
+    yield "lifecycle_transitions_queued", "Status transitions due within the horizon", {}, stats["queued"]
+    yield "lifecycle_transitions_applied", "Status transitions applied by this worker", {}, stats["transitioned"]
+
+
+def _archive_stats():
+    stats = archiver.stats()
+    yield "archive_pending_interviews", "Interviews waiting for message archival", {}, stats["pending"]
+    yield "archive_messages_archived", "Messages packed into buckets by this worker", {}, stats["messages_archived"]
+    yield "archive_buckets_written", "Message buckets written by this worker", {}, stats["buckets_written"]
+
+
+def _ratelimit_stats():
+    stats = rate_limiter.stats()
+    yield "rate_limit_allowed", "Rate limited requests let through", {}, stats["allowed"]
+    yield "rate_limit_rejected", "Requests answered 429 by the rate limiter", {}, stats["limited"]
+    yield "rate_limit_errors", "Rate limit checks that failed open", {}, stats["errors"]
+    if "keys" in stats:
+        yield "rate_limit_buckets", "Token buckets held by this worker", {}, stats["keys"]
+
+
+for collect in (
+    _cache_stats,
+    _threadpool_stats,
+    _hashing_stats,
+    _ingest_stats,
+    _broker_stats,
+    _search_stats,
+    _scheduler_stats,
+    _archive_stats,
+    _ratelimit_stats,
+):
+    metrics.gauges.register(collect)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,15 +1,26 @@
-from fastapi import HTTPException, APIRouter, status
+from fastapi import HTTPException, APIRouter, Depends, status
+from pymongo.errors import DuplicateKeyError
 from app.schemas.auth import RegisterRequest, TokenResponse, LoginRequest
 from app.db.mongo import db
 from app.models.user import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import (
+    hash_password_async,
+    verify_and_update_password_async,
+    create_access_token,
+)
 from app.core.errors import api_error
+from app.core.auth_dependencies import invalidate_principal
+from app.core.ratelimit import rate_limit
 
 router = APIRouter(prefix="/v1/auth", tags= ["auth"])
 
-@router.post("/register", status_code= status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("auth_register", "ip"))],
+)
 async def register(payload: RegisterRequest):
-    if db.user.find_one({"email": payload.email}):
+    if await db.users.find_one({"email": payload.email}):
         api_error(
             status_code=401,
             code="AUTH_INVALID_CREDENTIALS",
@@ -18,30 +29,51 @@ async def register(payload: RegisterRequest):
 
     user = User(
         email = payload.email,
-        hashed_password=hash_password(payload.password),
+        hashed_password=await hash_password_async(payload.password),
         role = payload.role
     )
 
-    db.users.insert_one(user.to_dict())
+    try:
+        await db.users.insert_one(user.to_dict())
+    except DuplicateKeyError:
+        # lost a race with a concurrent register (unique users.email)
+        api_error(
+            status_code=401,
+            code="AUTH_INVALID_CREDENTIALS",
+            message="Invalid credentials"
+        )
+    await invalidate_principal(user.email)
     return {"message": "User registered successfully"}
 
-@router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest):
-    user = db.users.find_one({"email": payload.email})
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("auth_login", "ip"))],
+)
+async def login(payload: LoginRequest):
+    user = await db.users.find_one({"email": payload.email})
     if not user:
-        print("USER NOT FOUND")
         api_error(
             status_code=401,
             code="AUTH_INVALID_CREDENTIALS",
             message="Invalid credentials"
         )
-    result = verify_password(payload.password, user["hashed_password"])
+    result, new_hash = await verify_and_update_password_async(
+        payload.password, user["hashed_password"]
+    )
     if not result:
         api_error(
             status_code=401,
             code="AUTH_INVALID_CREDENTIALS",
             message="Invalid credentials"
         )
+    # argon2 settings changed since this hash was made; the hash is not
+    # part of the cached principal, so nothing to invalidate
+    if new_hash:
+        await db.users.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"hashed_password": new_hash}}
+        )
     token = create_access_token({
         "sub": user["email"],
         "role": user["role"],
@@ -1,26 +1,34 @@
 from fastapi import Depends, APIRouter, status, HTTPException, Query
 from datetime import datetime, timezone
-from bson import ObjectId
-from bson.errors import InvalidId
 
 from app.schemas.interview import (
+    INTERVIEW_FIELDS,
+    interview_out,
     InterviewOut,
+    InterviewPage,
+    InterviewStats,
     InterviewCreate,
     InterviewStatusUpdate
 )
 from app.core.permissions import require_roles
 from app.core.auth_dependencies import get_current_user
-from app.core.authorization import require_interview_access
-from app.core.interview_lifecycle import is_valid_transition
+from app.core.authorization import resolve_interview_access, has_cached_access
+from app.core.interview_lifecycle import TERMINAL_STATUSES, is_valid_transition
 from app.core.errors import api_error
+from app.core.pagination import keyset_filter, keyset_sort, next_cursor
+from app.core.archive import archiver
 from app.core.cache import cache
+from app.core.config import settings
+from app.core.serialization import dumps, raw_json
+from app.core.scheduler import lifecycle_scheduler
+from app.core.stats import read_stats, record_interview_created, record_status_change
 from app.db.mongo import db
 
 router = APIRouter(prefix="/v1/interviews", tags=["interviews"])
 
 # CREATE INTERVIEW (WRITE → invalidate cache)
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=InterviewOut)
-def create_interview(
+async def create_interview(
     payload: InterviewCreate,
     current_user=Depends(require_roles("admin"))
 ):
@@ -33,10 +41,12 @@ def create_interview(
         "created_at": datetime.now(timezone.utc),
     }
 
-    result = db.interviews.insert_one(doc)
+    result = await db.interviews.insert_one(doc)
+    await record_interview_created(doc)
+    lifecycle_scheduler.push(str(result.inserted_id), doc["status"], doc["scheduled_at"])
 
     # invalidate interview list cache
-    cache.invalidate_prefix("interviews:")
+    await cache.invalidate_namespace("interviews")
 
     return {
         "id": str(result.inserted_id),
@@ -48,124 +58,151 @@ def create_interview(
         "created_at": doc["created_at"],
     }
 
-# LIST INTERVIEWS (READ → cached)
-@router.get("", response_model=list[InterviewOut])
-def list_interviews(
-    current_user=Depends(require_roles("admin")),
-    limit: int = Query(20, ge=1, le=50),
-    offset: int = Query(0, ge=0),
+def interview_page_key(
+    limit, offset, cursor, status, interview_type, scheduled_from, scheduled_to
+) -> str:
+    return (
+        f"interviews:{limit}:{offset}:{cursor}:{status}:{interview_type}"
+        f":{scheduled_from}:{scheduled_to}"
+    )
+
+
+async def load_interview_page(
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
     status: str | None = None,
     interview_type: str | None = None,
-):
-    cache_key = f"interviews:{limit}:{offset}:{status}:{interview_type}"
-
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
+    scheduled_from: datetime | None = None,
+    scheduled_to: datetime | None = None,
+) -> bytes:
+    # a scheduled_at window lists soonest first (status_scheduled_at_id,
+    # or scheduled_at_id without status), everything else newest created first
+    if scheduled_from or scheduled_to:
+        field, direction = "scheduled_at", 1
+    else:
+        field, direction = "created_at", -1
 
     query = {}
     if status:
         query["status"] = status
     if interview_type:
         query["interview_type"] = interview_type
+    if field == "scheduled_at":
+        query["scheduled_at"] = {}
+        if scheduled_from:
+            query["scheduled_at"]["$gte"] = scheduled_from
+        if scheduled_to:
+            query["scheduled_at"]["$lt"] = scheduled_to
+    if cursor:
+        keyset = keyset_filter(cursor, direction, field)
+        # the window already bounds scheduled_at: keep both ranges
+        query = {"$and": [query, keyset]} if field in query else {**query, **keyset}
+
+    docs = await (
+        db.interviews
+        .find(query, INTERVIEW_FIELDS)
+        .sort(keyset_sort(direction, field))
+        .skip(offset)
+        .limit(limit + 1)
+    ).to_list(length=limit + 1)
+
+    return dumps({
+        "items": [interview_out(doc) for doc in docs[:limit]],
+        "next_cursor": next_cursor(docs, limit, field),
+    })
+
 
-    result = [
-        {
-            "id": str(doc["_id"]),
-            "title": doc["title"],
-            "interview_type": doc["interview_type"],
-            "status": doc["status"],
-            "scheduled_at": doc.get("scheduled_at"),
-            "created_by": doc["created_by"],
-            "created_at": doc["created_at"],
-        }
-        for doc in (
+async def warm_interview_cache(limit: int) -> int:
+    """
+    Fill the cache with what is read first after a deploy: the default
+    listing page and the ongoing / soonest scheduled interviews. Returns
+    the number of entries written.
+    """
+    default_page = (20, 0, None, None, None, None, None)
+    await cache.put(interview_page_key(*default_page), await load_interview_page(*default_page))
+
+    warmed = 0
+    for status in ("ongoing", "scheduled"):
+        if warmed >= limit:
+            break
+        cursor = (
             db.interviews
-            .find(query)
-            .sort("created_at", -1)
-            .skip(offset)
-            .limit(limit)
+            .find({"status": status, "scheduled_at": {"$ne": None}}, INTERVIEW_FIELDS)
+            .sort([("scheduled_at", 1), ("_id", 1)])
+            .limit(limit - warmed)
         )
-    ]
+        async for doc in cursor:
+            await cache.put(f"interview:{doc['_id']}", dumps(interview_out(doc)))
+            warmed += 1
+    return warmed + 1
+
+
+# LIST INTERVIEWS (READ → cached)
+@router.get("", response_model=InterviewPage)
+async def list_interviews(
+    current_user=Depends(require_roles("admin")),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    status: str | None = None,
+    interview_type: str | None = None,
+    scheduled_from: datetime | None = None,
+    scheduled_to: datetime | None = None,
+):
+    # cursor (next_cursor of the previous page) wins over offset
+    if cursor:
+        offset = 0
+    page = (limit, offset, cursor, status, interview_type, scheduled_from, scheduled_to)
+
+    # cached as serialized JSON: a hit is sent as is, no re-validation;
+    # concurrent misses share one query
+    return raw_json(await cache.get_or_load(
+        interview_page_key(*page), lambda: load_interview_page(*page)
+    ))
+# DASHBOARD STATS (READ → precomputed counters)
+@router.get("/stats", response_model=InterviewStats)
+async def interview_stats(
+    current_user=Depends(require_roles("admin")),
+    top: int = Query(10, ge=0, le=100),
+):
+    return await read_stats(top)
+
 
-    cache.set(cache_key, result, ttl=60)
-    return result
 # GET SINGLE INTERVIEW (READ → cached)
 @router.get("/{interview_id}", response_model=InterviewOut)
-def get_interview(
+async def get_interview(
     interview_id: str,
     current_user=Depends(get_current_user)
 ):
     cache_key = f"interview:{interview_id}"
 
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-
-    try:
-        obj_id = ObjectId(interview_id)
-    except InvalidId:
-        api_error(
-            status_code=400,
-            code="INTERVIEW_INVALID_ID",
-            message="Invalid interview ID"
+    async def load() -> bytes:
+        interview = await resolve_interview_access(
+            interview_id, current_user, INTERVIEW_FIELDS
         )
+        return dumps(interview_out(interview))
 
-    interview = db.interviews.find_one({"_id": obj_id})
-    if not interview:
-        api_error(
-            status_code=404,
-            code="INTERVIEW_NOT_FOUND",
-            message="Interview not found"
-        )
-
-    require_interview_access(
-        interview_id=interview_id,
-        user_email=current_user["email"],
-        user_role=current_user["role"]
-    )
-
-    result = {
-        "id": str(interview["_id"]),
-        "title": interview["title"],
-        "interview_type": interview["interview_type"],
-        "status": interview["status"],
-        "scheduled_at": interview.get("scheduled_at"),
-        "created_by": interview["created_by"],
-        "created_at": interview["created_at"],
-    }
+    # callers with known access share the cached copy and its loads
+    if await has_cached_access(interview_id, current_user):
+        return raw_json(await cache.get_or_load(cache_key, load))
 
-    cache.set(cache_key, result, ttl=60)
-    return result
+    # access unknown: check it on this read, never by joining another
+    # caller's load
+    body = await load()
+    await cache.put(cache_key, body)
+    return raw_json(body)
 # UPDATE INTERVIEW STATUS (WRITE → invalidate cache)
 @router.patch("/{interview_id}/status")
-def update_interview_status(
+async def update_interview_status(
     interview_id: str,
     payload: InterviewStatusUpdate,
     current_user=Depends(get_current_user)
 ):
-    try:
-        obj_id = ObjectId(interview_id)
-    except InvalidId:
-        api_error(
-            status_code=400,
-            code="INTERVIEW_INVALID_ID",
-            message="Invalid interview ID"
-        )
-
-    interview = db.interviews.find_one({"_id": obj_id})
-    if not interview:
-        api_error(
-            status_code=404,
-            code="INTERVIEW_NOT_FOUND",
-            message="Interview not found"
-        )
-
-    require_interview_access(
-        interview_id=interview_id,
-        user_email=current_user["email"],
-        user_role=current_user["role"]
+    interview = await resolve_interview_access(
+        interview_id, current_user, {"status": 1, "scheduled_at": 1}
     )
+    obj_id = interview["_id"]
 
     current_status = interview["status"]
     new_status = payload.status
@@ -198,13 +235,26 @@ def update_interview_status(
                 message="Interviewers can only complete interviews"
             )
 
-    db.interviews.update_one(
-        {"_id": obj_id},
+    # conditional on the status checked above, so two racing transitions
+    # can't both apply (or both be counted)
+    result = await db.interviews.update_one(
+        {"_id": obj_id, "status": current_status},
         {"$set": {"status": new_status}}
     )
+    if not result.modified_count:
+        api_error(
+            status_code=409,
+            code="INTERVIEW_STATUS_CONFLICT",
+            message="Interview status changed concurrently, retry"
+        )
+    await record_status_change(current_status, new_status)
+    lifecycle_scheduler.push(interview_id, new_status, interview.get("scheduled_at"))
+    if new_status in TERMINAL_STATUSES and settings.ARCHIVE_ON_TERMINAL:
+        archiver.schedule(db, interview_id)
+
     # invalidate caches
-    cache.invalidate_prefix("interviews:")
-    cache.invalidate_prefix(f"interview:{interview_id}")
+    await cache.invalidate_namespace("interviews")
+    await cache.delete(f"interview:{interview_id}")
 
     return {
         "message": f"Interview status changed from {current_status} to {new_status}"
@@ -1,78 +1,322 @@
-from fastapi import APIRouter, status, HTTPException, Depends, Query
-from app.schemas.message import MessageOut, MessageCreate
-from app.core.auth_dependencies import get_current_user
-from bson import ObjectId
-from bson.errors import InvalidId
+import asyncio
+import logging
+import zlib
+from contextlib import aclosing
+from fastapi import APIRouter, status, HTTPException, Depends, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.schemas.message import (
+    MessageOut,
+    MessagePage,
+    MessageCreate,
+    MessageBatchCreate,
+    MessageSearchResults,
+)
+from app.core.archive import iter_messages
+from app.core.auth_dependencies import get_current_user, authenticate_token
+from app.core.broker import broker
+from app.core.ingest import insert_messages
+from app.core.errors import api_error
 from app.db.mongo import db
-from app.core.authorization import require_interview_access
+from app.core.authorization import resolve_interview_access
+from app.core.pagination import keyset_filter, keyset_sort, next_cursor
+from app.core.ratelimit import rate_limit
+from app.core.config import settings
+from app.core.serialization import dumps, raw_json
+from app.core.search import search_engine
 from datetime import datetime, timezone
 router = APIRouter(
     prefix="/v1/interviews/{interview_id}/messages",
     tags=["messages"]
 )
 
+logger = logging.getLogger(__name__)
+
 
-@router.post("", status_code=status.HTTP_200_OK, response_model=MessageOut)
-def create_message(
+@router.post(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=MessageOut,
+    dependencies=[Depends(rate_limit("create_messages", "user", "interview"))],
+)
+async def create_message(
     interview_id: str,
     payload: MessageCreate,
     current_user=Depends(get_current_user)
 ):
-    try:
-        obj_id = ObjectId(interview_id)
-    except InvalidId:
-        raise HTTPException(status_code=400, detail= "Invalid interview ID")
-
-    interview = db.interviews.find_one({"_id": obj_id})
-    if not interview:
-        raise HTTPException(status_code = 404, detail= "Interview Not Found")
-
-    require_interview_access(
-        interview_id=interview_id,
-        user_email=current_user["email"],
-        user_role=current_user["role"]
+    await resolve_interview_access(interview_id, current_user)
+
+    doc = _message_doc(interview_id, current_user, payload.content)
+    await insert_messages([doc])
+    search_engine.index([doc])
+
+    await _publish(doc)
+    return doc
+
+
+async def _batch_cost(request: Request) -> int:
+    # one token per message; the limit is checked before the body is
+    # validated, so a malformed one costs a single token and an oversized
+    # one no more than the largest batch, then fail with 422/400
+    body = await request.json()
+    messages = body.get("messages") if isinstance(body, dict) else None
+    if not isinstance(messages, list):
+        return 1
+    return min(max(len(messages), 1), settings.MESSAGE_BATCH_MAX_SIZE)
+
+
+# Create several messages in one request
+@router.post(
+    ":batch",
+    status_code=status.HTTP_200_OK,
+    response_model=list[MessageOut],
+    dependencies=[Depends(rate_limit(
+        "create_messages", "user", "interview", cost=_batch_cost
+    ))],
+)
+async def create_messages_batch(
+    interview_id: str,
+    payload: MessageBatchCreate,
+    current_user=Depends(get_current_user)
+):
+    if len(payload.messages) > settings.MESSAGE_BATCH_MAX_SIZE:
+        api_error(
+            status_code=400,
+            code="MESSAGE_BATCH_TOO_LARGE",
+            message=f"At most {settings.MESSAGE_BATCH_MAX_SIZE} messages per batch"
         )
 
-    doc = {
+    await resolve_interview_access(interview_id, current_user)
+
+    docs = [
+        _message_doc(interview_id, current_user, message.content)
+        for message in payload.messages
+    ]
+    await insert_messages(docs)
+    search_engine.index(docs)
+
+    for doc in docs:
+        await _publish(doc)
+    return docs
+
+
+def _message_doc(interview_id: str, current_user: dict, content: str) -> dict:
+    return {
         "interview_id": interview_id,
         "sender_email": current_user["email"],
         "sender_role": current_user["role"],
-        "content": payload.content,
+        "content": content,
         "created_at": datetime.now(timezone.utc),
     }
-    db.message.insert_one(doc)
-    return doc
+
+
+async def _publish(doc: dict):
+    # the message is already committed: a failed fan-out must not answer
+    # 500 and have the client retry it into a duplicate; live subscribers
+    # miss it and catch up through list_message
+    try:
+        await broker.publish(doc["interview_id"], {
+            "interview_id": doc["interview_id"],
+            "sender_email": doc["sender_email"],
+            "sender_role": doc["sender_role"],
+            "content": doc["content"],
+            "created_at": doc["created_at"].isoformat(),
+        })
+    except Exception:
+        logger.exception("live publish failed for interview %s", doc["interview_id"])
+
+# MessageOut fields; _id only serves as the keyset tie-breaker
+MESSAGE_FIELDS = {
+    "interview_id": 1,
+    "sender_email": 1,
+    "sender_role": 1,
+    "content": 1,
+    "created_at": 1,
+}
+
 
 # Get message (paginated)
-def list_message(
+@router.get(
+    "",
+    response_model=MessagePage,
+    dependencies=[Depends(rate_limit("list_messages", "user", "interview"))],
+)
+async def list_message(
     interview_id: str,
     current_user= Depends(get_current_user),
-    limit: int = Query(20, le= 50),
-    offset: str = Query(0, ge = 0)
+    limit: int = Query(20, ge=1, le= 50),
+    offset: int = Query(0, ge = 0),
+    cursor: str | None = None,
 ):
-    try:
-        obj_id = ObjectId(interview_id)
-    except:
-        raise HTTPException(status_code=400, detail="Invalid interview ID")
+    interview = await resolve_interview_access(
+        interview_id, current_user, {"_id": 1, "archived_at": 1}
+    )
 
-    interview = db.interviews.find_one({"_id": obj_id})
-    if not interview:
-        raise HTTPException(status_code=404, detail="Interview Not Found")
+    # cursor (next_cursor of the previous page) wins over offset
+    if cursor:
+        offset = 0
 
+    if interview.get("archived_at"):
+        # packed into buckets, maybe partly still in messages
+        docs = []
+        async with aclosing(iter_messages(db, interview_id, cursor, limit + 1)) as messages:
+            async for doc in messages:
+                if offset:
+                    offset -= 1
+                    continue
+                docs.append(doc)
+                if len(docs) > limit:
+                    break
+    else:
+        query = {"interview_id": interview_id}
+        if cursor:
+            query.update(keyset_filter(cursor, 1))
+        docs = await (
+            db.messages
+            .find(query, MESSAGE_FIELDS)
+            .sort(keyset_sort(1))
+            .skip(offset)
+            .limit(limit + 1)
+        ).to_list(length=limit + 1)
+
+    page = {"items": docs[:limit], "next_cursor": next_cursor(docs, limit)}
+    for doc in page["items"]:
+        del doc["_id"]
+    # built from stored messages in MessageOut's shape: skip re-validation
+    return raw_json(dumps(page))
+
+
+# Ranked full-text search within one interview
+@router.get(
+    "/search",
+    response_model=MessageSearchResults,
+    dependencies=[Depends(rate_limit("search_messages", "user"))],
+)
+async def search_messages(
+    interview_id: str,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    current_user=Depends(get_current_user),
+):
+    await resolve_interview_access(interview_id, current_user, {"_id": 1})
+    items = await search_engine.search(q, interview_id=interview_id, limit=limit)
+    return raw_json(dumps({"items": items}))
+
+
+EXPORT_FIELDS = {
+    "_id": 0,
+    "interview_id": 1,
+    "sender_email": 1,
+    "sender_role": 1,
+    "content": 1,
+    "created_at": 1,
+}
+
+
+async def _export_chunks(interview_id: str, compress: bool, archived: bool = False):
+    # one chunk per driver batch: memory is bounded by the batch size, not
+    # by the transcript length, and the first bytes go out after one batch
+    batch_size = settings.MESSAGE_EXPORT_BATCH_SIZE
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    if archived:
+        # one bucket decoded at a time
+        cursor = iter_messages(db, interview_id, batch_size=batch_size)
+    else:
+        cursor = (
+            db.messages
+            .find({"interview_id": interview_id}, EXPORT_FIELDS)
+            .sort(keyset_sort(1))
+            .batch_size(batch_size)
+        )
+    lines = []
+    async for doc in cursor:
+        doc.pop("_id", None)
+        # same encoder as the JSON routes: created_at comes out UTC with "Z"
+        lines.append(dumps(doc))
+        if len(lines) >= batch_size:
+            chunk = b"\n".join(lines) + b"\n"
+            lines = []
+            yield compressor.compress(chunk) if compressor else chunk
+
+    chunk = b"\n".join(lines) + b"\n" if lines else b""
+    if compressor:
+        yield compressor.compress(chunk) + compressor.flush()
+    elif chunk:
+        yield chunk
 
-    require_interview_access(
-        interview_id=interview_id,
-        user_email=current_user["email"],
-        user_role=current_user["role"]
-    )
 
-    cursor = (
-        db.messages
-        .find({"interview_id": interview_id})
-        .sort("created_at", 1)
-        .skip(offset)
-        .limit(limit)
+# Export full transcript (streamed NDJSON)
+@router.get(
+    "/export",
+    dependencies=[Depends(rate_limit("export_messages", "user", "interview"))],
+)
+async def export_messages(
+    interview_id: str,
+    current_user=Depends(get_current_user),
+    gzip: bool = False,
+):
+    interview = await resolve_interview_access(interview_id, current_user)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{interview_id}-messages.ndjson"'
+    }
+    # transport compression: clients that decode gzip see plain NDJSON
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        _export_chunks(interview_id, gzip, interview.get("archived_at") is not None),
+        media_type="application/x-ndjson",
+        headers=headers,
     )
 
-    return list(cursor)
 
+# Live messages (websocket)
+@router.websocket("/stream")
+async def stream_messages(websocket: WebSocket, interview_id: str):
+    # browsers can't set headers on websockets, so ?token= is accepted too
+    token = websocket.query_params.get("token")
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+
+    # authorize once, with the same rules as the HTTP endpoints
+    try:
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        current_user = await authenticate_token(token)
+        await resolve_interview_access(interview_id, current_user)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = broker.subscribe(interview_id)
+
+    # the channel is push-only; reading just tells us when the client leaves
+    async def watch_disconnect():
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.interrupt()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while True:
+            message = await subscription.get()
+            if message is None:
+                break
+            await websocket.send_json(message)
+
+        if subscription.overflowed:
+            # fell too far behind; the client resumes via list_message
+            await websocket.close(
+                code=status.WS_1013_TRY_AGAIN_LATER,
+                reason="Subscriber too slow",
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        subscription.close()
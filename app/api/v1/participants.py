@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from datetime import datetime, timezone
 from bson import ObjectId
 from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
 
+from app.core.membership import membership
 from app.db.mongo import db
-from app.schemas.participant import ParticipantCreate, ParticipantOut
+from app.schemas.participant import (
+    ParticipantBulkCreate,
+    ParticipantBulkOut,
+    ParticipantCreate,
+    ParticipantOut,
+)
 from app.core.permissions import require_roles
 
 router = APIRouter(
@@ -12,17 +21,12 @@ router = APIRouter(
     tags=["participants"]
 )
 
+logger = logging.getLogger(__name__)
 
-@router.post(
-    "",
-    status_code=status.HTTP_201_CREATED,
-    response_model=ParticipantOut
-)
-def add_participant(
-    interview_id: str,
-    payload: ParticipantCreate,
-    current_user=Depends(require_roles("admin"))
-):
+DUPLICATE_KEY = 11000
+
+
+async def _ensure_interview(interview_id: str):
     # Validate interview_id format
     try:
         interview_obj_id = ObjectId(interview_id)
@@ -33,15 +37,37 @@ def add_participant(
         )
 
     # Ensure interview exists
-    interview = db.interviews.find_one({"_id": interview_obj_id})
+    interview = await db.interviews.find_one({"_id": interview_obj_id}, {"_id": 1})
     if not interview:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Interview not found"
         )
 
+
+def _participant_doc(interview_id: str, payload: ParticipantCreate) -> dict:
+    return {
+        "interview_id": interview_id,
+        "user_email": payload.user_email,
+        "participant_role": payload.participant_role,
+        "added_at": datetime.now(timezone.utc),
+    }
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ParticipantOut
+)
+async def add_participant(
+    interview_id: str,
+    payload: ParticipantCreate,
+    current_user=Depends(require_roles("admin"))
+):
+    await _ensure_interview(interview_id)
+
     # Prevent duplicate participant
-    existing = db.participants.find_one({
+    existing = await db.participants.find_one({
         "interview_id": interview_id,
         "user_email": payload.user_email
     })
@@ -52,12 +78,69 @@ def add_participant(
         )
 
     # Create participant
-    doc = {
-        "interview_id": interview_id,
-        "user_email": payload.user_email,
-        "participant_role": payload.participant_role,
-        "added_at": datetime.now(timezone.utc),
-    }
+    doc = _participant_doc(interview_id, payload)
 
-    db.participants.insert_one(doc)
+    await db.participants.insert_one(doc)
+    await membership.add(payload.user_email, interview_id)
     return doc
+
+
+# Add a whole panel in one request
+@router.post(
+    ":bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=ParticipantBulkOut,
+    responses={207: {
+        "model": ParticipantBulkOut,
+        "description": "Some rows failed; `added` were written all the same",
+    }},
+)
+async def add_participants_bulk(
+    interview_id: str,
+    payload: ParticipantBulkCreate,
+    response: Response,
+    current_user=Depends(require_roles("admin"))
+):
+    await _ensure_interview(interview_id)
+
+    docs = []
+    duplicates = []
+    seen = set()
+    for participant in payload.participants:
+        if participant.user_email in seen:
+            duplicates.append(participant.user_email)
+            continue
+        seen.add(participant.user_email)
+        docs.append(_participant_doc(interview_id, participant))
+
+    # the unique (interview_id, user_email) index rejects existing
+    # participants; unordered, so every other row is still inserted
+    rejected = set()
+    failed = set()
+    try:
+        await db.participants.insert_many(docs, ordered=False)
+    except BulkWriteError as exc:
+        for error in exc.details["writeErrors"]:
+            (rejected if error["code"] == DUPLICATE_KEY else failed).add(error["index"])
+        if failed:
+            logger.error(
+                "bulk participant insert for %s: %d inserted, %d failed: %s",
+                interview_id, exc.details["nInserted"], len(failed),
+                [e["errmsg"] for e in exc.details["writeErrors"] if e["index"] in failed],
+            )
+
+    added = [doc for n, doc in enumerate(docs) if n not in rejected and n not in failed]
+    duplicates.extend(docs[n]["user_email"] for n in sorted(rejected))
+
+    # access grants are only ever cached positively, so nothing to evict;
+    # membership sets learn about the whole panel at once, including when
+    # some rows failed
+    await membership.add_many(interview_id, [doc["user_email"] for doc in added])
+
+    if failed:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    return {
+        "added": added,
+        "duplicates": duplicates,
+        "failed": [docs[n]["user_email"] for n in sorted(failed)],
+    }
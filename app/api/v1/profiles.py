@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.core.permissions import require_roles
+from app.core.profiling import profile_store
+from app.core.errors import api_error
+
+router = APIRouter(prefix="/v1/admin/profiles", tags=["profiling"])
+
+
+@router.get("")
+async def list_profiles(current_user=Depends(require_roles("admin"))):
+    return profile_store.list()
+
+
+# collapsed stacks, feed to flamegraph.pl or speedscope
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+async def download_profile(
+    profile_id: int,
+    current_user=Depends(require_roles("admin"))
+):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        api_error(
+            status_code=404,
+            code="PROFILE_NOT_FOUND",
+            message="Profile not found"
+        )
+
+    return PlainTextResponse(
+        profile["collapsed"],
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'
+        },
+    )
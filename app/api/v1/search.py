@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.permissions import require_roles
+from app.core.ratelimit import rate_limit
+from app.core.search import search_engine
+from app.core.serialization import dumps, raw_json
+from app.schemas.message import MessageSearchResults
+
+router = APIRouter(prefix="/v1/messages", tags=["messages"])
+
+
+# Ranked full-text search across every interview (admin only)
+@router.get(
+    "/search",
+    response_model=MessageSearchResults,
+    dependencies=[Depends(rate_limit("search_messages", "user"))],
+)
+async def search_all_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    current_user=Depends(require_roles("admin")),
+):
+    items = await search_engine.search(q, limit=limit)
+    return raw_json(dumps({"items": items}))
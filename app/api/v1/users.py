@@ -1,13 +1,74 @@
-from fastapi import APIRouter, Depends
-from app.core.auth_dependencies import get_current_user
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.auth_dependencies import get_current_user, PRINCIPAL_FIELDS
+from app.core.membership import membership
+from app.core.pagination import decode_id_cursor, encode_id_cursor
+from app.core.serialization import dumps, raw_json
+from app.db.mongo import db
+from app.schemas.interview import INTERVIEW_FIELDS, InterviewPage, interview_out
 from app.schemas.user import UserResponse
 
 router = APIRouter(prefix="/v1/users", tags=["users"])
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user=Depends(get_current_user)):
+async def get_me(current_user=Depends(get_current_user)):
+    # principals built from token claims don't carry created_at
+    if "created_at" not in current_user:
+        current_user = await db.users.find_one(
+            {"email": current_user["email"]}, PRINCIPAL_FIELDS
+        )
+        if not current_user:
+            raise HTTPException(status_code=401, detail="User not found")
     return {
         "email": current_user["email"],
         "role": current_user["role"],
         "created_at": current_user["created_at"],
     }
+
+
+# Interviews the caller participates in, newest first (paginated)
+@router.get("/me/interviews", response_model=InterviewPage)
+async def my_interviews(
+    current_user=Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: str | None = None,
+    status: str | None = None,
+):
+    email = current_user["email"]
+
+    async def load():
+        # covered by the (user_email, interview_id) index
+        return [
+            doc["interview_id"]
+            async for doc in db.participants.find(
+                {"user_email": email}, {"_id": 0, "interview_id": 1}
+            )
+        ]
+
+    interview_ids = await membership.interview_ids(email, load)
+
+    # newest first by _id, which grows with insert time: the $in point
+    # lookups on the _id index come back in that order, so no in-memory
+    # sort of every membership for each page
+    ids = [ObjectId(i) for i in interview_ids]
+    if cursor:
+        after = decode_id_cursor(cursor)
+        ids = [obj_id for obj_id in ids if obj_id < after]
+    if not ids:
+        return raw_json(dumps({"items": [], "next_cursor": None}))
+
+    query = {"_id": {"$in": ids}}
+    if status:
+        query["status"] = status
+
+    docs = await (
+        db.interviews
+        .find(query, INTERVIEW_FIELDS)
+        .sort("_id", -1)
+        .limit(limit + 1)
+    ).to_list(length=limit + 1)
+
+    return raw_json(dumps({
+        "items": [interview_out(doc) for doc in docs[:limit]],
+        "next_cursor": encode_id_cursor(docs[limit - 1]["_id"]) if len(docs) > limit else None,
+    }))
@@ -0,0 +1,344 @@
+"""
+Archival of finished interviews' messages into compressed buckets.
+
+Once an interview is completed or cancelled its messages never change, so
+they don't need a document (and index entries) each:
+
+    message_buckets  {interview_id, seq, count, codec, data, terms,
+                      first_created_at, last_created_at, last_id}
+
+`data` holds up to ARCHIVE_BUCKET_MESSAGES messages in (created_at, _id)
+order as one BSON document, compressed with ARCHIVE_CODEC ("zlib", or
+"zstd" with the zstandard package). Buckets of an interview never
+overlap: a run only packs messages that sort after its last bucket, and
+anything older that shows up late simply stays in messages.
+
+Interviews get `archived_at` before the first bucket is written; readers
+(iter_messages) then merge buckets with whatever is still in messages, so
+a listing is complete at every step of a run. A run inserts a bucket
+before deleting its originals; the next run deletes what a crashed one
+left behind.
+
+    python -m app.core.archive              # archive every finished interview
+    python -m app.core.archive --limit 100
+    python -m app.core.archive --terms      # backfill terms in older buckets
+
+With ARCHIVE_ON_TERMINAL, status changes to completed/cancelled (PATCH or
+the lifecycle scheduler) archive in the background after
+ARCHIVE_DELAY_SECONDS. Archived messages stay searchable: `terms` holds
+a bucket's distinct words under its own text index,
+and both search engines unpack the buckets they hit.
+"""
+import argparse
+import asyncio
+import logging
+import zlib
+from datetime import datetime, timezone
+
+import bson
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings, singleton
+from app.core.interview_lifecycle import TERMINAL_STATUSES
+from app.core.pagination import decode_cursor, keyset_filter, keyset_sort
+from app.core.search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# what a packed message keeps; interview_id is the bucket's
+PACKED_FIELDS = ("sender_email", "sender_role", "content", "created_at")
+MESSAGE_FIELDS = ("interview_id",) + PACKED_FIELDS
+
+
+def _zstd():
+    import zstandard
+
+    return zstandard
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=10).compress(data)
+    raise ValueError(f"Unknown ARCHIVE_CODEC: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        return _zstd().ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def unpack(bucket: dict) -> list[dict]:
+    """The bucket's messages, shaped like documents read from messages."""
+    interview_id = bucket["interview_id"]
+    return [
+        {"interview_id": interview_id, **message}
+        for message in bson.decode(decompress(bucket["data"], bucket["codec"]))["m"]
+    ]
+
+
+def bucket_terms(messages: list[dict]) -> str:
+    # what Mongo text-indexes instead of every message's content
+    return " ".join(sorted({term for m in messages for term in tokenize(m["content"])}))
+
+
+def _key(doc: dict) -> tuple:
+    return doc["created_at"], doc["_id"]
+
+
+async def _merge(first, second):
+    # both sorted by (created_at, _id); a message caught between its
+    # bucket insert and its delete is in both: yield it once
+    a = await anext(first, None)
+    b = await anext(second, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and _key(a) <= _key(b)):
+            if b is not None and a["_id"] == b["_id"]:
+                b = await anext(second, None)
+            yield a
+            a = await anext(first, None)
+        else:
+            yield b
+            b = await anext(second, None)
+
+
+async def _bucketed(database, interview_id: str, cursor: str | None):
+    query = {"interview_id": interview_id}
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        # a bucket ending before the cursor has nothing left to give
+        query["last_created_at"] = {"$gte": after[0]}
+    async for bucket in database.message_buckets.find(query).sort("seq", 1):
+        for message in unpack(bucket):
+            if after is None or _key(message) > after:
+                yield message
+
+
+async def _live(database, interview_id: str, cursor: str | None, batch_size: int):
+    query = {"interview_id": interview_id}
+    if cursor:
+        query.update(keyset_filter(cursor, 1))
+    async for doc in (
+        database.messages
+        .find(query, dict.fromkeys(MESSAGE_FIELDS, 1))
+        .sort(keyset_sort(1))
+        .batch_size(batch_size)
+    ):
+        yield doc
+
+
+async def iter_messages(
+    database, interview_id: str, cursor: str | None = None, batch_size: int = 100
+):
+    """
+    An archived interview's messages after `cursor`, oldest first, from
+    its buckets and the messages collection. Documents carry _id.
+    """
+    buckets = _bucketed(database, interview_id, cursor)
+    live = _live(database, interview_id, cursor, batch_size)
+    try:
+        async for doc in _merge(buckets, live):
+            yield doc
+    finally:
+        await buckets.aclose()
+        await live.aclose()
+
+
+class MessageArchiver:
+    def __init__(
+        self,
+        bucket_messages: int = 1_000,
+        bucket_max_bytes: int = 1024 * 1024,
+        codec: str = "zlib",
+        delay_seconds: float = 0,
+    ):
+        compress(b"", codec)  # unknown codec / missing package: fail at startup
+        self.bucket_messages = bucket_messages
+        self.bucket_max_bytes = bucket_max_bytes
+        self.codec = codec
+        self.delay_seconds = delay_seconds
+        self._tasks: set[asyncio.Task] = set()
+
+        self.interviews_archived = 0
+        self.messages_archived = 0
+        self.buckets_written = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    async def archive(self, database, interview_id: str) -> int:
+        """Move one finished interview's messages into buckets. Returns how many."""
+        interview = await database.interviews.find_one(
+            {"_id": ObjectId(interview_id)}, {"status": 1}
+        )
+        if interview is None or interview["status"] not in TERMINAL_STATUSES:
+            return 0
+        # readers switch to merging buckets before any message moves
+        await database.interviews.update_one(
+            {"_id": interview["_id"], "archived_at": {"$exists": False}},
+            {"$set": {"archived_at": datetime.now(timezone.utc)}},
+        )
+
+        last = await database.message_buckets.find_one(
+            {"interview_id": interview_id}, sort=[("seq", -1)]
+        )
+        query = {"interview_id": interview_id}
+        seq = 0
+        if last is not None:
+            # a run that died between a bucket insert and its delete
+            await database.messages.delete_many(
+                {"_id": {"$in": [message["_id"] for message in unpack(last)]}}
+            )
+            # after the last bucket, as keyset_filter spells it
+            query["created_at"] = {"$gte": last["last_created_at"]}
+            query["$nor"] = [
+                {"created_at": last["last_created_at"], "_id": {"$lte": last["last_id"]}}
+            ]
+            seq = last["seq"] + 1
+
+        moved = 0
+        batch, size = [], 0
+        try:
+            async for doc in (
+                database.messages
+                .find(query, dict.fromkeys(PACKED_FIELDS, 1))
+                .sort(keyset_sort(1))
+                .batch_size(self.bucket_messages)
+            ):
+                batch.append(doc)
+                size += len(doc["content"]) + 64
+                if len(batch) >= self.bucket_messages or size >= self.bucket_max_bytes:
+                    moved += await self._write_bucket(database, interview_id, seq, batch)
+                    seq += 1
+                    batch, size = [], 0
+            if batch:
+                moved += await self._write_bucket(database, interview_id, seq, batch)
+        except DuplicateKeyError:
+            # (interview_id, seq) is unique: another run got there first
+            logger.info("interview %s is being archived elsewhere", interview_id)
+            return moved
+
+        self.interviews_archived += 1
+        return moved
+
+    async def _write_bucket(
+        self, database, interview_id: str, seq: int, messages: list[dict]
+    ) -> int:
+        raw = bson.encode({"m": messages})
+        data = compress(raw, self.codec)
+        await database.message_buckets.insert_one({
+            "interview_id": interview_id,
+            "seq": seq,
+            "count": len(messages),
+            "codec": self.codec,
+            "data": bson.Binary(data),
+            "terms": bucket_terms(messages),
+            "first_created_at": messages[0]["created_at"],
+            "last_created_at": messages[-1]["created_at"],
+            "last_id": messages[-1]["_id"],
+        })
+        # the bucket is durable before the originals go
+        await database.messages.delete_many({"_id": {"$in": [m["_id"] for m in messages]}})
+        self.buckets_written += 1
+        self.messages_archived += len(messages)
+        self.raw_bytes += len(raw)
+        self.compressed_bytes += len(data)
+        return len(messages)
+
+    async def archive_pending(self, database, limit: int | None = None) -> int:
+        """Archive finished interviews that haven't been yet. Returns how many."""
+        cursor = database.interviews.find(
+            {"status": {"$in": list(TERMINAL_STATUSES)}, "archived_at": {"$exists": False}},
+            {"_id": 1},
+        )
+        if limit:
+            cursor = cursor.limit(limit)
+        count = 0
+        async for doc in cursor:
+            await self.archive(database, str(doc["_id"]))
+            count += 1
+        return count
+
+    async def add_terms(self, database) -> int:
+        """Fill `terms` in buckets written without it. Returns how many."""
+        count = 0
+        async for bucket in database.message_buckets.find(
+            {"terms": {"$exists": False}}, {"interview_id": 1, "codec": 1, "data": 1}
+        ):
+            await database.message_buckets.update_one(
+                {"_id": bucket["_id"]}, {"$set": {"terms": bucket_terms(unpack(bucket))}}
+            )
+            count += 1
+        return count
+
+    def schedule(self, database, interview_id: str):
+        """Archive in the background, after the configured delay."""
+        task = asyncio.create_task(self._archive_later(database, interview_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _archive_later(self, database, interview_id: str):
+        # lets messages sent just before the status change land first;
+        # any that land later stay in messages and are still listed
+        await asyncio.sleep(self.delay_seconds)
+        try:
+            await self.archive(database, interview_id)
+        except Exception:
+            logger.exception("archiving interview %s failed", interview_id)
+
+    async def close(self):
+        # the batch job picks up interviews whose archival was cut short
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._tasks),
+            "interviews_archived": self.interviews_archived,
+            "messages_archived": self.messages_archived,
+            "buckets_written": self.buckets_written,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+        }
+
+
+def build_archiver() -> MessageArchiver:
+    return MessageArchiver(
+        bucket_messages=settings.ARCHIVE_BUCKET_MESSAGES,
+        bucket_max_bytes=settings.ARCHIVE_BUCKET_MAX_BYTES,
+        codec=settings.ARCHIVE_CODEC,
+        delay_seconds=settings.ARCHIVE_DELAY_SECONDS,
+    )
+
+
+archiver = singleton(build_archiver)
+
+
+async def main(args) -> int:
+    from app.db.mongo import close_client, db
+
+    try:
+        if args.terms:
+            print(f"added terms to {await archiver.add_terms(db)} buckets")
+            return 0
+        count = await archiver.archive_pending(db, args.limit)
+        print(
+            f"archived {count} interviews: {archiver.messages_archived} messages "
+            f"in {archiver.buckets_written} buckets"
+        )
+        return 0
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--terms", action="store_true")
+    asyncio.run(main(parser.parse_args()))
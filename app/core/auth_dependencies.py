@@ -2,15 +2,33 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from app.db.mongo import db
+from app.core.cache import cache
 from app.core.config import settings
 
 security = HTTPBearer()
 
-def get_current_user(
+# only what routes read from current_user; never cache the password hash
+PRINCIPAL_FIELDS = {"_id": 0, "email": 1, "role": 1, "created_at": 1}
+
+
+def principal_cache_key(email: str) -> str:
+    return f"principal:{email}"
+
+
+async def invalidate_principal(email: str):
+    # call from every write to a user's email, role or account; changes
+    # made outside the API show up after AUTH_PRINCIPAL_TTL_SECONDS
+    await cache.delete(principal_cache_key(email))
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    token = credentials.credentials
+    return await authenticate_token(credentials.credentials)
+
 
+async def authenticate_token(token: str) -> dict:
+    # shared by the bearer dependency and websocket handshakes
     try:
         payload = jwt.decode(
             token,
@@ -23,8 +41,18 @@ def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.users.find_one({"email": email})
+    # the token is signed, so its role claim can stand in for the users row
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and payload.get("role"):
+        return {"email": email, "role": payload["role"]}
+
+    cache_key = principal_cache_key(email)
+    user = await cache.get(cache_key)
+    if user:
+        return user
+
+    user = await db.users.find_one({"email": email}, PRINCIPAL_FIELDS)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    await cache.set(cache_key, user, ttl=settings.AUTH_PRINCIPAL_TTL_SECONDS)
     return user
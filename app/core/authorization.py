@@ -1,8 +1,13 @@
 from fastapi import HTTPException, status
+from bson import ObjectId
+from bson.errors import InvalidId
 from app.db.mongo import db
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.errors import api_error
 
 
-def require_interview_access(
+async def require_interview_access(
     interview_id: str,
     user_email: str,
     user_role: str
@@ -11,7 +16,7 @@ def require_interview_access(
     if user_role == "admin":
         return
 
-    participant = db.participants.find_one({
+    participant = await db.participants.find_one({
         "interview_id": interview_id,
         "user_email": user_email
     })
@@ -22,3 +27,77 @@ def require_interview_access(
             detail= "Interview Not found"
         )
 
+
+def access_cache_key(interview_id: str, user_email: str) -> str:
+    return f"access:{interview_id}:{user_email}"
+
+
+async def has_cached_access(interview_id: str, current_user: dict) -> bool:
+    # only granted access is cached; participants are never removed
+    if current_user["role"] == "admin":
+        return True
+    return await cache.get(access_cache_key(interview_id, current_user["email"])) is not None
+
+
+async def resolve_interview_access(
+    interview_id: str,
+    current_user: dict,
+    projection: dict | None = None,
+) -> dict:
+    """
+    Load an interview and check the caller may see it in one round trip.
+
+    Same rules as require_interview_access: admins see everything, anyone
+    else must be a participant. Unknown and forbidden interviews both
+    answer 404 so ids can't be probed. `projection` limits the interview
+    fields read.
+    """
+    try:
+        obj_id = ObjectId(interview_id)
+    except InvalidId:
+        api_error(
+            status_code=400,
+            code="INTERVIEW_INVALID_ID",
+            message="Invalid interview ID"
+        )
+
+    if current_user["role"] == "admin":
+        interview = await db.interviews.find_one({"_id": obj_id}, projection)
+    else:
+        # participants lookup rides along on the interview read and uses
+        # the (interview_id, user_email) index
+        pipeline = [{"$match": {"_id": obj_id}}]
+        if projection:
+            pipeline.append({"$project": projection})
+        cursor = await db.interviews.aggregate(pipeline + [
+            {"$lookup": {
+                "from": "participants",
+                "pipeline": [
+                    {"$match": {
+                        "interview_id": interview_id,
+                        "user_email": current_user["email"],
+                    }},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1}},
+                ],
+                "as": "membership",
+            }},
+        ])
+        docs = await cursor.to_list(length=1)
+        interview = docs[0] if docs and docs[0].pop("membership") else None
+
+        if interview:
+            await cache.set(
+                access_cache_key(interview_id, current_user["email"]),
+                True,
+                ttl=settings.CACHE_TTL_SECONDS,
+            )
+
+    if not interview:
+        api_error(
+            status_code=404,
+            code="INTERVIEW_NOT_FOUND",
+            message="Interview not found"
+        )
+
+    return interview
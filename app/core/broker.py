@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+
+from app.core.config import settings, singleton
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One connected client. Messages wait in a bounded queue; a consumer
+    that falls `queue_size` messages behind is cut off instead of making
+    the broker buffer without limit or slow down everyone else.
+    """
+
+    def __init__(self, broker, interview_id: str, queue_size: int):
+        self.broker = broker
+        self.interview_id = interview_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        self.interrupted = False
+
+    def offer(self, message: dict):
+        if self.overflowed or self.interrupted:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.interrupt()
+
+    def interrupt(self):
+        # wake a pending get() with None, making room if the queue is full
+        self.interrupted = True
+        while True:
+            try:
+                self.queue.put_nowait(None)
+                return
+            except asyncio.QueueFull:
+                self.queue.get_nowait()
+
+    async def get(self) -> dict | None:
+        # None once interrupted: overflowed (too slow) or closed by the caller
+        message = await self.queue.get()
+        if message is None or self.interrupted:
+            return None
+        return message
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class MessageBroker:
+    """
+    In-process fan-out of new messages to the clients subscribed to an
+    interview. Cross-worker delivery is delegated to `backend`.
+    """
+
+    def __init__(self, backend=None, queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.subscribers: dict[str, set[Subscription]] = {}
+
+    def subscribe(self, interview_id: str) -> Subscription:
+        if self.backend is not None:
+            self.backend.start(self)
+        subscription = Subscription(self, interview_id, self.queue_size)
+        self.subscribers.setdefault(interview_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self.subscribers.get(subscription.interview_id)
+        if not subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self.subscribers[subscription.interview_id]
+
+    async def publish(self, interview_id: str, message: dict):
+        if self.backend is None:
+            self.deliver(interview_id, message)
+        else:
+            # the backend echoes it back to every worker, this one included
+            await self.backend.publish(interview_id, message)
+
+    def deliver(self, interview_id: str, message: dict):
+        for subscription in list(self.subscribers.get(interview_id, ())):
+            subscription.offer(message)
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+
+class RedisBrokerBackend:
+    """Relays messages between workers over Redis pub/sub."""
+
+    def __init__(self, client, channel_prefix: str = "messages:", reconnect_seconds: float = 1.0):
+        self.client = client
+        self.channel_prefix = channel_prefix
+        self.reconnect_seconds = reconnect_seconds
+        self._task = None
+
+    async def publish(self, interview_id: str, message: dict):
+        await self.client.publish(
+            self.channel_prefix + interview_id, json.dumps(message)
+        )
+
+    def start(self, broker: MessageBroker):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._listen(broker))
+
+    async def _listen(self, broker: MessageBroker):
+        # a dropped connection or a Redis restart must not end live delivery
+        # for the life of the worker: subscribe again after a pause (what is
+        # published in between is missed; clients catch up with list_message)
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(self.channel_prefix + "*")
+                async for item in pubsub.listen():
+                    try:
+                        self._deliver(broker, item)
+                    except Exception:
+                        logger.exception("undeliverable broker message")
+            except Exception:
+                logger.exception("broker subscription lost, reconnecting")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def _deliver(self, broker: MessageBroker, item: dict):
+        channel = item["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        interview_id = channel[len(self.channel_prefix):]
+        broker.deliver(interview_id, json.loads(item["data"]))
+
+    async def close(self):
+        if self._task is not None:
+            # the listener closes its pubsub on the way out
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # the pool reconnects on next use, e.g. from another lifespan
+        await self.client.aclose()
+
+
+def build_broker(redis_client=None) -> MessageBroker:
+    # `redis_client` must be a redis.asyncio client (or fakeredis.aioredis)
+    backend = None
+    if settings.BROKER_BACKEND == "redis":
+        if redis_client is None:
+            import redis.asyncio
+
+            redis_client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+        backend = RedisBrokerBackend(redis_client)
+    elif settings.BROKER_BACKEND != "memory":
+        raise ValueError(f"Unknown BROKER_BACKEND: {settings.BROKER_BACKEND}")
+
+    return MessageBroker(backend, queue_size=settings.BROKER_SUBSCRIBER_QUEUE_SIZE)
+
+
+broker = singleton(build_broker)
@@ -1,27 +1,559 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import threading
 import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import bson
+from bson.codec_options import CodecOptions
+
+from app.core.config import settings, singleton
+
+logger = logging.getLogger(__name__)
+
+
+def _estimate_size(value) -> int:
+    # rough deep size of the JSON-like values we cache (dicts/lists of scalars)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _estimate_size(k) + _estimate_size(v)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += _estimate_size(item)
+    return size
+
+
+class CacheBackend(ABC):
+    """
+    Interface every cache backend implements. Routers only talk to the
+    module level `cache`, so backends can be swapped through settings.
+
+    get_or_load() is built on get()/set() here, so every backend gets
+    request coalescing and stale-while-revalidate for free.
+    """
+
+    default_ttl: int = 60
+    # seconds an entry read through get_or_load outlives its ttl, served
+    # stale while one refresh runs
+    stale_ttl: int = 30
+    # >1 refreshes earlier, 0 disables probabilistic early refresh
+    early_refresh_beta: float = 1.0
 
-class SimpleCache:
     def __init__(self):
-        self.store = {}
+        # key -> task running its loader, shared by every waiter
+        self._flights: dict[str, asyncio.Task] = {}
+        self.loads = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.early_refreshes = 0
 
-    def get(self, key: str):
-        data = self.store.get(key)
-        if not data:
-            return None
+    @abstractmethod
+    async def get(self, key: str):
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value, ttl: int | None = None):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def invalidate_namespace(self, namespace: str):
+        ...
+
+    @abstractmethod
+    async def invalidate_prefix(self, prefix: str):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        # loads in flight belong to the event loop that is shutting down
+        for task in self._flights.values():
+            task.cancel()
+        self._flights.clear()
+
+    def load_stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+            "early_refreshes": self.early_refreshes,
+        }
+
+    async def put(self, key: str, value, ttl: int | None = None, load_seconds: float = 0.0):
+        """set() for keys read through get_or_load."""
+        if ttl is None:
+            ttl = self.default_ttl
+        entry = {
+            "value": value,
+            "fresh_until": time.time() + ttl,
+            "load_seconds": load_seconds,
+        }
+        await self.set(key, entry, ttl=ttl + self.stale_ttl)
+
+    async def get_or_load(self, key: str, loader, ttl: int | None = None):
+        """
+        Read-through get with stampede protection. `loader` is an async
+        callable returning the value.
+
+        - concurrent misses on a key await one shared loader call
+        - an expired entry is still served for stale_ttl seconds while a
+          single background refresh replaces it
+        - before expiry, a read refreshes early with a probability that
+          grows as expiry nears and with the loader's cost (XFetch), so hot
+          keys are usually reloaded before they expire at all
+
+        Deleted or invalidated keys are gone, not stale: the next read
+        waits for fresh data. Loader errors reach every waiter and are not
+        cached.
+        """
+        entry = await self.get(key)
+        if entry is None:
+            flight = self._flights.get(key)
+            if flight is not None and flight.get_loop() is asyncio.get_running_loop():
+                self.coalesced += 1
+            else:
+                flight = self._start_load(key, loader, ttl)
+            # one waiter going away must not cancel the load for the others
+            return await asyncio.shield(flight)
+
+        now = time.time()
+        # -log(u) is an exponential draw; always >= 0, so stale entries
+        # always trigger the refresh
+        jitter = -math.log(1.0 - random.random())
+        if now + entry["load_seconds"] * self.early_refresh_beta * jitter >= entry["fresh_until"]:
+            if now >= entry["fresh_until"]:
+                self.stale_served += 1
+            else:
+                self.early_refreshes += 1
+            if key not in self._flights:
+                self._start_load(key, loader, ttl)
+        return entry["value"]
+
+    def _start_load(self, key: str, loader, ttl: int | None) -> asyncio.Task:
+        self.loads += 1
+        flight = asyncio.get_running_loop().create_task(self._load(key, loader, ttl))
+        self._flights[key] = flight
+        flight.add_done_callback(lambda task: self._land(key, task))
+        return flight
+
+    async def _load(self, key: str, loader, ttl: int | None):
+        start = time.perf_counter()
+        value = await loader()
+        # an invalidation while loading drops the flight: the value may
+        # predate the write, so hand it to the waiters but don't store it
+        if self._flights.get(key) is asyncio.current_task():
+            await self.put(key, value, ttl, load_seconds=time.perf_counter() - start)
+        return value
+
+    def _land(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # background refreshes have no waiter; don't log their errors as
+        # "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def _drop_flights(self, prefix: str = ""):
+        for key in list(self._flights):
+            if key.startswith(prefix):
+                self._flights.pop(key, None)
+
+
+class NullCache(CacheBackend):
+    # used when CACHE_ENABLED is false: every read is a miss
+
+    async def get(self, key: str):
+        return None
+
+    async def set(self, key: str, value, ttl: int | None = None):
+        pass
+
+    async def delete(self, key: str):
+        self._flights.pop(key, None)
+
+    async def invalidate_namespace(self, namespace: str):
+        self._drop_flights(f"{namespace}:")
+
+    async def invalidate_prefix(self, prefix: str):
+        self._drop_flights(prefix)
+
+    async def clear(self):
+        self._drop_flights()
+
+
+class LRUCache(CacheBackend):
+    """
+    Bounded in-process cache with TTL expiry and LRU eviction.
+
+    - max_entries / max_bytes cap memory; least recently used keys go first
+    - expired entries are swept a few at a time on every write
+    - safe to share between threadpool workers (one store lock)
+    - keys are namespaced by the text before the first ":"; a whole namespace
+      is invalidated in O(1) by bumping its generation, stale entries are
+      dropped lazily on read or by the sweep
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_batch: int = 32,
+        default_ttl: int = 60,
+    ):
+        super().__init__()
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_batch = sweep_batch
+
+        # key -> (value, expires_at, size, generation), oldest first
+        self.store: OrderedDict[str, tuple] = OrderedDict()
+        self.bytes = 0
+        # namespace -> generation counter
+        self.generations: dict[str, int] = {}
+
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str):
+        with self._lock:
+            data = self.store.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, _, generation = data
+            if generation != self._generation(key):
+                self._delete(key)
+                self.misses += 1
+                return None
+            if expires_at < time.time():
+                self._delete(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.store.move_to_end(key)
+            self.hits += 1
+            return value
 
-        value, expires_at = data
-        if expires_at < time.time():
-            del self.store[key]
+    async def set(self, key: str, value, ttl: int | None = None):
+        if ttl is None:
+            ttl = self.default_ttl
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self.store:
+                self._delete(key)
+
+            self.store[key] = (value, time.time() + ttl, size, self._generation(key))
+            self.bytes += size
+
+            self._sweep_expired()
+            while len(self.store) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self.store))
+                self._delete(oldest)
+                self.evictions += 1
+
+    async def delete(self, key: str):
+        self._flights.pop(key, None)
+        with self._lock:
+            if key in self.store:
+                self._delete(key)
+
+    async def invalidate_namespace(self, namespace: str):
+        self._drop_flights(f"{namespace}:")
+        with self._lock:
+            self.generations[namespace] = self.generations.get(namespace, 0) + 1
+
+    async def invalidate_prefix(self, prefix: str):
+        # "ns:" covers the whole namespace, no scan needed
+        namespace, sep, rest = prefix.partition(":")
+        if sep and not rest:
+            await self.invalidate_namespace(namespace)
+            return
+
+        self._drop_flights(prefix)
+        with self._lock:
+            keys = [k for k in self.store if k.startswith(prefix)]
+            for k in keys:
+                self._delete(k)
+
+    async def clear(self):
+        self._drop_flights()
+        with self._lock:
+            self.store.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self.store),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _generation(self, key: str) -> int:
+        return self.generations.get(key.partition(":")[0], 0)
+
+    def _delete(self, key: str):
+        size = self.store.pop(key)[2]
+        self.bytes -= size
+
+    def _sweep_expired(self):
+        # amortized: look at a handful of the least recently used entries per
+        # write instead of scanning the whole store
+        now = time.time()
+        expired = []
+        for i, (key, (_, expires_at, _, generation)) in enumerate(self.store.items()):
+            if i >= self.sweep_batch:
+                break
+            if expires_at < now or generation != self._generation(key):
+                expired.append(key)
+
+        for key in expired:
+            self._delete(key)
+            self.expirations += 1
+
+
+class RedisCache(CacheBackend):
+    """
+    Shared cache on any Redis-protocol server (a redis.asyncio client),
+    fronted by a small local LRUCache so hot keys don't pay a network
+    round trip.
+
+    Every delete/invalidation is published on `channel`; each worker
+    subscribes in start() and drops the matching entries from its local
+    tier, so a write in one worker is visible to all of them.
+    """
+
+    codec_options = CodecOptions(tz_aware=True)
+
+    def __init__(
+        self,
+        client,
+        local: LRUCache | None = None,
+        key_prefix: str = "cache:",
+        channel: str = "cache:invalidate",
+        default_ttl: int = 60,
+        local_ttl: int = 5,
+        listen: bool = True,
+    ):
+        super().__init__()
+        self.client = client
+        self.local = local if local is not None else LRUCache(default_ttl=local_ttl)
+        self.key_prefix = key_prefix
+        self.channel = channel
+        self.default_ttl = default_ttl
+        self.local_ttl = local_ttl
+        self.listen = listen
+        self.origin = uuid.uuid4().hex
+
+        self._pubsub = None
+        self._listener: asyncio.Task | None = None
+
+    # values are BSON encoded so datetimes/ObjectIds survive the round trip
+    def _encode(self, value) -> bytes:
+        return bson.encode({"v": value})
+
+    def _decode(self, data: bytes):
+        return bson.decode(data, codec_options=self.codec_options)["v"]
+
+    def _tag(self, namespace: str) -> str:
+        return f"{self.key_prefix}tag:{namespace}"
+
+    async def get(self, key: str):
+        value = await self.local.get(key)
+        if value is not None:
+            return value
+
+        data = await self.client.get(self.key_prefix + key)
+        if data is None:
             return None
 
+        value = self._decode(data)
+        await self.local.set(key, value, ttl=self.local_ttl)
         return value
 
-    def set(self, key: str, value, ttl: int = 60):
-        self.store[key] = (value, time.time() + ttl)
+    async def set(self, key: str, value, ttl: int | None = None):
+        if ttl is None:
+            ttl = self.default_ttl
+        namespace = key.partition(":")[0]
+
+        # the namespace tag set lets invalidate_namespace touch only its keys
+        pipe = self.client.pipeline()
+        pipe.set(self.key_prefix + key, self._encode(value), ex=ttl)
+        pipe.sadd(self._tag(namespace), key)
+        pipe.expire(self._tag(namespace), ttl, gt=True)
+        pipe.expire(self._tag(namespace), ttl, nx=True)
+        await pipe.execute()
+
+        await self.local.set(key, value, ttl=min(ttl, self.local_ttl))
+
+    async def delete(self, key: str):
+        self._flights.pop(key, None)
+        pipe = self.client.pipeline()
+        pipe.delete(self.key_prefix + key)
+        pipe.srem(self._tag(key.partition(":")[0]), key)
+        await pipe.execute()
+        await self.local.delete(key)
+        await self._publish({"op": "delete", "key": key})
+
+    async def invalidate_namespace(self, namespace: str):
+        self._drop_flights(f"{namespace}:")
+        tag = self._tag(namespace)
+        keys = await self.client.smembers(tag)
+        if keys:
+            await self.client.delete(*[self.key_prefix + k.decode() for k in keys], tag)
+        await self.local.invalidate_namespace(namespace)
+        await self._publish({"op": "namespace", "namespace": namespace})
+
+    async def invalidate_prefix(self, prefix: str):
+        namespace, sep, rest = prefix.partition(":")
+        if sep and not rest:
+            await self.invalidate_namespace(namespace)
+            return
+
+        self._drop_flights(prefix)
+        keys = [k async for k in self.client.scan_iter(match=f"{self.key_prefix}{prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+        await self.local.invalidate_prefix(prefix)
+        await self._publish({"op": "prefix", "prefix": prefix})
+
+    async def clear(self):
+        self._drop_flights()
+        keys = [k async for k in self.client.scan_iter(match=f"{self.key_prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+        await self.local.clear()
+        await self._publish({"op": "clear"})
+
+    def stats(self) -> dict:
+        return {"local": self.local.stats()}
+
+    # cross-worker invalidation
+    async def _publish(self, message: dict):
+        message["origin"] = self.origin
+        await self.client.publish(self.channel, json.dumps(message))
+
+    async def _on_message(self, message):
+        data = json.loads(message["data"])
+        if data.get("origin") == self.origin:
+            return
+
+        op = data["op"]
+        if op == "delete":
+            self._flights.pop(data["key"], None)
+            await self.local.delete(data["key"])
+        elif op == "namespace":
+            self._drop_flights(f"{data['namespace']}:")
+            await self.local.invalidate_namespace(data["namespace"])
+        elif op == "prefix":
+            self._drop_flights(data["prefix"])
+            await self.local.invalidate_prefix(data["prefix"])
+        elif op == "clear":
+            self._drop_flights()
+            await self.local.clear()
+
+    async def start(self):
+        if not self.listen or self._listener is not None:
+            return
+        # subscribed before start() returns: no invalidation published
+        # after startup is missed
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(self._pubsub))
+
+    async def _listen(self, pubsub):
+        async for message in pubsub.listen():
+            try:
+                await self._on_message(message)
+            except Exception:
+                logger.exception("cache invalidation message failed")
+
+    async def close(self):
+        await super().close()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        # the pool reconnects on next use, e.g. from another lifespan
+        await self.client.aclose()
+
+
+def build_cache(redis_client=None) -> CacheBackend:
+    """
+    Pick the backend from settings. `redis_client` lets callers pass an
+    already built redis.asyncio client (e.g. fakeredis.FakeAsyncRedis())
+    instead of REDIS_URL.
+    """
+    backend = _build_backend(redis_client)
+    backend.stale_ttl = settings.CACHE_STALE_TTL_SECONDS
+    backend.early_refresh_beta = settings.CACHE_EARLY_REFRESH_BETA
+    return backend
+
+
+def _build_backend(redis_client) -> CacheBackend:
+    if not settings.CACHE_ENABLED:
+        return NullCache()
+
+    local = LRUCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES,
+        default_ttl=settings.CACHE_TTL_SECONDS,
+    )
+    if settings.CACHE_BACKEND == "memory":
+        return local
+
+    if settings.CACHE_BACKEND == "redis":
+        if redis_client is None:
+            import redis.asyncio
+
+            redis_client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+        local.default_ttl = settings.CACHE_LOCAL_TTL_SECONDS
+        return RedisCache(
+            redis_client,
+            local=local,
+            default_ttl=settings.CACHE_TTL_SECONDS,
+            local_ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+        )
+
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
 
-    def invalidate_prefix(self, prefix: str):
-        keys = [k for k in self.store if k.startswith(prefix)]
-        for k in keys:
-            del self.store[k]
 
-cache = SimpleCache()
+cache = singleton(build_cache)
@@ -13,12 +13,215 @@ class Settings(BaseSettings):
 
     MONGO_URI: str
     MONGO_DB_NAME: str
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int | None = None
+    # how long a request waits for a free pooled connection
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int | None = 2_000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5_000
+    MONGO_SOCKET_TIMEOUT_MS: int | None = 10_000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5_000
+    # primary / primaryPreferred / secondary / secondaryPreferred / nearest
+    MONGO_READ_PREFERENCE: str = "primary"
+    # create missing declared indexes (app/db/indexes.py) on startup
+    MONGO_ENSURE_INDEXES: bool = False
+    # otherwise only check they exist on startup and log the missing ones
+    MONGO_VERIFY_INDEXES: bool = True
+    # pooled connections opened on startup so the first requests don't pay
+    # for handshakes (0: a single ping)
+    MONGO_PREWARM_CONNECTIONS: int = 0
 
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
+    # how long a resolved user stays cached between requests; register
+    # invalidates it, so this bounds how stale a role or account changed
+    # outside the API (shell, migration) can be
+    AUTH_PRINCIPAL_TTL_SECONDS: int = 30
+    # build current_user from the signed sub/role claims, no users lookup
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+
+    # argon2 cost; raising these rehashes passwords on the next login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    # dedicated hashing pool: "thread" or "process"
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    # hashes allowed to wait for a worker before requests get a 429
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
 
     CACHE_ENABLED: bool = True
     CACHE_TTL_SECONDS: int = 60
+    # "memory" (per worker) or "redis" (shared, pub/sub invalidation)
+    CACHE_BACKEND: str = "memory"
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # how long a worker keeps a redis value in its local tier
+    CACHE_LOCAL_TTL_SECONDS: int = 5
+    # get_or_load: serve expired entries this long while one refresh runs,
+    # and refresh hot keys early (XFetch beta; 0 disables)
+    CACHE_STALE_TTL_SECONDS: int = 30
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+    # load the first interview listing page and the ongoing / soonest
+    # scheduled interviews into the cache on startup
+    CACHE_WARM_ON_STARTUP: bool = False
+    CACHE_WARM_INTERVIEWS: int = 200
+    # per-user interview membership sets behind /v1/users/me/interviews:
+    # "memory" (per worker: other workers' adds show after the TTL) or
+    # "redis" (shared)
+    MEMBERSHIP_BACKEND: str = "memory"
+    MEMBERSHIP_TTL_SECONDS: int = 300
+    # users whose sets a worker keeps in memory, least recently read evicted
+    MEMBERSHIP_MAX_USERS: int = 10_000
+
+    # rebuild the dashboard counters from the collections every N seconds
+    # in each worker; 0 leaves it to `python -m app.core.stats` (cron)
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 0
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # token buckets per route name: "<requests>/<second|minute|hour|day>"
+    # with an optional ":<burst>"; routes pick the key (user, ip, interview)
+    RATE_LIMIT_ENABLED: bool = False
+    # "memory" (per worker) or "redis" (shared)
+    RATE_LIMIT_BACKEND: str = "memory"
+    # buckets a worker keeps before forgetting the least recent
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # proxies (CIDRs) whose X-Forwarded-For gives the client IP; unset,
+    # the header is ignored
+    RATE_LIMIT_TRUSTED_PROXIES: list[str] = []
+    # "<name>_user" caps a per-interview route across a user's interviews
+    RATE_LIMITS: dict[str, str] = {
+        "auth_login": "10/minute",
+        "auth_register": "5/minute",
+        "list_messages": "120/minute:30",
+        "list_messages_user": "600/minute:100",
+        "create_messages": "60/minute:20",
+        "create_messages_user": "180/minute:40",
+        "search_messages": "30/minute",
+        "export_messages": "6/minute",
+        "export_messages_user": "20/minute",
+    }
+
+    # request/Mongo timing and the /metrics endpoint
+    METRICS_ENABLED: bool = True
+
+    # opt-in request profiling (collapsed stacks at /v1/admin/profiles)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SLOW_THRESHOLD_MS: int | None = None
+    PROFILING_HEADER: str = "X-Profile"
+    # the header only triggers a profile when its value is this secret;
+    # unset, the header is ignored
+    PROFILING_HEADER_SECRET: str | None = None
+    PROFILING_INTERVAL_MS: int = 2
+    PROFILING_BUFFER_SIZE: int = 50
+    PROFILING_MAX_CONCURRENT: int = 2
+
+    # messages per Mongo batch / streamed chunk in the transcript export
+    MESSAGE_EXPORT_BATCH_SIZE: int = 500
+
+    # live message fan-out: "memory" (single worker) or "redis" (pub/sub)
+    BROKER_BACKEND: str = "memory"
+    # messages a live subscriber may lag behind before it is disconnected
+    BROKER_SUBSCRIBER_QUEUE_SIZE: int = 100
+
+    # "direct" (insert per request) or "batched" (group commit)
+    MESSAGE_INGEST_MODE: str = "direct"
+    MESSAGE_INGEST_MAX_BATCH: int = 200
+    MESSAGE_INGEST_MAX_DELAY_MS: int = 5
+    MESSAGE_INGEST_MAX_PENDING: int = 10_000
+    # most messages accepted by one POST .../messages:batch
+    MESSAGE_BATCH_MAX_SIZE: int = 100
+
+    # finished interviews' messages packed into compressed buckets
+    # (app/core/archive.py): on the transition when ARCHIVE_ON_TERMINAL,
+    # otherwise by `python -m app.core.archive`
+    ARCHIVE_ON_TERMINAL: bool = False
+    ARCHIVE_DELAY_SECONDS: int = 60
+    ARCHIVE_BUCKET_MESSAGES: int = 1_000
+    ARCHIVE_BUCKET_MAX_BYTES: int = 1024 * 1024
+    # "zlib" or "zstd" (needs the zstandard package)
+    ARCHIVE_CODEC: str = "zlib"
+
+    # most participants accepted by one POST .../participants:bulk
+    PARTICIPANT_BULK_MAX_SIZE: int = 100
+
+    # message search: "mongo" (text index) or "memory" (in-process BM25,
+    # caught up with other workers' messages every SEARCH_REFRESH_SECONDS)
+    SEARCH_BACKEND: str = "mongo"
+    SEARCH_REFRESH_SECONDS: int = 10
+
+    # background lifecycle transitions (scheduled -> ongoing at scheduled_at,
+    # ongoing -> completed N minutes later when set)
+    SCHEDULER_ENABLED: bool = False
+    SCHEDULER_HORIZON_SECONDS: int = 3600
+    SCHEDULER_BATCH_SIZE: int = 500
+    SCHEDULER_AUTO_COMPLETE_AFTER_MINUTES: int = 0
+
+
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    # read from the environment / .env on first use, not at import
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def use_settings(value: Settings):
+    """
+    Replace the settings. singleton() objects are rebuilt from them on
+    their next use; anything else built from the old ones keeps them.
+    """
+    global _settings
+    _settings = value
+    for instance in _singletons:
+        instance._reset()
+
+
+class _LazySettings:
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __repr__(self):
+        return repr(get_settings())
+
+
+settings = _LazySettings()
+
+
+_singletons: list["singleton"] = []
+
+
+class singleton:
+    """
+    Stands in for a module level object (cache, broker, pools) built by
+    `build()` from the settings on first use rather than at import.
+    """
+
+    __slots__ = ("_build", "_value")
+
+    def __init__(self, build):
+        object.__setattr__(self, "_build", build)
+        object.__setattr__(self, "_value", None)
+        _singletons.append(self)
+
+    def _resolve(self):
+        if self._value is None:
+            object.__setattr__(self, "_value", self._build())
+        return self._value
+
+    def _reset(self):
+        object.__setattr__(self, "_value", None)
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
 
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
 
-settings = Settings()
+    def __repr__(self):
+        return f"singleton({self._resolve()!r})"
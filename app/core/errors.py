@@ -1,6 +1,6 @@
 from fastapi import HTTPException
 
-def api_error(status_code: int, code: str, message: str):
+def api_error(status_code: int, code: str, message: str, headers: dict | None = None):
     raise HTTPException(
         status_code=status_code,
         detail={
@@ -9,5 +9,6 @@ def api_error(status_code: int, code: str, message: str):
                 "message": message,
                 "status": status_code
             }
-        }
+        },
+        headers=headers,
     )
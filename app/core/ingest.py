@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings, singleton
+from app.core.stats import record_messages
+from app.db.mongo import db, lazy
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitWriter:
+    """
+    Buffers inserts from concurrent requests and writes them with one
+    insert_many per batch (group commit).
+
+    A batch is flushed once `max_batch` documents are waiting or
+    `max_delay_ms` after its first document arrived, whichever comes
+    first. Callers are acknowledged only after their batch was written,
+    so an acknowledged message is as durable as with insert_one.
+
+    `on_commit`, if given, is awaited with the documents each flush wrote,
+    after their callers were acknowledged.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_batch: int = 200,
+        max_delay_ms: int = 5,
+        max_pending: int = 10_000,
+        on_commit=None,
+    ):
+        self.collection = collection
+        self.on_commit = on_commit
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.max_pending = max_pending
+        self.queue: asyncio.Queue | None = None
+        self._full: asyncio.Event | None = None
+        self._task = None
+        self._closing = False
+
+        self.pending_docs = 0
+        self.flushes = 0
+        self.flushed_docs = 0
+        self.failed_docs = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+    async def write(self, docs: list[dict]):
+        """Queue `docs` and wait until they are committed."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.get_loop() is not loop:
+            self._start(loop)
+
+        future = loop.create_future()
+        self.pending_docs += len(docs)
+        await self.queue.put((docs, future))
+        if self.pending_docs >= self.max_batch:
+            self._full.set()
+        await future
+
+    def _start(self, loop: asyncio.AbstractEventLoop):
+        # queue and flusher belong to the loop serving requests
+        # backpressure: writers wait once max_pending requests are queued
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self._full = asyncio.Event()
+        self.pending_docs = 0
+        self._closing = False
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+
+            # give concurrent requests a moment to join this batch
+            if self.pending_docs < self.max_batch and not self._closing:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+
+            size = len(batch[0][0])
+            done = False
+            while size < self.max_batch and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self.pending_docs -= size
+            await self._flush(batch)
+            if done:
+                return
+
+    async def _flush(self, batch: list[tuple[list[dict], asyncio.Future]]):
+        docs = [doc for item_docs, _ in batch for doc in item_docs]
+        start = time.perf_counter()
+        inserted = len(docs)
+        error = None
+        try:
+            await self.collection.insert_many(docs, ordered=True)
+        except BulkWriteError as exc:
+            # ordered: everything before the first failure was written
+            inserted = exc.details.get("nInserted", 0)
+            error = exc
+        except Exception as exc:
+            inserted = 0
+            error = exc
+
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.flushed_docs += inserted
+        self.failed_docs += len(docs) - inserted
+        self.flush_seconds_total += elapsed
+        self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+        written = 0
+        for item_docs, future in batch:
+            written += len(item_docs)
+            if future.done():
+                continue
+            if written <= inserted:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+        if self.on_commit is not None and inserted:
+            try:
+                await self.on_commit(docs[:inserted])
+            except Exception:
+                # the flusher outlives a failing hook
+                logger.exception("group commit hook failed")
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.pending_docs,
+            "flushes": self.flushes,
+            "flushed_docs": self.flushed_docs,
+            "failed_docs": self.failed_docs,
+            "flush_seconds_total": self.flush_seconds_total,
+            "flush_seconds_max": self.flush_seconds_max,
+        }
+
+    async def close(self):
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        if task.get_loop() is not asyncio.get_running_loop():
+            # its loop is gone (an earlier app or test client); nothing
+            # there can still be waiting on a write
+            return
+        # the flusher commits what was queued before shutdown, without
+        # waiting out the batching delay, and stops at the marker; a
+        # flush in progress is never cut short
+        self._closing = True
+        self._full.set()
+        await self.queue.put(None)
+        await task
+
+
+def build_message_writer() -> GroupCommitWriter:
+    return GroupCommitWriter(
+        lazy(lambda: db.messages),
+        max_batch=settings.MESSAGE_INGEST_MAX_BATCH,
+        max_delay_ms=settings.MESSAGE_INGEST_MAX_DELAY_MS,
+        max_pending=settings.MESSAGE_INGEST_MAX_PENDING,
+        # one counter update per batch instead of one per request
+        on_commit=record_messages,
+    )
+
+
+message_writer = singleton(build_message_writer)
+
+
+async def insert_messages(docs: list[dict]):
+    # single entry point for message writes; honours MESSAGE_INGEST_MODE
+    # and keeps the message counters (app/core/stats.py) in step
+    if settings.MESSAGE_INGEST_MODE == "batched":
+        await message_writer.write(docs)
+        return
+    if len(docs) == 1:
+        await db.messages.insert_one(docs[0])
+    else:
+        await db.messages.insert_many(docs, ordered=True)
+    await record_messages(docs)
@@ -5,7 +5,7 @@ ALLOWED_TRANSITIONS = {
     "cancelled": set()
 }
 
-def is_vaild_transition(current_status: str, new_status: str) -> bool:
+def is_valid_transition(current_status: str, new_status: str) -> bool:
     """
     Check whether an interview status transition is allowed.
 
@@ -14,4 +14,9 @@ def is_vaild_transition(current_status: str, new_status: str) -> bool:
     - ongoing -> completed ✅
     - scheduled -> completed ❌
     """
-    return new_status in ALLOWED_TRANSITIONS.get(current_status, set())
\ No newline at end of file
+    return new_status in ALLOWED_TRANSITIONS.get(current_status, set())
+
+# no way out: the interview and its messages are read-only from here on
+TERMINAL_STATUSES = frozenset(
+    status for status, allowed in ALLOWED_TRANSITIONS.items() if not allowed
+)
@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+
+from app.core.config import settings, singleton
+
+
+class MembershipIndex:
+    """
+    Which interviews a user participates in, kept per user so "my
+    interviews" doesn't scan participants on every request.
+
+    Sets are filled from Mongo on first read (`load`) and updated in place
+    by add() when a participant is written; they are never trusted past
+    `ttl`. This base class caches nothing: every read loads.
+    """
+
+    def __init__(self, ttl: int = 300):
+        self.ttl = ttl
+
+    async def interview_ids(self, email: str, load) -> set[str]:
+        # load: async () -> iterable of interview ids, read from participants
+        return set(await load())
+
+    async def add(self, email: str, interview_id: str):
+        pass
+
+    async def add_many(self, interview_id: str, emails: list[str]):
+        for email in emails:
+            await self.add(email, interview_id)
+
+
+class MemoryMembershipIndex(MembershipIndex):
+    """
+    Per worker: an add() in another worker shows up here once the local
+    set expires (ttl). At most `max_users` sets are kept, least recently
+    read dropped first, as LRUCache does.
+    """
+
+    def __init__(self, ttl: int = 300, max_users: int = 10_000):
+        super().__init__(ttl)
+        self.max_users = max_users
+        # email -> [interview ids, complete, expires_at], oldest read first
+        self.sets: OrderedDict[str, list] = OrderedDict()
+        self.evictions = 0
+
+    async def interview_ids(self, email: str, load) -> set[str]:
+        entry = self.sets.get(email)
+        if entry and entry[1] and entry[2] > time.time():
+            self.sets.move_to_end(email)
+            return set(entry[0])
+
+        # register the set before reading so add() calls that land while
+        # the load is in flight are merged, not lost
+        entry = [set(), False, 0]
+        self.sets[email] = entry
+        self.sets.move_to_end(email)
+        while len(self.sets) > self.max_users:
+            self.sets.popitem(last=False)
+            self.evictions += 1
+        entry[0].update(await load())
+        entry[1] = True
+        entry[2] = time.time() + self.ttl
+        return set(entry[0])
+
+    async def add(self, email: str, interview_id: str):
+        # users that never asked have no set; their first read loads it
+        entry = self.sets.get(email)
+        if entry is not None:
+            entry[0].add(interview_id)
+
+
+class RedisMembershipIndex(MembershipIndex):
+    """
+    One Redis set per user, shared by every worker. A sentinel member marks
+    a set as fully loaded; add() may create partial sets (no sentinel) that
+    the next read completes, so adds racing a load in another worker are
+    never lost.
+    """
+
+    COMPLETE = "*"
+
+    def __init__(self, client, ttl: int = 300, key_prefix: str = "membership:"):
+        super().__init__(ttl)
+        self.client = client
+        self.key_prefix = key_prefix
+
+    async def interview_ids(self, email: str, load) -> set[str]:
+        key = self.key_prefix + email
+        members = {m.decode() for m in await self.client.smembers(key)}
+        if self.COMPLETE in members:
+            members.discard(self.COMPLETE)
+            return members
+
+        ids = set(await load())
+        pipe = self.client.pipeline()
+        pipe.sadd(key, self.COMPLETE, *ids)
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
+        return ids | members
+
+    async def add(self, email: str, interview_id: str):
+        await self.add_many(interview_id, [email])
+
+    async def add_many(self, interview_id: str, emails: list[str]):
+        # one round trip for the whole panel
+        pipe = self.client.pipeline()
+        for email in emails:
+            key = self.key_prefix + email
+            pipe.sadd(key, interview_id)
+            # partial sets must not outlive a complete one
+            pipe.expire(key, self.ttl, nx=True)
+        await pipe.execute()
+
+
+def build_membership_index(redis_client=None) -> MembershipIndex:
+    # `redis_client` must be a redis.asyncio client (or fakeredis.aioredis)
+    if not settings.CACHE_ENABLED:
+        return MembershipIndex()
+
+    ttl = settings.MEMBERSHIP_TTL_SECONDS
+    if settings.MEMBERSHIP_BACKEND == "memory":
+        return MemoryMembershipIndex(ttl, max_users=settings.MEMBERSHIP_MAX_USERS)
+
+    if settings.MEMBERSHIP_BACKEND == "redis":
+        if redis_client is None:
+            import redis.asyncio
+
+            redis_client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+        return RedisMembershipIndex(redis_client, ttl)
+
+    raise ValueError(f"Unknown MEMBERSHIP_BACKEND: {settings.MEMBERSHIP_BACKEND}")
+
+
+membership = singleton(build_membership_index)
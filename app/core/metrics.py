@@ -0,0 +1,207 @@
+import threading
+import time
+from bisect import bisect_left
+
+from pymongo import monitoring
+
+# seconds; covers sub-millisecond cache hits up to slow argon2 logins
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in list(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. observe() is a bisect and two increments, so
+    it is cheap enough to run on every request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            with self._lock:
+                series = self.series.setdefault(
+                    label_values, [0] * (len(self.buckets) + 1) + [0.0]
+                )
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for label_values, series in list(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_labels(names, label_values + (bound,))} {cumulative}"
+                )
+            labels = _labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauges:
+    """Values read from their owners at scrape time (cache, pools, queues)."""
+
+    def __init__(self):
+        self.collectors = []
+
+    def register(self, collect):
+        # collect() -> iterable of (name, help, labels dict, value)
+        self.collectors.append(collect)
+
+    def render(self) -> list[str]:
+        lines = []
+        seen = set()
+        for collect in self.collectors:
+            for name, help, labels, value in collect():
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# HELP {name} {help}")
+                    lines.append(f"# TYPE {name} gauge")
+                names = tuple(labels)
+                lines.append(f"{name}{_labels(names, tuple(labels.values()))} {value}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    labels=("method", "route", "status"),
+)
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency",
+    labels=("collection", "command"),
+)
+mongo_command_failures = Counter(
+    "mongo_command_failures_total",
+    "MongoDB commands that failed",
+    labels=("collection", "command"),
+)
+gauges = Gauges()
+
+
+def render() -> str:
+    lines = []
+    for metric in (http_request_duration, mongo_command_duration, mongo_command_failures, gauges):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task/queue overhead)
+    timing every HTTP request by its route template, e.g.
+    /v1/interviews/{interview_id}, so ids don't explode the label space.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+            )
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    # collections worth a label; anything else is reported as "other"
+    COLLECTIONS = {"interviews", "participants", "messages", "users"}
+
+    def __init__(self):
+        self.pending: dict[tuple, str] = {}
+
+    def _key(self, event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if collection not in self.COLLECTIONS:
+            collection = "other"
+        self.pending[self._key(event)] = collection
+
+    def succeeded(self, event):
+        collection = self.pending.pop(self._key(event), "other")
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, collection, event.command_name
+        )
+
+    def failed(self, event):
+        collection = self.pending.pop(self._key(event), "other")
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, collection, event.command_name
+        )
+        mongo_command_failures.inc(collection, event.command_name)
+
+
+mongo_listener = MongoCommandListener()
@@ -0,0 +1,86 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.core.errors import api_error
+
+
+# opaque keyset cursor: the (<field>, _id) of the last item on a page;
+# cursors on another field than created_at name it, so one can't be
+# replayed against a differently sorted listing
+def encode_cursor(doc: dict, field: str = "created_at") -> str:
+    payload = [doc[field].isoformat(), str(doc["_id"])]
+    if field != "created_at":
+        payload.append(field)
+    raw = json.dumps(payload)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, field: str = "created_at") -> tuple[datetime, ObjectId]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, obj_id, *rest = json.loads(base64.urlsafe_b64decode(padded))
+        if rest != ([] if field == "created_at" else [field]):
+            raise ValueError(field)
+        return datetime.fromisoformat(value), ObjectId(obj_id)
+    except (ValueError, TypeError, InvalidId):
+        api_error(
+            status_code=400,
+            code="PAGINATION_INVALID_CURSOR",
+            message="Invalid pagination cursor"
+        )
+
+
+def encode_id_cursor(obj_id: ObjectId) -> str:
+    # for listings ordered by _id alone
+    raw = json.dumps([str(obj_id), "_id"])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_id_cursor(token: str) -> ObjectId:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        obj_id, field = json.loads(base64.urlsafe_b64decode(padded))
+        if field != "_id":
+            raise ValueError(field)
+        return ObjectId(obj_id)
+    except (ValueError, TypeError, InvalidId):
+        api_error(
+            status_code=400,
+            code="PAGINATION_INVALID_CURSOR",
+            message="Invalid pagination cursor"
+        )
+
+
+def keyset_filter(token: str, direction: int, field: str = "created_at") -> dict:
+    """
+    Filter for the documents after `token` in a (field, _id) sort,
+    descending when direction is -1. Keeps deep pages as cheap as the
+    first one, unlike skip() which still walks every skipped document.
+    """
+    value, obj_id = decode_cursor(token, field)
+    # one range on the sort field (index bounds) and a residual filter for the
+    # rows tied with the cursor; an $or here can cost the planner the
+    # index-provided sort
+    if direction < 0:
+        bound, seen = "$lte", "$gte"
+    else:
+        bound, seen = "$gte", "$lte"
+    return {
+        field: {bound: value},
+        "$nor": [{field: value, "_id": {seen: obj_id}}],
+    }
+
+
+def keyset_sort(direction: int, field: str = "created_at") -> list[tuple[str, int]]:
+    return [(field, direction), ("_id", direction)]
+
+
+def next_cursor(docs: list[dict], limit: int, field: str = "created_at") -> str | None:
+    # callers fetch limit + 1 documents; the extra one only signals more pages
+    if len(docs) <= limit:
+        return None
+    return encode_cursor(docs[limit - 1], field)
@@ -3,7 +3,7 @@ from fastapi import Depends, HTTPException, status
 from app.core.auth_dependencies import get_current_user
 
 def require_roles(*allowed_roles: str):
-    def checker(current_user=Depends(get_current_user)):
+    async def checker(current_user=Depends(get_current_user)):
         if current_user["role"] not in allowed_roles:
             raise HTTPException (status_code= status.HTTP_403_FORBIDDEN,
                                  detail="Insufficient permissions")
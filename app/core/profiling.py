@@ -0,0 +1,227 @@
+import asyncio
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+from app.core.config import settings, singleton
+
+
+class StackSampler:
+    """
+    Samples one request's stack on a fixed interval from a background
+    thread and counts them in collapsed-stack form ("state;outer;...;inner
+    count"), ready for flamegraph.pl/speedscope.
+
+    Only the request's own asyncio task is sampled, not the whole worker:
+    - "running": the task holds the event loop; the loop thread's stack
+    - "waiting": the task is suspended; the chain of coroutines down to
+      the await it is parked on (a Mongo round trip, a lock, a threadpool
+      call, which shows as the await on it)
+
+    Other requests sharing the event loop stay out of the profile. Build
+    it on the loop's thread, from inside the task or with it.
+    """
+
+    def __init__(self, interval: float, task: asyncio.Task):
+        self.interval = interval
+        self.task = task
+        self.loop_thread = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._on_stop = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, on_stop=None):
+        """
+        Signal the sampling thread and return at once; it calls
+        on_stop(self) from its own thread after its last sample, so the
+        event loop never waits for it.
+        """
+        self._on_stop = on_stop
+        self._stop.set()
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        loop = self.task.get_loop()
+        while not self._stop.wait(self.interval) and not self.task.done():
+            if asyncio.current_task(loop) is self.task:
+                frame = sys._current_frames().get(self.loop_thread)
+                if asyncio.current_task(loop) is not self.task:
+                    continue  # switched tasks while the frames were read
+                root = getattr(self.task.get_coro(), "cr_frame", None)
+                stack = self._collapse("running", self._outwards(frame, root))
+            else:
+                stack = self._collapse("waiting", reversed(self._awaiting(self.task.get_coro())))
+            self.stacks[stack] += 1
+            self.samples += 1
+        if self._on_stop is not None:
+            self._on_stop(self)
+
+    @staticmethod
+    def _outwards(frame, root) -> list:
+        # innermost first, up to the task's own coroutine; the event loop
+        # machinery above it is the same in every sample
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            if frame is root:
+                break
+            frame = frame.f_back
+        return frames
+
+    @staticmethod
+    def _awaiting(coro) -> list:
+        # outermost first: each suspended coroutine's frame, then what it awaits
+        frames = []
+        while coro is not None:
+            frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+            if frame is None:
+                break
+            frames.append(frame)
+            coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        return frames
+
+    @staticmethod
+    def _collapse(state: str, frames) -> str:
+        # `frames` innermost first
+        parts = [
+            f"{frame.f_code.co_qualname} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})"
+            for frame in frames
+        ]
+        parts.append(state)
+        return ";".join(reversed(parts))
+
+
+class ProfileStore:
+    """Bounded ring buffer of captured profiles; oldest fall off first."""
+
+    def __init__(self, size: int):
+        self.profiles: deque = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, **profile) -> dict:
+        with self._lock:
+            profile["id"] = next(self._ids)
+            self.profiles.append(profile)
+        return profile
+
+    def list(self) -> list[dict]:
+        return [
+            {k: v for k, v in profile.items() if k != "collapsed"}
+            for profile in reversed(self.profiles)
+        ]
+
+    def get(self, profile_id: int) -> dict | None:
+        for profile in self.profiles:
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+
+profile_store = singleton(lambda: ProfileStore(settings.PROFILING_BUFFER_SIZE))
+
+
+class ProfilingMiddleware:
+    """
+    Captures a profile for a request when it
+
+    - sends the PROFILING_HEADER header set to PROFILING_HEADER_SECRET
+      ("header"); anyone could send the header, and each profile costs a
+      sampler thread and a slot in the ring buffer,
+    - is picked at PROFILING_SAMPLE_RATE ("sampled"), or
+    - is still running after PROFILING_SLOW_THRESHOLD_MS ("slow"); only
+      the part after the threshold is profiled.
+
+    Unsampled requests pay for a random() call and, with a threshold set,
+    one timer handle; no profiler runs for them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILING_HEADER.lower().encode()
+        secret = settings.PROFILING_HEADER_SECRET
+        self.secret = secret.encode() if secret else None
+        self.interval = settings.PROFILING_INTERVAL_MS / 1000
+        self.threshold = (
+            settings.PROFILING_SLOW_THRESHOLD_MS / 1000
+            if settings.PROFILING_SLOW_THRESHOLD_MS
+            else None
+        )
+        self.active = 0
+
+    def _start(self, task: asyncio.Task) -> StackSampler | None:
+        # cap concurrent profilers so a burst can't multiply the overhead
+        if self.active >= settings.PROFILING_MAX_CONCURRENT:
+            return None
+        self.active += 1
+        sampler = StackSampler(self.interval, task)
+        sampler.start()
+        return sampler
+
+    def _requested(self, headers) -> bool:
+        if self.secret is None:
+            return False
+        for name, value in headers:
+            if name == self.header:
+                return hmac.compare_digest(value, self.secret)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        if self._requested(scope["headers"]):
+            trigger = "header"
+        elif random.random() < settings.PROFILING_SAMPLE_RATE:
+            trigger = "sampled"
+
+        # the request runs in this task; call_later callbacks don't
+        task = asyncio.current_task()
+        sampler = self._start(task) if trigger else None
+        timer = None
+        if sampler is None and self.threshold is not None:
+            def on_slow():
+                nonlocal sampler, trigger
+                sampler = self._start(task)
+                if sampler is not None:
+                    trigger = "slow"
+
+            timer = asyncio.get_running_loop().call_later(self.threshold, on_slow)
+
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration = time.perf_counter() - start
+            if timer is not None:
+                timer.cancel()
+            if sampler is not None:
+                self.active -= 1
+                profile = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", None),
+                    "trigger": trigger,
+                    "started_at": started_at,
+                    "duration_ms": round(duration * 1000, 3),
+                }
+                # stored by the sampler thread once it has stopped
+                sampler.stop(lambda sampler: profile_store.add(
+                    **profile, collapsed=sampler.collapsed(), samples=sampler.samples
+                ))
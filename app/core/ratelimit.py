@@ -0,0 +1,285 @@
+"""
+Token-bucket rate limiting for routes, so one client polling or
+hammering login can't use up the threadpool and Mongo pool for everyone.
+
+Limits are configured per route name in RATE_LIMITS as
+"<requests>/<second|minute|hour|day>", optionally ":<burst>" (defaults to
+<requests>): tokens refill at requests/period up to burst, and each
+request takes one. Routes choose what a bucket is keyed by:
+
+    dependencies=[Depends(rate_limit("list_messages", "user", "interview"))]
+
+and may charge more than one token for a request (`cost`, e.g. one per
+message of a batch). A request costing more than the burst waits for a
+full bucket and leaves it in debt, so every token is paid for all the same.
+
+- "user": the JWT sub of the caller (the route must be authenticated)
+- "ip": the client address; behind RATE_LIMIT_TRUSTED_PROXIES, the
+  nearest X-Forwarded-For hop that isn't one of them
+- "interview": the {interview_id} path parameter. It is charged before
+  the route checks access, so any id opens a fresh bucket: it needs
+  "user", and such routes also charge "<name>_user", keyed by the user
+  alone, which caps them across interviews
+
+Backends (RATE_LIMIT_BACKEND): "memory" keeps buckets per worker, "redis"
+shares them through one Lua script per check (fakeredis with lupa runs it
+too). A failing Redis lets requests through rather than failing them.
+"""
+import ipaddress
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from fastapi import Depends, Request
+
+from app.core.auth_dependencies import get_current_user
+from app.core.config import settings, singleton
+from app.core.errors import api_error
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(spec: str) -> tuple[float, float]:
+    """'60/minute' or '60/minute:10' -> (tokens per second, burst)."""
+    try:
+        count, _, rest = spec.partition("/")
+        period, _, burst = rest.partition(":")
+        count = int(count)
+        rate = count / PERIODS[period.strip()]
+        burst = int(burst) if burst else count
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid rate limit: {spec!r}") from None
+    if count <= 0 or burst <= 0:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return rate, float(burst)
+
+
+class RateLimiter:
+    """
+    hit() takes `cost` tokens from `key`'s bucket and returns 0, or the
+    seconds until they are available. This base class never limits
+    (RATE_LIMIT_ENABLED off).
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        trusted_proxies: list | None = None,
+    ):
+        self.limits = limits or {}
+        # networks whose X-Forwarded-For is believed
+        self.trusted_proxies = trusted_proxies or []
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def hit(self, key: str, rate: float, burst: float, cost: int = 1) -> float:
+        return 0.0
+
+    async def check(self, name: str, key: str, cost: int = 1):
+        limit = self.limits.get(name)
+        if limit is None:
+            return
+        retry_after = await self.hit(f"{name}:{key}", *limit, cost)
+        if not retry_after:
+            self.allowed += 1
+            return
+        self.limited += 1
+        api_error(
+            status_code=429,
+            code="RATE_LIMITED",
+            message="Too many requests, retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"allowed": self.allowed, "limited": self.limited, "errors": self.errors}
+
+
+class MemoryRateLimiter(RateLimiter):
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        max_keys: int = 100_000,
+        trusted_proxies: list | None = None,
+    ):
+        super().__init__(limits, trusted_proxies)
+        self.max_keys = max_keys
+        # key -> (tokens, last refill), least recently seen first; a plain
+        # dict would make evicting from the front scan deleted slots
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def hit(self, key: str, rate: float, burst: float, cost: int = 1) -> float:
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            tokens = burst
+            if len(self.buckets) >= self.max_keys:
+                # a forgotten bucket restarts full
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        # more than a full bucket is taken as debt
+        needed = min(cost, burst)
+        if tokens >= needed:
+            self.buckets[key] = (tokens - cost, now)
+            return 0.0
+        self.buckets[key] = (tokens, now)
+        return (needed - tokens) / rate
+
+    def stats(self) -> dict:
+        return {**super().stats(), "keys": len(self.buckets)}
+
+
+# server clock, so workers with drifting clocks share one timeline; the
+# result is a string because Lua numbers come back truncated to integers
+TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local needed = math.min(cost, burst)
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or burst
+local stamp = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - stamp) * rate)
+local retry = 0
+if tokens >= needed then
+    tokens = tokens - cost
+else
+    retry = (needed - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+-- kept until the bucket would be full again, debt included
+redis.call('PEXPIRE', KEYS[1], math.max(1, math.ceil((burst - tokens) / rate * 1000)))
+return tostring(retry)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    def __init__(
+        self,
+        client,
+        limits: dict[str, tuple[float, float]] | None = None,
+        key_prefix: str = "ratelimit:",
+        trusted_proxies: list | None = None,
+    ):
+        super().__init__(limits, trusted_proxies)
+        self.client = client
+        self.key_prefix = key_prefix
+        # EVALSHA, reloading the script if the server lost it
+        self.script = client.register_script(TOKEN_BUCKET)
+
+    async def hit(self, key: str, rate: float, burst: float, cost: int = 1) -> float:
+        try:
+            retry_after = await self.script(
+                keys=[self.key_prefix + key], args=[rate, burst, cost]
+            )
+        except Exception:
+            # a limiter outage must not become an API outage
+            self.errors += 1
+            logger.exception("rate limit check failed, allowing the request")
+            return 0.0
+        return float(retry_after)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def build_rate_limiter(redis_client=None) -> RateLimiter:
+    # `redis_client` must be a redis.asyncio client (or fakeredis.aioredis)
+    if not settings.RATE_LIMIT_ENABLED:
+        return RateLimiter()
+
+    limits = {name: parse_limit(spec) for name, spec in settings.RATE_LIMITS.items()}
+    proxies = [ipaddress.ip_network(cidr) for cidr in settings.RATE_LIMIT_TRUSTED_PROXIES]
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryRateLimiter(
+            limits, max_keys=settings.RATE_LIMIT_MAX_KEYS, trusted_proxies=proxies
+        )
+
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if redis_client is None:
+            import redis.asyncio
+
+            redis_client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+        return RedisRateLimiter(redis_client, limits, trusted_proxies=proxies)
+
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+
+
+rate_limiter = singleton(build_rate_limiter)
+
+
+def _trusted(address: str, networks: list) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(request: Request, trusted_proxies: list) -> str:
+    """
+    The peer address, or behind trusted proxies the rightmost
+    X-Forwarded-For hop they didn't add: hops left of it are whatever the
+    client chose to send.
+    """
+    host = request.client.host if request.client else "-"
+    if not _trusted(host, trusted_proxies):
+        return host
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",")]
+    hops = [hop for hop in hops if hop]
+    for hop in reversed(hops):
+        if not _trusted(hop, trusted_proxies):
+            return hop
+    # every hop is one of ours
+    return hops[0] if hops else host
+
+
+def _key(request: Request, scopes: tuple[str, ...], current_user: dict | None) -> str:
+    parts = []
+    for scope in scopes:
+        if scope == "user":
+            parts.append(current_user["email"])
+        elif scope == "ip":
+            parts.append(client_ip(request, rate_limiter.trusted_proxies))
+        elif scope == "interview":
+            parts.append(request.path_params.get("interview_id", "-"))
+    return ":".join(parts)
+
+
+def rate_limit(name: str, *scopes: str, cost=None):
+    """
+    Dependency charging a request to `name`'s bucket for these scopes: one
+    token, or `await cost(request)` tokens when a cost function is given.
+    """
+    unknown = set(scopes) - {"user", "ip", "interview"}
+    if unknown:
+        raise ValueError(f"Unknown rate limit scopes: {', '.join(sorted(unknown))}")
+    if "interview" in scopes and "user" not in scopes:
+        raise ValueError("The interview rate limit scope needs the user scope")
+
+    if "user" in scopes:
+        # shares the route's (cached) get_current_user resolution
+        async def limited_user(request: Request, current_user=Depends(get_current_user)):
+            tokens = await cost(request) if cost else 1
+            if "interview" in scopes:
+                await rate_limiter.check(f"{name}_user", current_user["email"], tokens)
+            await rate_limiter.check(name, _key(request, scopes, current_user), tokens)
+
+        return limited_user
+
+    async def limited(request: Request):
+        tokens = await cost(request) if cost else 1
+        await rate_limiter.check(name, _key(request, scopes, None), tokens)
+
+    return limited
@@ -0,0 +1,181 @@
+"""
+Moves interviews along their lifecycle when their time comes, instead of
+waiting for someone to PATCH them:
+
+- scheduled -> ongoing at scheduled_at
+- ongoing -> completed SCHEDULER_AUTO_COMPLETE_AFTER_MINUTES later (0: never)
+
+Upcoming transitions sit in a heap keyed by due time. The heap holds what
+falls due within SCHEDULER_HORIZON_SECONDS and is refilled from the
+(status, scheduled_at) index at startup and every half horizon; interviews
+created meanwhile are pushed by create_interview.
+
+Every worker may run one: the updates are conditional on the current
+status, so a transition applied elsewhere (or a manual PATCH) is simply
+not matched again.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+
+from bson import ObjectId
+
+from app.core.archive import archiver
+from app.core.cache import cache
+from app.core.config import settings, singleton
+from app.core.interview_lifecycle import TERMINAL_STATUSES, is_valid_transition
+from app.core.stats import record_status_change
+
+logger = logging.getLogger(__name__)
+
+
+def _utc(value: datetime) -> datetime:
+    # Mongo hands back naive UTC datetimes; API input may be aware
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class LifecycleScheduler:
+    def __init__(
+        self,
+        rules: list[tuple[str, str, timedelta]],
+        horizon_seconds: int = 3600,
+        batch_size: int = 500,
+    ):
+        # (from status, to status, delay after scheduled_at)
+        for from_status, to_status, _ in rules:
+            if not is_valid_transition(from_status, to_status):
+                raise ValueError(f"{from_status} -> {to_status} is not an allowed transition")
+        self.rules = rules
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self.batch_size = batch_size
+
+        # (due, interview_id, from status, to status, scheduled_at)
+        self.heap: list[tuple] = []
+        self.queued: set[tuple[str, str]] = set()
+        self.transitioned = 0
+        self._wake: asyncio.Event | None = None
+        self._task = None
+
+    def push(self, interview_id: str, status: str, scheduled_at: datetime | None):
+        """Queue the transitions a (new) interview will need within the horizon."""
+        # not started (SCHEDULER_ENABLED off): nothing would drain the heap
+        if scheduled_at is None or self._wake is None:
+            return
+        limit = datetime.now(timezone.utc) + self.horizon
+        for from_status, to_status, delay in self.rules:
+            due = _utc(scheduled_at) + delay
+            if from_status != status or due > limit or (interview_id, from_status) in self.queued:
+                continue
+            self.queued.add((interview_id, from_status))
+            heapq.heappush(self.heap, (due, interview_id, from_status, to_status, scheduled_at))
+            # new earliest entry: cut the scheduler's sleep short
+            if self.heap[0][0] == due:
+                self._wake.set()
+
+    async def load(self, database):
+        # one range read per rule on the (status, scheduled_at) index
+        now = datetime.now(timezone.utc)
+        for from_status, _, delay in self.rules:
+            cursor = database.interviews.find(
+                {"status": from_status, "scheduled_at": {"$lte": now + self.horizon - delay}},
+                {"status": 1, "scheduled_at": 1},
+            )
+            async for doc in cursor:
+                self.push(str(doc["_id"]), doc["status"], doc["scheduled_at"])
+
+    def _pop_due(self, now: datetime) -> list[tuple]:
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < self.batch_size:
+            entry = heapq.heappop(self.heap)
+            self.queued.discard((entry[1], entry[2]))
+            due.append(entry)
+        return due
+
+    async def apply(self, database, entries: list[tuple]) -> int:
+        """Apply due transitions with one update_many per (from, to) pair."""
+        modified = 0
+        by_rule = lambda entry: (entry[2], entry[3])
+        for (from_status, to_status), group in groupby(sorted(entries, key=by_rule), by_rule):
+            group = list(group)
+            ids = [ObjectId(entry[1]) for entry in group]
+            result = await database.interviews.update_many(
+                {"_id": {"$in": ids}, "status": from_status},
+                {"$set": {"status": to_status}},
+            )
+            if result.modified_count:
+                await record_status_change(from_status, to_status, result.modified_count)
+            modified += result.modified_count
+            # chain the next rule (ongoing -> completed) without waiting for
+            # a refill; it is conditional too if another worker got here first
+            for entry in group:
+                self.push(entry[1], to_status, entry[4])
+            if to_status in TERMINAL_STATUSES and settings.ARCHIVE_ON_TERMINAL:
+                # archive() skips interviews that didn't actually move
+                for entry in group:
+                    archiver.schedule(database, entry[1])
+
+        if modified:
+            # once per batch: lists and every single-interview entry
+            await cache.invalidate_namespace("interviews")
+            await cache.invalidate_namespace("interview")
+        self.transitioned += modified
+        return modified
+
+    async def start(self, database):
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(database))
+
+    async def _run(self, database):
+        refill_every = self.horizon / 2
+        next_refill = datetime.now(timezone.utc)
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                if now >= next_refill:
+                    next_refill = now + refill_every
+                    await self.load(database)
+                entries = self._pop_due(now)
+                if entries:
+                    await self.apply(database, entries)
+                    continue
+            except Exception:
+                logger.exception("lifecycle scheduler pass failed")
+
+            wake_at = min(self.heap[0][0], next_refill) if self.heap else next_refill
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), max((wake_at - now).total_seconds(), 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"queued": len(self.heap), "transitioned": self.transitioned}
+
+
+def build_scheduler() -> LifecycleScheduler:
+    rules = [("scheduled", "ongoing", timedelta(0))]
+    if settings.SCHEDULER_AUTO_COMPLETE_AFTER_MINUTES:
+        rules.append((
+            "ongoing",
+            "completed",
+            timedelta(minutes=settings.SCHEDULER_AUTO_COMPLETE_AFTER_MINUTES),
+        ))
+    return LifecycleScheduler(
+        rules,
+        horizon_seconds=settings.SCHEDULER_HORIZON_SECONDS,
+        batch_size=settings.SCHEDULER_BATCH_SIZE,
+    )
+
+
+lifecycle_scheduler = singleton(build_scheduler)
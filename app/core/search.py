@@ -0,0 +1,356 @@
+"""
+Full-text search over messages, behind one interface so deployments
+without Mongo text indexes can swap engines through SEARCH_BACKEND:
+
+- "mongo": $text queries on the messages content text index, ranked by
+  textScore (stemming and stop words are Mongo's)
+- "memory": an in-process inverted index ranked with BM25, built from
+  Mongo at startup, fed by create_message and caught up periodically with
+  messages other workers wrote
+
+Both search archived messages too (app/core/archive.py): "mongo" through
+the buckets' terms text index, "memory" by indexing unpacked buckets at
+startup and reading hits that have left messages back from their bucket.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import timedelta
+
+from bson import ObjectId
+
+from app.core.config import settings, singleton
+from app.db.mongo import db
+
+logger = logging.getLogger(__name__)
+
+# what a hit carries besides its score
+HIT_FIELDS = ("interview_id", "sender_email", "sender_role", "content", "created_at")
+
+TOKEN = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for if in into is it no not of on or such "
+    "that the their then there these they this to was will with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token for token in TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def text_score(content: str, terms: set[str]) -> float:
+    """
+    Mongo's textScore of `content` for `terms` (one field of weight 1,
+    without stemming), so archived messages rank among live hits: each
+    occurrence of a term adds half the previous one, and terms making up
+    more of a short message count more.
+    """
+    tokens = tokenize(content)
+    score = 0.0
+    for count in Counter(token for token in tokens if token in terms).values():
+        score += (2 - 0.5 ** (count - 1)) * (0.5 * count / len(tokens) + 0.5)
+    return score
+
+
+async def _bucketed(database, query: dict):
+    # archive imports tokenize from here
+    from app.core.archive import unpack
+
+    async for bucket in database.message_buckets.find(
+        query, {"interview_id": 1, "codec": 1, "data": 1}
+    ):
+        for message in unpack(bucket):
+            yield message
+
+
+def _hit(doc: dict, score: float) -> dict:
+    hit = {field: doc.get(field) for field in HIT_FIELDS}
+    hit["score"] = round(score, 4)
+    return hit
+
+
+class SearchEngine(ABC):
+    @abstractmethod
+    async def search(self, q: str, interview_id: str | None = None, limit: int = 20) -> list[dict]:
+        """Best `limit` messages for `q`, optionally within one interview."""
+
+    def index(self, docs: list[dict]):
+        """Called with freshly inserted messages (with their _id)."""
+
+    async def start(self, database):
+        pass
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MongoTextSearch(SearchEngine):
+    """
+    The text index is maintained by Mongo itself: index() has nothing to
+    do. It has no interview_id prefix, so the same index answers searches
+    across interviews; a per-interview search filters its matches on
+    interview_id, which reads every interview's entries for the words.
+    """
+
+    async def search(self, q: str, interview_id: str | None = None, limit: int = 20) -> list[dict]:
+        query = {"$text": {"$search": q}}
+        if interview_id is not None:
+            query["interview_id"] = interview_id
+        score = {"$meta": "textScore"}
+        docs = await (
+            db.messages
+            .find(query, {**dict.fromkeys(HIT_FIELDS, 1), "score": score})
+            .sort([("score", score)])
+            .limit(limit)
+        ).to_list(length=limit)
+        hits = {doc["_id"]: _hit(doc, doc["score"]) for doc in docs}
+
+        # archived messages: the buckets holding any of the words, scored
+        # message by message; one caught mid-archive is in both, once
+        terms = set(tokenize(q))
+        async for message in _bucketed(db, query):
+            if message["_id"] not in hits:
+                message_score = text_score(message["content"], terms)
+                if message_score:
+                    hits[message["_id"]] = _hit(message, message_score)
+        return heapq.nlargest(limit, hits.values(), key=lambda hit: hit["score"])
+
+
+class InvertedIndex(SearchEngine):
+    """
+    BM25 over message content.
+
+    Postings are flat arrays per term (doc numbers ascending, term
+    frequencies alongside) and each interview keeps its own doc numbers, so
+    a per-interview query bisects its few documents into the postings
+    instead of walking them. Only packed ids, lengths and postings are held
+    in memory; the winning messages are read back from Mongo with one $in,
+    and from their interviews' buckets once archived.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, refresh_seconds: float = 10):
+        self.k1 = k1
+        self.b = b
+        self.refresh_seconds = refresh_seconds
+        # term -> (doc numbers, term frequencies)
+        self.postings: dict[str, tuple[array, array]] = {}
+        # interview_id -> its doc numbers, ascending
+        self.interview_docs: dict[str, array] = {}
+        # doc number -> its interview's position in `interviews`
+        self.doc_interviews = array("I")
+        self.interviews: list[str] = []
+        self.interview_numbers: dict[str, int] = {}
+        # doc number -> token count / 12-byte message _id
+        self.lengths = array("I")
+        self.ids = bytearray()
+        self.total_length = 0
+        # ids added in the last refresh windows, so catch-up reads that
+        # overlap what's indexed don't add messages twice
+        self.recent: set[ObjectId] = set()
+        self.newest: ObjectId | None = None
+        self.ready = False
+        self._task = None
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def message_id(self, doc: int) -> ObjectId:
+        return ObjectId(bytes(self.ids[doc * 12:doc * 12 + 12]))
+
+    def add(self, message_id: ObjectId, interview_id: str, content: str):
+        if message_id in self.recent:
+            return
+        self.recent.add(message_id)
+        if self.newest is None or message_id > self.newest:
+            self.newest = message_id
+
+        doc = len(self.lengths)
+        tokens = tokenize(content)
+        self.ids += message_id.binary
+        self.lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        self.interview_docs.setdefault(interview_id, array("I")).append(doc)
+        number = self.interview_numbers.get(interview_id)
+        if number is None:
+            number = self.interview_numbers[interview_id] = len(self.interviews)
+            self.interviews.append(interview_id)
+        self.doc_interviews.append(number)
+        for term, tf in Counter(tokens).items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array("I"), array("I"))
+            postings[0].append(doc)
+            postings[1].append(tf)
+
+    def index(self, docs: list[dict]):
+        for doc in docs:
+            self.add(doc["_id"], doc["interview_id"], doc["content"])
+
+    def forget_before(self, cutoff: ObjectId):
+        self.recent = {message_id for message_id in self.recent if message_id >= cutoff}
+
+    def rank(self, q: str, interview_id: str | None = None, limit: int = 20) -> list[tuple[float, int]]:
+        """(score, doc number) of the best `limit` documents, best first."""
+        n = len(self.lengths)
+        if not n:
+            return []
+        k1, b = self.k1, self.b
+        lengths = self.lengths
+        avgdl = self.total_length / n or 1.0
+        scoped = self.interview_docs.get(interview_id, ()) if interview_id is not None else None
+
+        # norm(doc) = k1 * (1 - b + b * len / avgdl) = base + slope * len
+        base, slope = k1 * (1 - b), k1 * b / avgdl
+
+        terms = []
+        for term in set(tokenize(q)):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            if scoped is not None:
+                # an interview holds a handful of messages: look each up
+                matches = []
+                for doc in scoped:
+                    i = bisect_left(docs, doc)
+                    if i < len(docs) and docs[i] == doc:
+                        matches.append((doc, tfs[i]))
+            else:
+                matches = zip(docs, tfs)
+            terms.append((idf * (k1 + 1), matches))
+
+        if len(terms) == 1:
+            # one term: score straight into the heap, no accumulator
+            weight, matches = terms[0]
+            return heapq.nlargest(limit, (
+                (weight * tf / (tf + base + slope * lengths[doc]), doc)
+                for doc, tf in matches
+            ))
+
+        scores: dict[int, float] = {}
+        get = scores.get
+        for weight, matches in terms:
+            for doc, tf in matches:
+                scores[doc] = get(doc, 0.0) + weight * tf / (tf + base + slope * lengths[doc])
+        return heapq.nlargest(limit, ((score, doc) for doc, score in scores.items()))
+
+    async def search(self, q: str, interview_id: str | None = None, limit: int = 20) -> list[dict]:
+        ranked = self.rank(q, interview_id, limit)
+        if not ranked:
+            return []
+        ids = [self.message_id(doc) for _, doc in ranked]
+        docs = {
+            doc["_id"]: doc
+            async for doc in db.messages.find({"_id": {"$in": ids}}, dict.fromkeys(HIT_FIELDS, 1))
+        }
+        archived = {
+            self.interviews[self.doc_interviews[doc]]
+            for (_, doc), message_id in zip(ranked, ids)
+            if message_id not in docs
+        }
+        if archived:
+            wanted = set(ids) - docs.keys()
+            async for message in _bucketed(db, {"interview_id": {"$in": list(archived)}}):
+                if message["_id"] in wanted:
+                    docs[message["_id"]] = message
+
+        # messages deleted since they were indexed just drop out; one
+        # indexed both live and from its bucket is returned once
+        hits, seen = [], set()
+        for (score, _), message_id in zip(ranked, ids):
+            if message_id in docs and message_id not in seen:
+                seen.add(message_id)
+                hits.append(_hit(docs[message_id], score))
+        return hits
+
+    async def load(self, database, since: ObjectId | None = None) -> int:
+        """
+        Index every message (newer than `since`) in _id order; a full load
+        takes archived messages too. Messages archived after they were
+        indexed keep their postings, so catching up skips buckets.
+        """
+        query = {"_id": {"$gt": since}} if since else {}
+        count = 0
+        async for doc in database.messages.find(
+            query, {"interview_id": 1, "content": 1}
+        ).sort("_id", 1):
+            self.add(doc["_id"], doc["interview_id"], doc["content"])
+            count += 1
+            # stay responsive while indexing a large collection
+            if count % 10_000 == 0:
+                self.forget_before(self._window_start())
+                await asyncio.sleep(0)
+        if since is None:
+            bucket_count = 0
+            async for doc in _bucketed(database, {}):
+                self.add(doc["_id"], doc["interview_id"], doc["content"])
+                bucket_count += 1
+                if bucket_count % 10_000 == 0:
+                    self.forget_before(self._window_start())
+                    await asyncio.sleep(0)
+            count += bucket_count
+        return count
+
+    def _window_start(self, windows: int = 2) -> ObjectId | None:
+        # _ids come from the writers' clocks: messages committed out of
+        # order can land up to a refresh window behind the newest one
+        if self.newest is None:
+            return None
+        lookback = timedelta(seconds=windows * max(self.refresh_seconds, 1))
+        return ObjectId.from_datetime(self.newest.generation_time - lookback)
+
+    async def start(self, database):
+        self._task = asyncio.create_task(self._run(database))
+
+    async def _run(self, database):
+        start = time.perf_counter()
+        count = await self.load(database)
+        self.ready = True
+        logger.info("search index built: %d messages in %.1fs", count, time.perf_counter() - start)
+
+        while self.refresh_seconds:
+            await asyncio.sleep(self.refresh_seconds)
+            # re-reads the last window; `recent` drops what's already in
+            try:
+                await self.load(database, self._window_start(1))
+            except Exception:
+                logger.exception("search index refresh failed")
+            if self.newest is not None:
+                self.forget_before(self._window_start())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self.lengths),
+            "terms": len(self.postings),
+            "ready": self.ready,
+        }
+
+
+def build_search_engine() -> SearchEngine:
+    if settings.SEARCH_BACKEND == "mongo":
+        return MongoTextSearch()
+    if settings.SEARCH_BACKEND == "memory":
+        return InvertedIndex(refresh_seconds=settings.SEARCH_REFRESH_SECONDS)
+    raise ValueError(f"Unknown SEARCH_BACKEND: {settings.SEARCH_BACKEND}")
+
+
+search_engine = singleton(build_search_engine)
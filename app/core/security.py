@@ -1,9 +1,18 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
-from app.core.config import settings
+from app.core.config import settings, singleton
+from app.core.errors import api_error
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = singleton(lambda: CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+))
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -11,6 +20,85 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
+def verify_and_update_password(password: str, hashed: str) -> tuple[bool, str | None]:
+    # second item is a fresh hash when `hashed` used outdated argon2 parameters
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class HashingPool:
+    """
+    Runs argon2 in a dedicated, bounded pool so it never blocks the event
+    loop or the shared request threadpool. Once `workers + max_queue` jobs
+    are in flight new ones are shed with a 429 instead of queueing forever.
+    """
+
+    def __init__(self, workers: int, max_queue: int, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown PASSWORD_HASH_EXECUTOR: {kind}")
+        self.kind = kind
+        self.workers = workers
+        # started by the first hash, so importing this module stays cheap
+        self.executor = None
+        self.capacity = workers + max_queue
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _executor(self):
+        if self.executor is None:
+            if self.kind == "process":
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                # argon2-cffi releases the GIL while hashing
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="argon2"
+                )
+        return self.executor
+
+    async def run(self, fn, *args):
+        # only touched from the event loop thread, no lock needed
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            api_error(
+                status_code=429,
+                code="AUTH_BUSY",
+                message="Too many authentication requests, retry shortly",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "capacity": self.capacity,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+hashing_pool = singleton(lambda: HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+))
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_pool.run(hash_password, password)
+
+async def verify_and_update_password_async(
+    password: str, hashed: str
+) -> tuple[bool, str | None]:
+    return await hashing_pool.run(verify_and_update_password, password, hashed)
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=60)
@@ -0,0 +1,26 @@
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+# Mongo hands back naive datetimes that are UTC; say so in the output, with
+# the same "Z" suffix pydantic writes
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def raw_json(body: bytes, status_code: int = 200) -> Response:
+    """
+    Send already-serialized JSON as is. Returning a Response skips
+    response_model validation, so only use it for payloads built from
+    trusted DB documents in the response_model's shape.
+    """
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -0,0 +1,195 @@
+"""
+Dashboard counters, kept current with $inc on every write so reading them
+costs the same whatever the collection sizes.
+
+    interview_counters  {_id: "total" | "messages" | "status:<s>" |
+                              "interview_type:<t>", count}
+                        {_id: "reconciled", at}
+    message_counters    {_id: <interview_id>, count}
+
+    python -m app.core.stats    # rebuild once (cron), or set
+                                # STATS_RECONCILE_INTERVAL_SECONDS
+
+Dimension values live in _id rather than in field names, so user supplied
+interview types can't collide with Mongo's dotted paths. The counters are
+not updated transactionally with the documents they count and a failed
+update is logged rather than failing the write it follows; reconcile()
+rebuilds them from the source collections and should run periodically.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import DESCENDING, UpdateOne
+
+from app.db.mongo import db
+
+logger = logging.getLogger(__name__)
+
+TOTAL = "total"
+MESSAGES = "messages"
+RECONCILED = "reconciled"
+BATCH = 1_000
+
+
+async def _inc(collection, amounts: dict[str, int]):
+    ops = [
+        UpdateOne({"_id": key}, {"$inc": {"count": amount}}, upsert=True)
+        for key, amount in amounts.items()
+        if amount
+    ]
+    if not ops:
+        return
+    try:
+        await collection.bulk_write(ops, ordered=False)
+    except Exception:
+        # the document write already succeeded; reconcile() fixes the drift
+        logger.exception("counter update on %s failed", collection.name)
+
+
+async def record_interview_created(doc: dict):
+    await _inc(db.interview_counters, {
+        TOTAL: 1,
+        f"status:{doc['status']}": 1,
+        f"interview_type:{doc['interview_type']}": 1,
+    })
+
+
+async def record_status_change(old_status: str, new_status: str, count: int = 1):
+    await _inc(db.interview_counters, {
+        f"status:{old_status}": -count,
+        f"status:{new_status}": count,
+    })
+
+
+async def record_messages(docs: list[dict]):
+    """Count inserted messages: one $inc per interview, both collections at once."""
+    per_interview = {}
+    for doc in docs:
+        per_interview[doc["interview_id"]] = per_interview.get(doc["interview_id"], 0) + 1
+    await asyncio.gather(
+        _inc(db.message_counters, per_interview),
+        _inc(db.interview_counters, {MESSAGES: len(docs)}),
+    )
+
+
+async def read_stats(top: int = 10) -> dict:
+    """
+    Counts by status and interview type, total messages and the `top`
+    interviews by message volume: one small find per counter collection.
+    """
+    stats = {
+        "interviews": 0,
+        "messages": 0,
+        "by_status": {},
+        "by_type": {},
+        "top_interviews": [],
+        "reconciled_at": None,
+    }
+    async for doc in db.interview_counters.find({}):
+        key = doc["_id"]
+        if key == TOTAL:
+            stats["interviews"] = doc["count"]
+        elif key == MESSAGES:
+            stats["messages"] = doc["count"]
+        elif key == RECONCILED:
+            stats["reconciled_at"] = doc["at"]
+        else:
+            dimension, _, value = key.partition(":")
+            if doc["count"]:
+                target = stats["by_status"] if dimension == "status" else stats["by_type"]
+                target[value] = doc["count"]
+
+    # uses the count index
+    stats["top_interviews"] = [
+        {"interview_id": doc["_id"], "messages": doc["count"]}
+        async for doc in db.message_counters.find({}).sort("count", DESCENDING).limit(top)
+    ]
+    return stats
+
+
+async def reconcile(database) -> dict:
+    """
+    Rebuild every counter from the source collections with aggregations.
+
+    Increments that land while this runs may be counted twice or not at
+    all; the next run corrects them. Returns the rebuilt totals.
+    """
+    counts = {TOTAL: 0, MESSAGES: 0}
+    async for row in await database.interviews.aggregate([
+        {"$group": {
+            "_id": {"status": "$status", "interview_type": "$interview_type"},
+            "count": {"$sum": 1},
+        }},
+    ]):
+        status, interview_type = row["_id"]["status"], row["_id"]["interview_type"]
+        counts[TOTAL] += row["count"]
+        counts[f"status:{status}"] = counts.get(f"status:{status}", 0) + row["count"]
+        counts[f"interview_type:{interview_type}"] = (
+            counts.get(f"interview_type:{interview_type}", 0) + row["count"]
+        )
+
+    per_interview = {}
+    async for row in await database.messages.aggregate([
+        {"$group": {"_id": "$interview_id", "count": {"$sum": 1}}},
+    ]):
+        per_interview[row["_id"]] = row["count"]
+        counts[MESSAGES] += row["count"]
+    # archived messages (app/core/archive.py) live in buckets
+    async for row in await database.message_buckets.aggregate([
+        {"$group": {"_id": "$interview_id", "count": {"$sum": "$count"}}},
+    ]):
+        per_interview[row["_id"]] = per_interview.get(row["_id"], 0) + row["count"]
+        counts[MESSAGES] += row["count"]
+
+    run = ObjectId()
+    await _replace(database.interview_counters, counts, run)
+    await database.interview_counters.update_one(
+        {"_id": RECONCILED},
+        {"$set": {"at": datetime.now(timezone.utc), "run": run}},
+        upsert=True,
+    )
+    await _replace(database.message_counters, per_interview, run)
+    return counts
+
+
+async def _replace(collection, counts: dict, run: ObjectId):
+    # $set, not $inc: the aggregation result is the new truth
+    items = list(counts.items())
+    for first in range(0, len(items), BATCH):
+        await collection.bulk_write(
+            [
+                UpdateOne({"_id": key}, {"$set": {"count": count, "run": run}}, upsert=True)
+                for key, count in items[first:first + BATCH]
+            ],
+            ordered=False,
+        )
+    # counters an earlier run wrote that have no source documents left;
+    # ones created by $inc since this run started carry no run and stay
+    await collection.delete_many({"run": {"$exists": True, "$ne": run}})
+
+
+async def reconcile_forever(database, interval: float):
+    # started from the app lifespan when STATS_RECONCILE_INTERVAL_SECONDS > 0
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile(database)
+        except Exception:
+            logger.exception("stats reconciliation failed")
+
+
+async def main() -> int:
+    from app.db.mongo import client
+
+    try:
+        counts = await reconcile(db)
+        print(f"reconciled {counts[TOTAL]} interviews, {counts[MESSAGES]} messages")
+        return 0
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
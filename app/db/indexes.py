@@ -0,0 +1,346 @@
+"""
+Declared indexes for every collection and a check that the queries the
+routers issue actually use them.
+
+    python -m app.db.indexes apply     # create missing indexes (idempotent)
+    python -m app.db.indexes verify    # explain() every query shape, exit 1
+                                       # on COLLSCAN or in-memory SORT
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.core.interview_lifecycle import TERMINAL_STATUSES
+from app.core.pagination import encode_cursor, keyset_filter, keyset_sort
+
+# _id closes every sort index: it is the keyset pagination tie-breaker
+INDEXES = {
+    "interviews": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_created_at_id",
+        ),
+        IndexModel(
+            [("interview_type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="type_created_at_id",
+        ),
+        IndexModel(
+            [
+                ("status", ASCENDING),
+                ("interview_type", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            name="status_type_created_at_id",
+        ),
+        # scheduled_from/scheduled_to listings and the lifecycle scheduler
+        IndexModel(
+            [("status", ASCENDING), ("scheduled_at", ASCENDING), ("_id", ASCENDING)],
+            name="status_scheduled_at_id",
+        ),
+        # the same windows without a status filter
+        IndexModel([("scheduled_at", ASCENDING), ("_id", ASCENDING)], name="scheduled_at_id"),
+        # finished interviews not archived yet (archive_pending): a missing
+        # archived_at is indexed as null
+        IndexModel([("status", ASCENDING), ("archived_at", ASCENDING)], name="status_archived_at"),
+    ],
+    "participants": [
+        IndexModel(
+            [("interview_id", ASCENDING), ("user_email", ASCENDING)],
+            name="interview_user",
+            unique=True,
+        ),
+        # a user's memberships (/v1/users/me/interviews), covered
+        IndexModel(
+            [("user_email", ASCENDING), ("interview_id", ASCENDING)],
+            name="user_interview",
+        ),
+    ],
+    "messages": [
+        IndexModel(
+            [("interview_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="interview_created_at_id",
+        ),
+        # /messages/search with SEARCH_BACKEND=mongo. A collection gets one
+        # text index; without a prefix it serves the admin search across
+        # interviews too, and a per-interview search filters the matches
+        # on interview_id (an interview_id prefix would make that
+        # equality mandatory for every $text query).
+        IndexModel([("content", TEXT)], name="content_text"),
+    ],
+    # archived messages, read in seq order per interview
+    "message_buckets": [
+        IndexModel(
+            [("interview_id", ASCENDING), ("seq", ASCENDING)],
+            name="interview_seq",
+            unique=True,
+        ),
+        # search over archived messages: a bucket's distinct words
+        IndexModel([("terms", TEXT)], name="terms_text"),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email", unique=True),
+    ],
+    # top interviews by message volume on /v1/interviews/stats
+    "message_counters": [
+        IndexModel([("count", DESCENDING)], name="count"),
+    ],
+}
+
+
+async def ensure_indexes(database) -> dict[str, list[str]]:
+    """
+    Create every declared index that is missing. Safe to run on every
+    start: existing indexes with the same definition are left alone.
+    Returns the undeclared indexes found, which are reported but never
+    dropped automatically.
+    """
+    undeclared = {}
+    for collection, models in INDEXES.items():
+        for model in models:
+            try:
+                await database[collection].create_indexes([model])
+            except OperationFailure as exc:
+                # 85: same keys already indexed under another name
+                if exc.code != 85:
+                    raise
+
+        declared = {model.document["name"] for model in models} | {"_id_"}
+        existing = [
+            index["name"] async for index in await database[collection].list_indexes()
+        ]
+        extra = [name for name in existing if name not in declared]
+        if extra:
+            undeclared[collection] = extra
+    return undeclared
+
+
+async def missing_indexes(database) -> dict[str, list[str]]:
+    """Declared indexes that don't exist, by collection. Read-only."""
+    missing = {}
+    for collection, models in INDEXES.items():
+        existing = {
+            index["name"] async for index in await database[collection].list_indexes()
+        }
+        names = [
+            model.document["name"] for model in models
+            if model.document["name"] not in existing
+        ]
+        if names:
+            missing[collection] = names
+    return missing
+
+
+def query_shapes() -> list[dict]:
+    """
+    The find() shapes the routers issue, with placeholder values. Keep in
+    sync with app/api/v1 when a query changes.
+    """
+    interview_id = str(ObjectId())
+    member_ids = [ObjectId() for _ in range(3)]
+    cursor = encode_cursor({"created_at": datetime.now(timezone.utc), "_id": ObjectId()})
+
+    def interviews(name, filter):
+        return {
+            "name": name,
+            "collection": "interviews",
+            "filter": filter,
+            "sort": keyset_sort(-1),
+            "limit": 21,
+        }
+
+    def messages(name, filter, limit=21):
+        return {
+            "name": name,
+            "collection": "messages",
+            "filter": {"interview_id": interview_id, **filter},
+            "sort": keyset_sort(1),
+            "limit": limit,
+        }
+
+    return [
+        interviews("list_interviews", {}),
+        interviews("list_interviews_cursor", keyset_filter(cursor, -1)),
+        interviews("list_interviews_status", {"status": "scheduled"}),
+        interviews("list_interviews_status_cursor", {"status": "scheduled", **keyset_filter(cursor, -1)}),
+        interviews("list_interviews_type", {"interview_type": "technical"}),
+        interviews(
+            "list_interviews_status_type",
+            {"status": "scheduled", "interview_type": "technical"},
+        ),
+        {
+            "name": "list_interviews_scheduled_window",
+            "collection": "interviews",
+            "filter": {
+                "status": "scheduled",
+                "scheduled_at": {"$gte": datetime.now(timezone.utc), "$lt": datetime.now(timezone.utc)},
+            },
+            "sort": keyset_sort(1, "scheduled_at"),
+            "limit": 21,
+        },
+        {
+            "name": "list_interviews_scheduled_window_all",
+            "collection": "interviews",
+            "filter": {
+                "scheduled_at": {"$gte": datetime.now(timezone.utc), "$lt": datetime.now(timezone.utc)},
+            },
+            "sort": keyset_sort(1, "scheduled_at"),
+            "limit": 21,
+        },
+        {
+            "name": "scheduler_due",
+            "collection": "interviews",
+            "filter": {"status": "scheduled", "scheduled_at": {"$lte": datetime.now(timezone.utc)}},
+        },
+        {"name": "get_interview", "collection": "interviews", "filter": {"_id": ObjectId()}},
+        {
+            "name": "interview_access",
+            "collection": "participants",
+            "filter": {"interview_id": interview_id, "user_email": "user@example.com"},
+            "limit": 1,
+        },
+        {
+            "name": "user_memberships",
+            "collection": "participants",
+            "filter": {"user_email": "user@example.com"},
+            "projection": {"_id": 0, "interview_id": 1},
+        },
+        {
+            "name": "user_interviews",
+            "collection": "interviews",
+            "filter": {"_id": {"$in": member_ids}},
+            "sort": [("_id", DESCENDING)],
+            "limit": 21,
+        },
+        {
+            "name": "user_interviews_status",
+            "collection": "interviews",
+            "filter": {"_id": {"$in": member_ids}, "status": "scheduled"},
+            "sort": [("_id", DESCENDING)],
+            "limit": 21,
+        },
+        {
+            "name": "archive_pending",
+            "collection": "interviews",
+            "filter": {
+                "status": {"$in": list(TERMINAL_STATUSES)},
+                "archived_at": {"$exists": False},
+            },
+            "projection": {"_id": 1},
+        },
+        messages("list_messages", {}),
+        messages("list_messages_cursor", keyset_filter(cursor, 1)),
+        messages("export_messages", {}, limit=0),
+        {
+            "name": "archived_message_buckets",
+            "collection": "message_buckets",
+            "filter": {"interview_id": interview_id},
+            "sort": [("seq", ASCENDING)],
+        },
+        {
+            "name": "search_messages",
+            "collection": "messages",
+            "filter": {"$text": {"$search": "design"}, "interview_id": interview_id},
+        },
+        {
+            "name": "search_messages_all",
+            "collection": "messages",
+            "filter": {"$text": {"$search": "design"}},
+        },
+        {
+            "name": "search_message_buckets",
+            "collection": "message_buckets",
+            "filter": {"$text": {"$search": "design"}, "interview_id": interview_id},
+        },
+        {
+            "name": "search_message_buckets_all",
+            "collection": "message_buckets",
+            "filter": {"$text": {"$search": "design"}},
+        },
+        {"name": "auth_user", "collection": "users", "filter": {"email": "user@example.com"}},
+        {
+            "name": "stats_top_interviews",
+            "collection": "message_counters",
+            "filter": {},
+            "sort": [("count", DESCENDING)],
+            "limit": 10,
+        },
+    ]
+
+
+def _stages(plan: dict) -> list[str]:
+    # newer servers wrap the classic plan in {"queryPlan": ...}
+    plan = plan.get("queryPlan", plan)
+    stages = [plan.get("stage")]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages.extend(_stages(child))
+    return [stage for stage in stages if stage]
+
+
+async def verify_query_shapes(database) -> list[dict]:
+    """
+    explain() every router query shape. A shape passes when its winning
+    plan has no COLLSCAN and no blocking SORT stage.
+    """
+    report = []
+    for shape in query_shapes():
+        cursor = database[shape["collection"]].find(shape["filter"], shape.get("projection"))
+        if shape.get("sort"):
+            cursor = cursor.sort(shape["sort"])
+        if shape.get("limit"):
+            cursor = cursor.limit(shape["limit"])
+
+        explain = await cursor.explain()
+        stages = _stages(explain["queryPlanner"]["winningPlan"])
+        collscan = "COLLSCAN" in stages
+        in_memory_sort = "SORT" in stages
+        report.append({
+            "name": shape["name"],
+            "collection": shape["collection"],
+            "stages": stages,
+            "collscan": collscan,
+            "in_memory_sort": in_memory_sort,
+            "ok": not (collscan or in_memory_sort),
+        })
+    return report
+
+
+async def main(args) -> int:
+    from app.db.mongo import client, db
+
+    try:
+        if args.command == "apply":
+            undeclared = await ensure_indexes(db)
+            print("Indexes created successfully")
+            for collection, names in undeclared.items():
+                print(f"undeclared indexes on {collection}: {', '.join(names)}")
+            return 0
+
+        report = await verify_query_shapes(db)
+        for row in report:
+            flags = [f for f in ("collscan", "in_memory_sort") if row[f]]
+            print(
+                f"{'ok' if row['ok'] else 'FAIL':<5}{row['name']:<32}"
+                f"{' > '.join(row['stages']):<40}{', '.join(flags)}"
+            )
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0 if all(row["ok"] for row in report) else 1
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["apply", "verify"])
+    parser.add_argument("--json", help="also write the verify report here")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,6 +1,92 @@
-from pymongo import MongoClient
+"""
+The client is built on first use rather than at import, so importing a
+router neither reads the MONGO_* settings nor creates a client bound to
+whichever event loop happens to be around. `client` and `db` stand in for
+the real objects until then; use_client() points them elsewhere (a scratch
+database, mongomock) and close_client() lets the next use start afresh.
+"""
+import asyncio
+
 from app.core.config import settings
 
-client = MongoClient(settings.MONGO_URI)
-db = client[settings.MONGO_DB]
+_client = None
+_db = None
+
+
+def build_client():
+    from pymongo import AsyncMongoClient
+
+    from app.core.metrics import mongo_listener
+
+    return AsyncMongoClient(
+        settings.MONGO_URI,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        readPreference=settings.MONGO_READ_PREFERENCE,
+        event_listeners=[mongo_listener] if settings.METRICS_ENABLED else [],
+    )
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = build_client()
+    return _client
+
+
+def get_db():
+    global _db
+    if _db is None:
+        _db = get_client()[settings.MONGO_DB_NAME]
+    return _db
+
+
+def use_client(client, name: str | None = None):
+    global _client, _db
+    _client = client
+    _db = client[name or settings.MONGO_DB_NAME]
+
+
+async def prewarm(connections: int = 0):
+    """
+    Ping until `connections` pooled connections are open (at least one):
+    concurrent pings each check out their own connection.
+    """
+    admin = get_client().admin
+    await admin.command("ping")
+    if connections > 1:
+        await asyncio.gather(*(admin.command("ping") for _ in range(connections)))
+
+
+async def close_client():
+    global _client, _db
+    if _client is not None:
+        await _client.close()
+    _client = _db = None
+
+
+class lazy:
+    """Forwards attribute and item access to resolve()'s result."""
+
+    __slots__ = ("_resolve",)
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, name):
+        return self._resolve()[name]
+
+    def __repr__(self):
+        return f"lazy({self._resolve()!r})"
+
 
+client = lazy(get_client)
+db = lazy(get_db)
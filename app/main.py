@@ -1,14 +1,147 @@
+"""
+    uvicorn app.main:app                    # module level app, built on first access
+    uvicorn --factory app.main:create_app   # a fresh app per server
+
+Importing this module is cheap: routers, and the clients, caches and pools
+they hold, are imported by create_app(), and Mongo is connected by the
+lifespan, not at import.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.api.v1.auth import router as auth_router
-from app.api.v1.users import router as users_router
-from app.api.v1.interview import router as interview_router
-from app.api.v1.participants import router as participants_router
-from app.api.v1.messages import router as messages_router
-
-app = FastAPI(title="FastAPI Backend")
-
-app.include_router(auth_router)
-app.include_router(users_router)
-app.include_router(interview_router)
-app.include_router(participants_router)
-app.include_router(messages_router)
\ No newline at end of file
+
+from app.core.config import Settings, settings, use_settings
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.api.v1.interview import warm_interview_cache
+    from app.core.archive import archiver
+    from app.core.broker import broker
+    from app.core.cache import cache
+    from app.core.ingest import message_writer
+    from app.core.ratelimit import rate_limiter
+    from app.core.scheduler import lifecycle_scheduler
+    from app.core.search import search_engine
+    from app.core.security import hashing_pool
+    from app.core.stats import reconcile_forever
+    from app.db import mongo
+    from app.db.indexes import ensure_indexes, missing_indexes
+
+    timings = app.state.startup = {}
+    start = time.perf_counter()
+    # open the pool now rather than on the first requests; a worker that
+    # can't reach Mongo fails here instead of serving errors
+    await mongo.prewarm(settings.MONGO_PREWARM_CONNECTIONS)
+    timings["mongo_seconds"] = time.perf_counter() - start
+
+    mark = time.perf_counter()
+    if settings.MONGO_ENSURE_INDEXES:
+        await ensure_indexes(mongo.db)
+    elif settings.MONGO_VERIFY_INDEXES:
+        try:
+            for collection, names in (await missing_indexes(mongo.db)).items():
+                logger.warning(
+                    "missing indexes on %s: %s (python -m app.db.indexes apply)",
+                    collection, ", ".join(names),
+                )
+        except Exception:
+            logger.exception("index verification failed")
+    timings["indexes_seconds"] = time.perf_counter() - mark
+
+    await cache.start()
+    await search_engine.start(mongo.db)
+    if settings.SCHEDULER_ENABLED:
+        await lifecycle_scheduler.start(mongo.db)
+    reconciler = None
+    if settings.STATS_RECONCILE_INTERVAL_SECONDS:
+        reconciler = asyncio.create_task(
+            reconcile_forever(mongo.db, settings.STATS_RECONCILE_INTERVAL_SECONDS)
+        )
+
+    if settings.CACHE_WARM_ON_STARTUP:
+        mark = time.perf_counter()
+        try:
+            timings["cache_entries_warmed"] = await warm_interview_cache(
+                settings.CACHE_WARM_INTERVIEWS
+            )
+        except Exception:
+            logger.exception("cache warm-up failed")
+        timings["cache_warm_seconds"] = time.perf_counter() - mark
+
+    timings["total_seconds"] = time.perf_counter() - start
+    logger.info("startup: %s", ", ".join(f"{k}={v:.3g}" for k, v in timings.items()))
+
+    try:
+        yield
+    finally:
+        # producers first, then what they write through, the client last
+        if reconciler is not None:
+            reconciler.cancel()
+        await lifecycle_scheduler.close()
+        await archiver.close()
+        await search_engine.close()
+        await message_writer.close()
+        await broker.close()
+        await rate_limiter.close()
+        await cache.close()
+        hashing_pool.shutdown()
+        await mongo.close_client()
+
+
+def create_app(config: Settings | None = None) -> FastAPI:
+    """
+    Build the application. `config` replaces the environment settings;
+    module level objects (cache, broker, pools) are rebuilt from it on
+    their next use.
+    """
+    if config is not None:
+        use_settings(config)
+
+    from app.api.metrics import router as metrics_router
+    from app.api.v1.auth import router as auth_router
+    from app.api.v1.interview import router as interview_router
+    from app.api.v1.messages import router as messages_router
+    from app.api.v1.participants import router as participants_router
+    from app.api.v1.profiles import router as profiles_router
+    from app.api.v1.search import router as search_router
+    from app.api.v1.users import router as users_router
+    from app.core.metrics import MetricsMiddleware
+    from app.core.profiling import ProfilingMiddleware
+    from app.core.serialization import FastJSONResponse
+
+    app = FastAPI(
+        title="FastAPI Backend",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
+
+    app.include_router(auth_router)
+    app.include_router(users_router)
+    app.include_router(interview_router)
+    app.include_router(participants_router)
+    app.include_router(messages_router)
+    app.include_router(search_router)
+
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+        app.include_router(profiles_router)
+
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+
+    return app
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` and `from app.main import app` keep working
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
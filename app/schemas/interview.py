@@ -18,5 +18,48 @@ class InterviewOut(BaseModel):
     created_by: str
     created_at: datetime
 
+
+# fields InterviewOut needs; nothing else comes over the wire
+INTERVIEW_FIELDS = {
+    "title": 1,
+    "interview_type": 1,
+    "status": 1,
+    "scheduled_at": 1,
+    "created_by": 1,
+    "created_at": 1,
+}
+
+
+def interview_out(doc: dict) -> dict:
+    # an interviews document read with INTERVIEW_FIELDS, in InterviewOut's shape
+    return {
+        "id": str(doc["_id"]),
+        "title": doc["title"],
+        "interview_type": doc["interview_type"],
+        "status": doc["status"],
+        "scheduled_at": doc.get("scheduled_at"),
+        "created_by": doc["created_by"],
+        "created_at": doc["created_at"],
+    }
+
+
+class InterviewPage(BaseModel):
+    items: list[InterviewOut]
+    next_cursor: Optional[str] = None
+
 class InterviewStatusUpdate(BaseModel):
     status: str
+
+
+class InterviewMessageCount(BaseModel):
+    interview_id: str
+    messages: int
+
+
+class InterviewStats(BaseModel):
+    interviews: int
+    messages: int
+    by_status: dict[str, int]
+    by_type: dict[str, int]
+    top_interviews: list[InterviewMessageCount]
+    reconciled_at: Optional[datetime] = None
@@ -1,15 +1,33 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 
 class MessageCreate(BaseModel):
     content: str
 
 
+class MessageBatchCreate(BaseModel):
+    messages: list[MessageCreate] = Field(min_length=1)
+
+
 class MessageOut(BaseModel):
     interview_id: str
     sender_email: str
     sender_role: str
     content: str
-    created_at: str
+    created_at: datetime
+
+
+class MessagePage(BaseModel):
+    items: list[MessageOut]
+    next_cursor: Optional[str] = None
+
+
+class MessageSearchHit(MessageOut):
+    score: float
+
+
+class MessageSearchResults(BaseModel):
+    items: list[MessageSearchHit]
 
 
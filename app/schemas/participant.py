@@ -1,6 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
 
+from app.core.config import settings
+
 
 class ParticipantCreate(BaseModel):
     user_email: EmailStr
@@ -12,3 +14,25 @@ class ParticipantOut(BaseModel):
     user_email: EmailStr
     participant_role: str
     added_at: datetime
+
+
+class ParticipantBulkCreate(BaseModel):
+    participants: list[ParticipantCreate] = Field(min_length=1)
+
+    # read at validation time, not import, so settings stay swappable
+    @field_validator("participants")
+    @classmethod
+    def cap_size(cls, participants: list[ParticipantCreate]) -> list[ParticipantCreate]:
+        if len(participants) > settings.PARTICIPANT_BULK_MAX_SIZE:
+            raise ValueError(
+                f"At most {settings.PARTICIPANT_BULK_MAX_SIZE} participants per request"
+            )
+        return participants
+
+
+class ParticipantBulkOut(BaseModel):
+    added: list[ParticipantOut]
+    # already participants (or listed twice); nothing was written for them
+    duplicates: list[EmailStr]
+    # rows the database rejected for another reason (answered with 207)
+    failed: list[EmailStr] = []
@@ -0,0 +1,117 @@
+"""
+Storage saved by message archival: seed a scratch database, finish every
+interview, archive them and compare collection and index sizes.
+
+    python -m app.scripts.bench_archive --interviews 2000 --messages 200
+    python -m app.scripts.bench_archive --codec zstd --compact
+
+Seeds <MONGO_DB_NAME>_bench on MONGO_URI and drops it afterwards unless
+--keep is given. WiredTiger keeps the space freed by deletes for reuse
+rather than returning it, so messages' storageSize and index sizes only
+shrink on disk after `compact` (--compact runs it; it blocks the
+collection while it does).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.core.archive import MessageArchiver
+from app.core.config import settings
+
+COLLECTIONS = ("messages", "message_buckets")
+
+
+async def sizes(database) -> dict:
+    result = {}
+    for name in COLLECTIONS:
+        stats = await database.command("collStats", name)
+        result[name] = {
+            "count": stats.get("count", 0),
+            "size": stats.get("size", 0),
+            "storage": stats.get("storageSize", 0),
+            "indexes": stats.get("totalIndexSize", 0),
+        }
+    result["total"] = {
+        key: sum(result[name][key] for name in COLLECTIONS)
+        for key in ("count", "size", "storage", "indexes")
+    }
+    return result
+
+
+def mb(value: int) -> str:
+    return f"{value / 1024 / 1024:10.1f} MB"
+
+
+def report(before: dict, after: dict):
+    print(f"{'':<26}{'before':>13}{'after':>13}{'saved':>9}")
+    rows = (("size", "data (uncompressed)"), ("storage", "storage"), ("indexes", "indexes"))
+    for key, label in rows:
+        for name in COLLECTIONS + ("total",):
+            old, new = before[name][key], after[name][key]
+            saved = f"{(1 - new / old) * 100:8.1f}%" if old and name == "total" else ""
+            print(f"{label + ' ' + name:<26}{mb(old)}{mb(new)} {saved}")
+    print(
+        f"{'documents':<26}{before['total']['count']:>13}{after['total']['count']:>13}"
+    )
+
+
+async def main(args):
+    from app.db.indexes import ensure_indexes
+    from app.db.mongo import client, close_client
+    from app.scripts.seed import seed
+
+    database = client[args.db]
+    await client.drop_database(args.db)
+    await ensure_indexes(database)
+    await seed(
+        database,
+        users=args.users,
+        interviews=args.interviews,
+        participants=args.participants,
+        messages=args.messages,
+        rng=random.Random(args.seed),
+    )
+    # archival only takes finished interviews
+    await database.interviews.update_many({}, {"$set": {"status": "completed"}})
+    before = await sizes(database)
+
+    archiver = MessageArchiver(
+        bucket_messages=args.bucket_messages,
+        bucket_max_bytes=settings.ARCHIVE_BUCKET_MAX_BYTES,
+        codec=args.codec,
+    )
+    start = time.perf_counter()
+    await archiver.archive_pending(database)
+    elapsed = time.perf_counter() - start
+    if args.compact:
+        for name in COLLECTIONS:
+            await database.command("compact", name)
+    after = await sizes(database)
+
+    stats = archiver.stats()
+    print(
+        f"archived {stats['messages_archived']} messages into {stats['buckets_written']} "
+        f"{args.codec} buckets in {elapsed:.1f}s, "
+        f"bucket payload {stats['raw_bytes'] / max(stats['compressed_bytes'], 1):.1f}x smaller"
+    )
+    report(before, after)
+
+    if not args.keep:
+        await client.drop_database(args.db)
+    await close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=f"{settings.MONGO_DB_NAME}_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--interviews", type=int, default=2_000)
+    parser.add_argument("--participants", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--bucket-messages", type=int, default=settings.ARCHIVE_BUCKET_MESSAGES)
+    parser.add_argument("--codec", choices=["zlib", "zstd"], default=settings.ARCHIVE_CODEC)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(main(parser.parse_args()))
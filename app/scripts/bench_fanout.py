@@ -0,0 +1,78 @@
+"""
+Fan-out cost of the live message broker with N concurrent subscribers on
+one interview: publish-to-receive latency per delivery and deliveries/s.
+
+    python -m app.scripts.bench_fanout --subscribers 10 100 1000 --messages 200
+
+Runs the in-process broker only; pass --slow to add one consumer that
+never reads and check it is cut off without slowing the others.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.broker import MessageBroker
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(subscribers: int, messages: int, queue_size: int, slow: bool):
+    broker = MessageBroker(queue_size=queue_size)
+    latencies: list[float] = []
+
+    async def consume(subscription):
+        for _ in range(messages):
+            message = await subscription.get()
+            if message is None:
+                return
+            latencies.append(time.perf_counter() - message["sent"])
+        subscription.close()
+
+    consumers = [
+        asyncio.create_task(consume(broker.subscribe("bench")))
+        for _ in range(subscribers)
+    ]
+    stalled = broker.subscribe("bench") if slow else None
+
+    start = time.perf_counter()
+    for i in range(messages):
+        await broker.publish("bench", {"n": i, "sent": time.perf_counter()})
+        # let consumers drain, like awaiting the insert in create_message would
+        await asyncio.sleep(0)
+    await asyncio.gather(*consumers)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "deliveries/s": len(latencies) / elapsed,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "delivered": len(latencies),
+    }
+    if stalled is not None:
+        result["slow_consumer_dropped"] = stalled.overflowed
+    return result
+
+
+async def main(args):
+    for subscribers in args.subscribers:
+        r = await run(subscribers, args.messages, args.queue_size, args.slow)
+        line = (
+            f"{subscribers:>6} subs  {r['deliveries/s']:>12.0f} deliveries/s"
+            f"  p50 {r['p50_us']:>9.1f}us  p99 {r['p99_us']:>9.1f}us"
+        )
+        if args.slow:
+            line += f"  slow consumer dropped: {r['slow_consumer_dropped']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--slow", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+"""
+Compare how many concurrent Mongo round trips a worker can keep in flight
+with the old blocking client (one threadpool slot per query, capped like
+FastAPI's default 40-thread limiter) versus the async client.
+
+    python -m app.scripts.bench_mongo_concurrency --requests 5000 \
+        --concurrency 10 50 200 500
+
+Needs a reachable MONGO_URI; seeds a small scratch collection and drops it
+afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import anyio
+from pymongo import AsyncMongoClient, MongoClient
+
+from app.core.config import settings
+
+COLLECTION = "bench_concurrency"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index]
+
+
+async def run_sync_client(collection, ids, concurrency, total, threads):
+    limiter = anyio.CapacityLimiter(threads)
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        await anyio.to_thread.run_sync(
+            collection.find_one, {"_id": ids[i % len(ids)]}, limiter=limiter
+        )
+        latencies.append(time.perf_counter() - start)
+
+    return await drive(one, concurrency, total, latencies)
+
+
+async def run_async_client(collection, ids, concurrency, total):
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        await collection.find_one({"_id": ids[i % len(ids)]})
+        latencies.append(time.perf_counter() - start)
+
+    return await drive(one, concurrency, total, latencies)
+
+
+async def drive(one, concurrency, total, latencies):
+    queue = iter(range(total))
+
+    async def worker():
+        for i in queue:
+            await one(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def main(args):
+    sync_client = MongoClient(settings.MONGO_URI, maxPoolSize=args.pool_size)
+    async_client = AsyncMongoClient(settings.MONGO_URI, maxPoolSize=args.pool_size)
+    sync_coll = sync_client[settings.MONGO_DB_NAME][COLLECTION]
+    async_coll = async_client[settings.MONGO_DB_NAME][COLLECTION]
+
+    sync_coll.drop()
+    ids = sync_coll.insert_many(
+        [{"n": i, "payload": "x" * 200} for i in range(args.docs)]
+    ).inserted_ids
+
+    try:
+        print(f"{'client':<8}{'conc':>6}{'req/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for concurrency in args.concurrency:
+            for name, run in (
+                ("sync", run_sync_client(sync_coll, ids, concurrency, args.requests, args.threads)),
+                ("async", run_async_client(async_coll, ids, concurrency, args.requests)),
+            ):
+                r = await run
+                print(
+                    f"{name:<8}{concurrency:>6}{r['throughput']:>10.0f}"
+                    f"{r['p50_ms']:>8.2f}ms{r['p95_ms']:>7.2f}ms{r['p99_ms']:>7.2f}ms"
+                )
+    finally:
+        sync_coll.drop()
+        sync_client.close()
+        await async_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200, 500])
+    parser.add_argument("--pool-size", type=int, default=settings.MONGO_MAX_POOL_SIZE)
+    # FastAPI/anyio default threadpool size for sync routes
+    parser.add_argument("--threads", type=int, default=40)
+    asyncio.run(main(parser.parse_args()))
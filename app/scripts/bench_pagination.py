@@ -0,0 +1,100 @@
+"""
+Page-N latency of offset (skip/limit) versus keyset cursor pagination on a
+seeded interviews collection, using the same query shape as
+list_interviews.
+
+    python -m app.scripts.bench_pagination --docs 200000 --page 1000
+
+Seeds into a scratch database (<MONGO_DB_NAME>_bench by default) and
+drops it afterwards unless --keep is given.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor, keyset_filter, keyset_sort
+from app.db.mongo import client
+from app.scripts.created_indexes import create_indexes
+
+STATUSES = ["scheduled", "ongoing", "completed", "cancelled"]
+
+
+async def seed(database, docs: int, batch: int = 10_000):
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    for first in range(0, docs, batch):
+        await database.interviews.insert_many([
+            {
+                "title": f"Interview {i}",
+                "interview_type": random.choice(["technical", "hr", "system_design"]),
+                "status": random.choice(STATUSES),
+                "scheduled_at": None,
+                "created_by": "bench@example.com",
+                # coarse timestamps so (created_at, _id) ties actually happen
+                "created_at": start + timedelta(seconds=i // 3),
+            }
+            for i in range(first, min(first + batch, docs))
+        ])
+
+
+async def timed(make_cursor, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await make_cursor().to_list(length=None)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(args):
+    database = client[args.db]
+    if await database.interviews.estimated_document_count() < args.docs:
+        await database.interviews.drop()
+        await seed(database, args.docs)
+    await create_indexes(database)
+
+    query = {"status": args.status} if args.status else {}
+    offset = (args.page - 1) * args.limit
+
+    # cursor a client would hold after walking to page N - 1
+    anchor = await (
+        database.interviews.find(query).sort(keyset_sort(-1)).skip(offset - 1).limit(1)
+    ).to_list(length=1)
+    token = encode_cursor(anchor[0])
+
+    offset_ms = await timed(
+        lambda: database.interviews.find(query)
+        .sort(keyset_sort(-1)).skip(offset).limit(args.limit),
+        args.runs,
+    )
+    cursor_ms = await timed(
+        lambda: database.interviews.find({**query, **keyset_filter(token, -1)})
+        .sort(keyset_sort(-1)).limit(args.limit),
+        args.runs,
+    )
+
+    print(f"{args.docs} interviews, page {args.page} x {args.limit}, status={args.status}")
+    for name, samples in (("offset", offset_ms), ("cursor", cursor_ms)):
+        print(
+            f"{name:<8} median {statistics.median(samples):8.2f}ms"
+            f"  min {min(samples):8.2f}ms  max {max(samples):8.2f}ms"
+        )
+
+    if not args.keep:
+        await client.drop_database(args.db)
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=f"{settings.MONGO_DB_NAME}_bench")
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--status", default=None, choices=STATUSES)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Cost of one rate limit check per backend.
+
+    python -m app.scripts.bench_ratelimit --checks 200000 --keys 10000
+    python -m app.scripts.bench_ratelimit --backends memory redis --redis-url redis://localhost:6379/0
+
+memory times MemoryRateLimiter.check() in a loop over --keys buckets (a
+share of them empty, so the 429 path is timed too). redis runs the Lua
+token bucket against --redis-url, or an in-process fakeredis (needs the
+fakeredis and lupa packages) when none is given; there the number is
+dominated by the round trip, not the script.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from fastapi import HTTPException
+
+from app.core.ratelimit import MemoryRateLimiter, RedisRateLimiter, parse_limit
+
+LIMIT = "60/minute:10"
+
+
+async def timed_checks(limiter, checks: int, keys: int, rng: random.Random) -> list[float]:
+    names = [f"user{rng.randrange(keys)}:interview" for _ in range(checks)]
+    samples = []
+    for key in names:
+        start = time.perf_counter()
+        try:
+            await limiter.check("bench", key)
+        except HTTPException:
+            pass
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(name: str, samples: list[float], limiter):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    stats = limiter.stats()
+    print(
+        f"{name:<8} mean {statistics.fmean(samples) * 1e6:8.2f}us  "
+        f"median {statistics.median(samples) * 1e6:8.2f}us  p99 {p99 * 1e6:8.2f}us  "
+        f"allowed {stats['allowed']}  limited {stats['limited']}  errors {stats['errors']}"
+    )
+
+
+async def main(args):
+    limits = {"bench": parse_limit(LIMIT)}
+    rng = random.Random(args.seed)
+
+    if "memory" in args.backends:
+        limiter = MemoryRateLimiter(limits)
+        summarize("memory", await timed_checks(limiter, args.checks, args.keys, rng), limiter)
+
+    if "redis" in args.backends:
+        if args.redis_url:
+            import redis.asyncio
+
+            client = redis.asyncio.Redis.from_url(args.redis_url)
+        else:
+            import fakeredis
+
+            client = fakeredis.FakeAsyncRedis()
+        limiter = RedisRateLimiter(client, limits, key_prefix="bench-ratelimit:")
+        checks = min(args.checks, args.redis_checks)
+        summarize("redis", await timed_checks(limiter, checks, args.keys, rng), limiter)
+        await limiter.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", choices=["memory", "redis"], default=["memory", "redis"])
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--redis-checks", type=int, default=20_000, help="cap for the redis backend")
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,149 @@
+"""
+Message search latency at scale for both engines, on the same synthetic
+corpus (Zipf-distributed vocabulary, so common terms have long postings).
+
+    python -m app.scripts.bench_search --messages 1000000 --engines memory mongo
+
+memory: builds the in-process BM25 index directly from the generated
+messages and times ranking only (no Mongo needed); hydrating the winners
+is one $in read by _id on top of that.
+mongo: seeds a scratch database (<MONGO_DB_NAME>_bench), builds the text
+index and times $text queries end to end, per interview only (the index
+is prefixed with interview_id). Dropped afterwards unless --keep is given.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import resource
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.search import InvertedIndex
+
+BATCH = 10_000
+
+
+def corpus(messages: int, interviews: int, vocabulary: int, rng: random.Random):
+    """Yield (message _id, interview_id, content) tuples."""
+    words = [f"w{i}" for i in range(vocabulary)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    interview_ids = [str(ObjectId()) for _ in range(interviews)]
+    for _ in range(messages):
+        content = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(5, 40)))
+        yield ObjectId(), rng.choice(interview_ids), content
+
+
+def queries(vocabulary: int, rng: random.Random) -> dict[str, list[str]]:
+    # common terms stress long postings lists, rare ones the happy path
+    return {
+        "common": [f"w{rng.randint(0, 9)}" for _ in range(20)],
+        "mid": [f"w{rng.randint(100, 1000)} w{rng.randint(100, 1000)}" for _ in range(20)],
+        "rare": [f"w{rng.randint(vocabulary // 2, vocabulary - 1)}" for _ in range(20)],
+    }
+
+
+def summarize(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"median {statistics.median(samples):8.2f}ms  p95 {p95:8.2f}ms  max {max(samples):8.2f}ms"
+
+
+def bench_memory(docs: list[tuple], interview_ids: list[str], query_sets: dict, limit: int):
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    index = InvertedIndex()
+    start = time.perf_counter()
+    for n, (message_id, interview_id, content) in enumerate(docs):
+        index.add(message_id, interview_id, content)
+        # as InvertedIndex.load does: only the newest ids are kept for dedupe
+        if n % 10_000 == 0:
+            index.forget_before(message_id)
+    build = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        f"memory  built {len(docs)} messages in {build:.1f}s, {len(index.postings)} terms, "
+        f"~{(rss_after - rss_before) / 1024:.0f} MB peak RSS growth"
+    )
+
+    for scope in ("interview", "global"):
+        for name, qs in query_sets.items():
+            samples = []
+            for q in qs:
+                interview_id = random.choice(interview_ids) if scope == "interview" else None
+                start = time.perf_counter()
+                index.rank(q, interview_id, limit)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"memory  {scope:<10}{name:<8}{summarize(samples)}")
+
+
+async def bench_mongo(args, docs: list[tuple], interview_ids: list[str], query_sets: dict):
+    from app.db.mongo import client
+    from app.scripts.created_indexes import create_indexes
+
+    database = client[args.db]
+    if await database.messages.estimated_document_count() < len(docs):
+        await database.messages.drop()
+        now = datetime.now(timezone.utc)
+        for first in range(0, len(docs), BATCH):
+            await database.messages.insert_many([
+                {
+                    "_id": message_id,
+                    "interview_id": interview_id,
+                    "sender_email": "bench@example.com",
+                    "sender_role": "candidate",
+                    "content": content,
+                    "created_at": now - timedelta(seconds=n),
+                }
+                for n, (message_id, interview_id, content) in enumerate(
+                    docs[first:first + BATCH], first
+                )
+            ], ordered=False)
+    await create_indexes(database)
+
+    score = {"$meta": "textScore"}
+    for name, qs in query_sets.items():
+        samples = []
+        for q in qs:
+            query = {"$text": {"$search": q}, "interview_id": random.choice(interview_ids)}
+            start = time.perf_counter()
+            await (
+                database.messages.find(query, {"score": score})
+                .sort([("score", score)])
+                .limit(args.limit)
+            ).to_list(length=args.limit)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"mongo   {'interview':<10}{name:<8}{summarize(samples)}")
+
+    if not args.keep:
+        await client.drop_database(args.db)
+    await client.close()
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    docs = list(corpus(args.messages, args.interviews, args.vocabulary, rng))
+    interview_ids = sorted({interview_id for _, interview_id, _ in docs})
+    query_sets = queries(args.vocabulary, rng)
+    print(f"{args.messages} messages over {args.interviews} interviews, top {args.limit}")
+
+    if "memory" in args.engines:
+        bench_memory(docs, interview_ids, query_sets, args.limit)
+    if "mongo" in args.engines:
+        await bench_mongo(args, docs, interview_ids, query_sets)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", nargs="+", choices=["memory", "mongo"], default=["memory", "mongo"])
+    parser.add_argument("--db", default=f"{settings.MONGO_DB_NAME}_bench")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--interviews", type=int, default=20_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+"""
+Cold start: how long a fresh worker takes to import the app, build it,
+run the lifespan startup and answer its first request.
+
+    python -m app.scripts.bench_startup --runs 5 --prewarm 0 10
+
+Every run is a new interpreter. The first request is an admin listing of
+/v1/interviews (a Mongo read) with a token minted in the child and
+AUTH_TRUST_TOKEN_CLAIMS on, so no user has to exist; it runs read-only
+against MONGO_URI / MONGO_DB_NAME. `to_first_response` is wall time from
+spawning the interpreter to that response, interpreter start included.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ("import", "create_app", "startup", "first_request", "to_first_response")
+
+
+async def child(spawned_at: float):
+    # nothing from app/ is imported before this point
+    start = time.perf_counter()
+    import app.main
+
+    imported = time.perf_counter()
+    application = app.main.create_app()
+    created = time.perf_counter()
+
+    import httpx
+
+    from app.core.security import create_access_token
+
+    token = create_access_token({"sub": "bench-startup@example.com", "role": "admin"})
+    async with application.router.lifespan_context(application):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get(
+                "/v1/interviews", headers={"Authorization": f"Bearer {token}"}
+            )
+        answered = time.perf_counter()
+        finished_at = time.time()
+
+    print(json.dumps({
+        "import": imported - start,
+        "create_app": created - imported,
+        "startup": started - created,
+        "first_request": answered - started,
+        "to_first_response": finished_at - spawned_at,
+        "status": response.status_code,
+        "startup_phases": application.state.startup,
+    }))
+
+
+def run_once(prewarm: int, warm_cache: bool) -> dict:
+    env = dict(
+        os.environ,
+        AUTH_TRUST_TOKEN_CLAIMS="true",
+        MONGO_PREWARM_CONNECTIONS=str(prewarm),
+        CACHE_WARM_ON_STARTUP=str(warm_cache).lower(),
+    )
+    spawned_at = time.time()
+    output = subprocess.check_output(
+        [sys.executable, "-m", "app.scripts.bench_startup", "--child", str(spawned_at)],
+        env=env,
+        text=True,
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    print(f"{args.runs} runs per configuration, medians in ms")
+    print(f"{'prewarm':<9}{'warm':<6}" + "".join(f"{phase:>19}" for phase in PHASES))
+    for prewarm in args.prewarm:
+        for warm_cache in sorted(set(args.warm_cache)):
+            runs = [run_once(prewarm, warm_cache) for _ in range(args.runs)]
+            statuses = {run["status"] for run in runs}
+            print(
+                f"{prewarm:<9}{'yes' if warm_cache else 'no':<6}"
+                + "".join(
+                    f"{statistics.median(run[phase] for run in runs) * 1000:>19.1f}"
+                    for phase in PHASES
+                )
+                + ("" if statuses == {200} else f"  status {sorted(statuses)}")
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--prewarm", type=int, nargs="+", default=[0],
+                        help="MONGO_PREWARM_CONNECTIONS values to compare")
+    parser.add_argument("--warm-cache", type=int, nargs="+", choices=[0, 1], default=[0],
+                        help="CACHE_WARM_ON_STARTUP off (0) and/or on (1)")
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        import asyncio
+
+        asyncio.run(child(args.child))
+    else:
+        main(args)
@@ -0,0 +1,206 @@
+"""
+End-to-end load test: seed data, drive the real FastAPI app in-process
+over httpx's ASGI transport at a fixed concurrency, and write latency
+percentiles and throughput per scenario to a JSON report.
+
+    python -m app.scripts.bench_suite --backend mongod --interviews 5000 \
+        --concurrency 32 --requests 2000 --out bench.json
+
+--backend mongod seeds a scratch database (<MONGO_DB_NAME>_bench) on
+MONGO_URI and drops it afterwards. --backend mongomock needs the
+mongomock-motor package and no server; participant-scoped scenarios use
+$lookup sub-pipelines mongomock can't run, so they are skipped there.
+
+Reports carry the git commit so runs can be compared across changes.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+import app.db.mongo as mongo
+from app.core.config import settings
+
+
+def use_database(backend: str, name: str):
+    # routers resolve `db` on use, so this may run at any point before the
+    # first request
+    if backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+
+        mongo.use_client(AsyncMongoMockClient(), name)
+    else:
+        mongo.use_client(mongo.get_client(), name)
+    return mongo.db
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_scenarios(seeded: dict, rng: random.Random) -> dict:
+    """name -> (needs $lookup, factory returning (method, url, user email, json body))"""
+    interview_ids = list(seeded["interviews"])
+
+    def member_of(interview_id):
+        return seeded["interviews"][interview_id][0]
+
+    def pick():
+        return rng.choice(interview_ids)
+
+    def as_participant(path: str, method: str = "GET", body=None):
+        # path is formatted with a random interview, sent as one of its participants
+        def make():
+            interview_id = pick()
+            return method, path.format(interview_id), member_of(interview_id), body
+        return make
+
+    admin = seeded["admins"][0]
+    return {
+        "list_interviews": (False, lambda: ("GET", "/v1/interviews?limit=20", admin, None)),
+        "list_interviews_filtered": (False, lambda: (
+            "GET",
+            f"/v1/interviews?limit=20&status={rng.choice(['scheduled', 'ongoing', 'completed'])}",
+            admin,
+            None,
+        )),
+        "list_interviews_deep_offset": (False, lambda: (
+            "GET", "/v1/interviews?limit=20&offset=" + str(rng.randint(0, len(interview_ids))), admin, None,
+        )),
+        "get_interview_admin": (False, lambda: ("GET", f"/v1/interviews/{pick()}", admin, None)),
+        "users_me": (False, lambda: ("GET", "/v1/users/me", admin, None)),
+        "get_interview_participant": (True, as_participant("/v1/interviews/{}")),
+        "list_messages": (True, as_participant("/v1/interviews/{}/messages?limit=50")),
+        "create_message": (True, as_participant(
+            "/v1/interviews/{}/messages", "POST", {"content": "benchmark message"}
+        )),
+    }
+
+
+async def run_scenario(client, make_request, tokens, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            method, url, user, body = make_request()
+            start = time.perf_counter()
+            response = await client.request(
+                method, url, json=body, headers={"Authorization": f"Bearer {tokens[user]}"}
+            )
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def main(args):
+    database = use_database(args.backend, args.db)
+
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.scripts.created_indexes import create_indexes
+    from app.scripts.seed import seed
+
+    rng = random.Random(args.seed)
+    if args.backend == "mongod":
+        await mongo.client.drop_database(args.db)
+        await create_indexes(database)
+    seeded = await seed(
+        database,
+        users=args.users,
+        interviews=args.interviews,
+        participants=args.participants,
+        messages=args.messages,
+        rng=rng,
+    )
+    # mint tokens directly; login has its own benchmark (bench_login)
+    tokens = {
+        email: create_access_token({"sub": email, "role": role})
+        for email, role in seeded["roles"].items()
+    }
+
+    scenarios = build_scenarios(seeded, rng)
+    selected = args.scenarios or list(scenarios)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "backend": args.backend,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "config": {k: v for k, v in vars(args).items() if k != "out"} | {"scenarios": selected},
+        },
+        "scenarios": {},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in selected:
+            needs_lookup, make_request = scenarios[name]
+            if needs_lookup and args.backend == "mongomock":
+                print(f"{name:<30} skipped (mongomock has no $lookup pipelines)")
+                continue
+            # warm-up pass so one-off costs (first connections, imports) don't skew it
+            await run_scenario(client, make_request, tokens, args.concurrency, args.concurrency)
+            result = await run_scenario(client, make_request, tokens, args.concurrency, args.requests)
+            report["scenarios"][name] = result
+            print(
+                f"{name:<30}{result['throughput_rps']:>10.1f} req/s"
+                f"  p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms"
+                f"  p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}"
+            )
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report written to {args.out}")
+
+    if args.backend == "mongod" and not args.keep:
+        await mongo.client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["mongod", "mongomock"], default="mongod")
+    parser.add_argument("--db", default=f"{settings.MONGO_DB_NAME}_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--interviews", type=int, default=2_000)
+    parser.add_argument("--participants", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1_000)
+    parser.add_argument("--scenarios", nargs="*", default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -1,22 +1,12 @@
-from app.db.mongo import db
-
-def create_indexes():
-    db.interviews.create_index(["created_at", -1])
-    db.interviews.create_index(["status", 1])
-    db.interviews.create_index(["interview_type", -1])
-    db.interviews.create_index([("status", -1), ("created_at", -1)])
+import asyncio
 
-    #participants
-    db.participants.create_index(
-        [("interview_id", 1), ("user_email", 1)],
-        unique = True
-    )
+from app.db.mongo import db
+from app.db.indexes import ensure_indexes
 
-    #messages
-    db.messages.create_index(
-        [("interview_id", 1), ("created_at", 1)]
-    )
+# index definitions live in app/db/indexes.py; kept for existing callers
+async def create_indexes(database=db):
+    return await ensure_indexes(database)
 
 if __name__ == "__main__":
-    create_indexes()
+    asyncio.run(create_indexes())
     print("Indexes created successfully")
@@ -0,0 +1,143 @@
+"""
+Seed users, interviews, participants and messages in bulk.
+
+    python -m app.scripts.seed --users 200 --interviews 2000 \
+        --participants 3 --messages 50
+
+Writes into the database configured in app/db/mongo.py. Every seeded
+user has the password "password123".
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.core.security import hash_password
+
+STATUSES = ["scheduled", "ongoing", "completed", "cancelled"]
+INTERVIEW_TYPES = ["technical", "hr", "system_design"]
+PASSWORD = "password123"
+BATCH = 5_000
+
+
+async def _insert(collection, docs: list[dict]):
+    for first in range(0, len(docs), BATCH):
+        await collection.insert_many(docs[first:first + BATCH], ordered=False)
+
+
+async def seed(
+    database,
+    users: int = 100,
+    interviews: int = 1_000,
+    participants: int = 3,
+    messages: int = 20,
+    rng: random.Random | None = None,
+) -> dict:
+    """
+    Seed `database` and return what callers need to drive requests:
+    admin/user emails, their roles and the interview ids with their
+    participants.
+    """
+    rng = rng or random.Random(42)
+    now = datetime.now(timezone.utc)
+    # argon2 is slow on purpose; one hash is shared by every seeded user
+    hashed = hash_password(PASSWORD)
+
+    admins = [f"admin{i}@bench.example.com" for i in range(max(1, users // 50))]
+    members = [f"user{i}@bench.example.com" for i in range(users)]
+    roles = {email: "admin" for email in admins}
+    roles.update({email: rng.choice(["interviewer", "candidate"]) for email in members})
+    await _insert(database.users, [
+        {
+            "email": email,
+            "hashed_password": hashed,
+            "role": role,
+            "created_at": now,
+        }
+        for email, role in roles.items()
+    ])
+
+    interview_docs = [
+        {
+            "title": f"Interview {i}",
+            "interview_type": rng.choice(INTERVIEW_TYPES),
+            "status": rng.choice(STATUSES),
+            "scheduled_at": now + timedelta(hours=rng.randint(-720, 720)),
+            "created_by": admins[0],
+            "created_at": now - timedelta(seconds=interviews - i),
+        }
+        for i in range(interviews)
+    ]
+    await _insert(database.interviews, interview_docs)
+    interview_ids = [str(doc["_id"]) for doc in interview_docs]
+
+    memberships = {}
+    participant_docs = []
+    message_docs = []
+    for interview_id in interview_ids:
+        emails = rng.sample(members, min(participants, len(members)))
+        memberships[interview_id] = emails
+        participant_docs.extend(
+            {
+                "interview_id": interview_id,
+                "user_email": email,
+                "participant_role": "interviewer" if n == 0 else "candidate",
+                "added_at": now,
+            }
+            for n, email in enumerate(emails)
+        )
+        start = now - timedelta(hours=1)
+        message_docs.extend(
+            {
+                "interview_id": interview_id,
+                "sender_email": rng.choice(emails),
+                "sender_role": "candidate",
+                "content": f"message {m} " + "lorem ipsum " * rng.randint(1, 20),
+                "created_at": start + timedelta(seconds=m),
+            }
+            for m in range(messages if emails else 0)
+        )
+        # keep memory flat on large seeds
+        if len(message_docs) >= BATCH:
+            await _insert(database.messages, message_docs)
+            message_docs = []
+
+    await _insert(database.participants, participant_docs)
+    if message_docs:
+        await _insert(database.messages, message_docs)
+
+    return {
+        "admins": admins,
+        "members": members,
+        "roles": roles,
+        "interviews": memberships,
+        "password": PASSWORD,
+    }
+
+
+async def main(args):
+    from app.db.mongo import client, db
+
+    summary = await seed(
+        db,
+        users=args.users,
+        interviews=args.interviews,
+        participants=args.participants,
+        messages=args.messages,
+        rng=random.Random(args.seed),
+    )
+    print(
+        f"seeded {len(summary['admins']) + len(summary['members'])} users, "
+        f"{len(summary['interviews'])} interviews"
+    )
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--interviews", type=int, default=1_000)
+    parser.add_argument("--participants", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
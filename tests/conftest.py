@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+from app.core.config import Settings, use_settings
+
+# routers and core modules read settings; tests never need a .env
+use_settings(Settings(
+    _env_file=None,
+    APP_NAME="interviews-test",
+    ENV="test",
+    MONGO_URI=os.environ.get("TEST_MONGO_URI", "mongodb://localhost:27017"),
+    MONGO_DB_NAME="interviews_test",
+    JWT_SECRET="test-secret",
+))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """An in-memory mongomock database that app.db.mongo.db resolves to."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app.db import mongo
+
+    collection = mongomock_motor.AsyncMongoMockCollection
+    monkeypatch.setattr(collection, "aggregate", _awaited_aggregate(collection.aggregate))
+    monkeypatch.setattr(collection, "bulk_write", _bulk_write)
+    client = mongomock_motor.AsyncMongoMockClient()
+    database = client["interviews_test"]
+    monkeypatch.setattr(mongo, "_client", client)
+    monkeypatch.setattr(mongo, "_db", database)
+    return database
+
+
+@pytest.fixture
+async def mongo_database():
+    """
+    A scratch database with every declared index, on TEST_MONGO_URI
+    (default localhost). Tests using it are skipped without a server.
+    """
+    from pymongo import AsyncMongoClient
+    from pymongo.errors import PyMongoError
+
+    from app.db.indexes import ensure_indexes
+
+    client = AsyncMongoClient(
+        os.environ.get("TEST_MONGO_URI", "mongodb://localhost:27017"),
+        serverSelectionTimeoutMS=1_000,
+    )
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        await client.close()
+        pytest.skip("no MongoDB at TEST_MONGO_URI")
+
+    name = "interviews_test_indexes"
+    await client.drop_database(name)
+    database = client[name]
+    await ensure_indexes(database)
+    try:
+        yield database
+    finally:
+        await client.drop_database(name)
+        await client.close()
+
+
+def _awaited_aggregate(aggregate):
+    """
+    PyMongo's async aggregate() is awaited for its cursor; mongomock's
+    returns the cursor. mongomock also lacks $lookup with a sub-pipeline,
+    resolved here when it trails the pipeline (the only way routers use it).
+    """
+    async def wrapper(self, pipeline, *args, **kwargs):
+        head = list(pipeline)
+        lookups = []
+        while head and "pipeline" in head[-1].get("$lookup", {}):
+            lookups.insert(0, head.pop()["$lookup"])
+
+        cursor = aggregate(self, head, *args, **kwargs)
+        if not lookups:
+            return cursor
+        docs = await cursor.to_list()
+        for lookup in lookups:
+            # uncorrelated (no `let`): the same rows join every document
+            joined = await (
+                await wrapper(self.database[lookup["from"]], lookup["pipeline"])
+            ).to_list()
+            for doc in docs:
+                doc[lookup["as"]] = list(joined)
+        return _Cursor(docs)
+
+    return wrapper
+
+
+async def _bulk_write(self, requests, ordered=True):
+    # mongomock's bulk_write predates the `sort` option PyMongo's
+    # UpdateOne passes on; apply the updates one by one instead
+    for request in requests:
+        await self.update_one(request._filter, request._doc, upsert=bool(request._upsert))
+
+
+class _Cursor:
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        return self.docs[:length]
@@ -0,0 +1,145 @@
+import zlib
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.core import archive
+from app.core.archive import (
+    MessageArchiver,
+    _merge,
+    bucket_terms,
+    compress,
+    decompress,
+    iter_messages,
+    unpack,
+)
+from app.core.search import InvertedIndex, text_score
+
+pytestmark = pytest.mark.anyio
+
+# naive, as documents come back from Mongo and BSON
+START = datetime(2026, 1, 1)
+
+
+def message(minute: int, content: str = "hello", interview_id: str = "i1") -> dict:
+    return {
+        "_id": ObjectId(),
+        "interview_id": interview_id,
+        "sender_email": "a@example.com",
+        "sender_role": "candidate",
+        "content": content,
+        "created_at": START + timedelta(minutes=minute),
+    }
+
+
+async def stream(docs):
+    for doc in docs:
+        yield doc
+
+
+async def finished_interview(database, contents: list[str]) -> str:
+    result = await database.interviews.insert_one({"status": "completed"})
+    interview_id = str(result.inserted_id)
+    await database.messages.insert_many([
+        message(minute, content, interview_id) for minute, content in enumerate(contents)
+    ])
+    return interview_id
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_compress_round_trip(codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    data = b"the same words again " * 100
+    packed = compress(data, codec)
+    assert len(packed) < len(data)
+    assert decompress(packed, codec) == data
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        compress(b"", "lz4")
+
+
+def test_unpack_restores_interview_id():
+    import bson
+
+    messages = [message(0), message(1)]
+    packed = [{k: v for k, v in m.items() if k != "interview_id"} for m in messages]
+    bucket = {
+        "interview_id": "i1",
+        "codec": "zlib",
+        "data": zlib.compress(bson.encode({"m": packed})),
+    }
+    assert unpack(bucket) == messages
+
+
+async def test_merge_interleaves_in_key_order():
+    docs = [message(minute) for minute in range(6)]
+    merged = [doc async for doc in _merge(stream(docs[::2]), stream(docs[1::2]))]
+    assert merged == docs
+
+
+async def test_merge_yields_a_message_in_both_streams_once():
+    docs = [message(minute) for minute in range(4)]
+    merged = [doc async for doc in _merge(stream(docs[:3]), stream(docs[2:]))]
+    assert [doc["_id"] for doc in merged] == [doc["_id"] for doc in docs]
+
+
+def test_bucket_terms_are_distinct_words():
+    messages = [message(0, "The design review"), message(1, "design again, a v2")]
+    assert bucket_terms(messages) == "again design review v2"
+
+
+def test_text_score_follows_mongo():
+    terms = {"design"}
+    assert text_score("lunch plans", terms) == 0
+    # one occurrence in one word: (1) * (0.5 * 1 / 1 + 0.5)
+    assert text_score("design", terms) == 1.0
+    # repeats add half the previous occurrence
+    assert text_score("design design", terms) == 1.5
+    assert text_score("design review", terms) > text_score("design review with other notes", terms)
+
+
+async def test_archived_messages_are_listed_and_searchable(database):
+    interview_id = await finished_interview(
+        database, [f"design note {n}" if n % 2 else f"lunch {n}" for n in range(7)]
+    )
+    archiver = MessageArchiver(bucket_messages=3)
+
+    assert await archiver.archive(database, interview_id) == 7
+    assert await database.messages.count_documents({}) == 0
+    buckets = await database.message_buckets.find({}).sort("seq", 1).to_list(None)
+    assert [bucket["count"] for bucket in buckets] == [3, 3, 1]
+    assert "design" in buckets[0]["terms"].split()
+
+    listed = [doc["content"] async for doc in iter_messages(database, interview_id)]
+    assert listed == [f"design note {n}" if n % 2 else f"lunch {n}" for n in range(7)]
+
+    index = InvertedIndex(refresh_seconds=0)
+    assert await index.load(database) == 7
+    hits = await index.search("design", interview_id)
+    assert sorted(hit["content"] for hit in hits) == ["design note 1", "design note 3", "design note 5"]
+
+
+async def test_messages_archived_after_indexing_are_read_from_buckets(database):
+    interview_id = await finished_interview(database, ["design review", "lunch"])
+    index = InvertedIndex(refresh_seconds=0)
+    await index.load(database)
+
+    await MessageArchiver().archive(database, interview_id)
+
+    hits = await index.search("design")
+    assert [hit["content"] for hit in hits] == ["design review"]
+    assert hits[0]["interview_id"] == interview_id
+
+
+async def test_add_terms_backfills_older_buckets(database):
+    interview_id = await finished_interview(database, ["design review"])
+    await MessageArchiver().archive(database, interview_id)
+    await database.message_buckets.update_many({}, {"$unset": {"terms": ""}})
+
+    assert await archive.archiver.add_terms(database) == 1
+    bucket = await database.message_buckets.find_one({})
+    assert bucket["terms"] == "design review"
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core import auth_dependencies
+from app.core.auth_dependencies import (
+    authenticate_token,
+    invalidate_principal,
+    principal_cache_key,
+)
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+from app.core.security import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = LRUCache()
+    monkeypatch.setattr(auth_dependencies, "cache", cache)
+    return cache
+
+
+@pytest.fixture
+async def user(database):
+    await database.users.insert_one({
+        "email": "a@example.com",
+        "hashed_password": "argon2-hash",
+        "role": "candidate",
+    })
+    return "a@example.com"
+
+
+async def test_principal_is_cached_without_the_password_hash(database, cache, user):
+    principal = await authenticate_token(create_access_token({"sub": user}))
+    assert principal == {"email": user, "role": "candidate"}
+    assert await cache.get(principal_cache_key(user)) == principal
+
+    # served from the cache: the users row is no longer read
+    await database.users.update_one({"email": user}, {"$set": {"role": "admin"}})
+    assert (await authenticate_token(create_access_token({"sub": user})))["role"] == "candidate"
+
+
+async def test_invalidate_principal_rereads_the_user(database, cache, user):
+    token = create_access_token({"sub": user})
+    await authenticate_token(token)
+
+    await database.users.update_one({"email": user}, {"$set": {"role": "admin"}})
+    await invalidate_principal(user)
+    assert (await authenticate_token(token))["role"] == "admin"
+
+    await database.users.delete_one({"email": user})
+    await invalidate_principal(user)
+    with pytest.raises(HTTPException) as exc:
+        await authenticate_token(token)
+    assert exc.value.status_code == 401
+
+
+async def test_principal_expires_after_its_ttl(monkeypatch, database, cache, user):
+    monkeypatch.setattr(get_settings(), "AUTH_PRINCIPAL_TTL_SECONDS", 0)
+    token = create_access_token({"sub": user})
+    await authenticate_token(token)
+
+    await database.users.update_one({"email": user}, {"$set": {"role": "admin"}})
+    assert (await authenticate_token(token))["role"] == "admin"
+
+
+async def test_trusted_claims_skip_the_users_lookup(monkeypatch, database, cache):
+    monkeypatch.setattr(get_settings(), "AUTH_TRUST_TOKEN_CLAIMS", True)
+    token = create_access_token({"sub": "b@example.com", "role": "admin"})
+
+    # no users row at all
+    assert await authenticate_token(token) == {"email": "b@example.com", "role": "admin"}
+    assert await cache.get(principal_cache_key("b@example.com")) is None
+
+
+async def test_claims_are_ignored_unless_trusted(database, cache, user):
+    token = create_access_token({"sub": user, "role": "admin"})
+    assert (await authenticate_token(token))["role"] == "candidate"
+
+
+async def test_trusted_token_without_a_role_reads_the_user(monkeypatch, database, cache, user):
+    monkeypatch.setattr(get_settings(), "AUTH_TRUST_TOKEN_CLAIMS", True)
+    assert (await authenticate_token(create_access_token({"sub": user})))["role"] == "candidate"
+
+
+async def test_bad_tokens_are_rejected(database, cache):
+    for token in ("not-a-jwt", create_access_token({"role": "admin"})):
+        with pytest.raises(HTTPException) as exc:
+            await authenticate_token(token)
+        assert exc.value.status_code == 401
@@ -0,0 +1,86 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.core import authorization
+from app.core.authorization import (
+    access_cache_key,
+    has_cached_access,
+    resolve_interview_access,
+)
+from app.core.cache import LRUCache
+
+pytestmark = pytest.mark.anyio
+
+ADMIN = {"email": "admin@example.com", "role": "admin"}
+CANDIDATE = {"email": "a@example.com", "role": "candidate"}
+OUTSIDER = {"email": "b@example.com", "role": "candidate"}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = LRUCache()
+    monkeypatch.setattr(authorization, "cache", cache)
+    return cache
+
+
+@pytest.fixture
+async def interview_id(database):
+    result = await database.interviews.insert_one({"title": "Backend", "status": "scheduled"})
+    interview_id = str(result.inserted_id)
+    await database.participants.insert_one({
+        "interview_id": interview_id,
+        "user_email": CANDIDATE["email"],
+    })
+    return interview_id
+
+
+def assert_error(exc: pytest.ExceptionInfo, status_code: int, code: str):
+    assert exc.value.status_code == status_code
+    assert exc.value.detail["error"]["code"] == code
+
+
+async def test_admin_sees_any_interview(cache, interview_id):
+    interview = await resolve_interview_access(interview_id, ADMIN, {"title": 1})
+    assert interview == {"_id": ObjectId(interview_id), "title": "Backend"}
+    # admins are never cached per interview
+    assert await cache.get(access_cache_key(interview_id, ADMIN["email"])) is None
+
+
+async def test_participant_access_is_cached(cache, interview_id):
+    assert not await has_cached_access(interview_id, CANDIDATE)
+
+    interview = await resolve_interview_access(interview_id, CANDIDATE, {"title": 1})
+    assert interview == {"_id": ObjectId(interview_id), "title": "Backend"}
+    assert await has_cached_access(interview_id, CANDIDATE)
+
+
+async def test_non_participant_gets_404(cache, interview_id):
+    with pytest.raises(HTTPException) as exc:
+        await resolve_interview_access(interview_id, OUTSIDER)
+    assert_error(exc, 404, "INTERVIEW_NOT_FOUND")
+    assert not await has_cached_access(interview_id, OUTSIDER)
+
+
+async def test_unknown_interview_gets_404(cache, database):
+    for user in (ADMIN, CANDIDATE):
+        with pytest.raises(HTTPException) as exc:
+            await resolve_interview_access(str(ObjectId()), user)
+        assert_error(exc, 404, "INTERVIEW_NOT_FOUND")
+
+
+async def test_invalid_id_gets_400(cache, database):
+    with pytest.raises(HTTPException) as exc:
+        await resolve_interview_access("not-an-id", CANDIDATE)
+    assert_error(exc, 400, "INTERVIEW_INVALID_ID")
+
+
+async def test_cached_access_key(cache):
+    interview_id = str(ObjectId())
+    assert await has_cached_access(interview_id, ADMIN)
+    assert not await has_cached_access(interview_id, CANDIDATE)
+
+    await cache.set(access_cache_key(interview_id, CANDIDATE["email"]), True)
+    assert await has_cached_access(interview_id, CANDIDATE)
+    # the grant is per user
+    assert not await has_cached_access(interview_id, OUTSIDER)
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.api.v1 import messages
+from app.core.broker import MessageBroker, RedisBrokerBackend
+
+pytestmark = pytest.mark.anyio
+
+
+async def eventually(check, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not check():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+class FlakyClient:
+    """A fakeredis client whose first `drops` subscriptions fail mid-listen."""
+
+    def __init__(self, client, drops: int = 1):
+        self.client = client
+        self.drops = drops
+        self.pubsubs = []
+        self.closed = False
+
+    def pubsub(self, **kwargs):
+        pubsub = self.client.pubsub(**kwargs)
+        if self.drops:
+            self.drops -= 1
+
+            async def listen():
+                raise ConnectionError("connection reset")
+                yield
+
+            pubsub.listen = listen
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    async def publish(self, channel, data):
+        await self.client.publish(channel, data)
+
+    async def aclose(self):
+        self.closed = True
+        await self.client.aclose()
+
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis()
+
+
+async def test_redis_backend_relays_between_brokers(redis_client):
+    first = MessageBroker(RedisBrokerBackend(redis_client))
+    second = MessageBroker(RedisBrokerBackend(redis_client))
+    subscription = second.subscribe("i1")
+    first.subscribe("other")
+    await asyncio.sleep(0.05)  # second's psubscribe is in place
+
+    await first.publish("i1", {"content": "hi"})
+    assert await asyncio.wait_for(subscription.get(), 2) == {"content": "hi"}
+    await first.close()
+    await second.close()
+
+
+async def test_listener_resubscribes_after_a_dropped_connection(redis_client):
+    client = FlakyClient(redis_client)
+    broker = MessageBroker(RedisBrokerBackend(client, reconnect_seconds=0))
+    subscription = broker.subscribe("i1")
+
+    await eventually(lambda: len(client.pubsubs) == 2)
+    await asyncio.sleep(0.05)
+    await broker.publish("i1", {"content": "after"})
+    assert await asyncio.wait_for(subscription.get(), 2) == {"content": "after"}
+    await broker.close()
+
+
+async def test_close_stops_the_listener_and_closes_the_client(redis_client):
+    client = FlakyClient(redis_client, drops=0)
+    backend = RedisBrokerBackend(client)
+    broker = MessageBroker(backend)
+    broker.subscribe("i1")
+    await asyncio.sleep(0.05)
+
+    await broker.close()
+    assert backend._task is None
+    assert client.closed
+    assert client.pubsubs[0].connection is None  # pubsub released its connection
+
+
+async def test_failed_publish_does_not_fail_the_write(monkeypatch, caplog):
+    class Unreachable:
+        def start(self, broker):
+            pass
+
+        async def publish(self, interview_id, message):
+            raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(messages, "broker", MessageBroker(Unreachable()))
+    await messages._publish({
+        "interview_id": "i1",
+        "sender_email": "a@example.com",
+        "sender_role": "candidate",
+        "content": "hi",
+        "created_at": datetime.now(timezone.utc),
+    })
+    assert "live publish failed for interview i1" in caplog.text
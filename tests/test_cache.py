@@ -0,0 +1,177 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from app.core.cache import LRUCache, RedisCache
+
+pytestmark = pytest.mark.anyio
+
+
+async def eventually(check, timeout: float = 1.0):
+    # pub/sub delivery is asynchronous, even in fakeredis
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await check():
+        assert asyncio.get_running_loop().time() < deadline, "condition never met"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+async def make_cache(server):
+    caches = []
+
+    async def make(**kwargs) -> RedisCache:
+        cache = RedisCache(fakeredis.FakeAsyncRedis(server=server), **kwargs)
+        await cache.start()
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        await cache.close()
+
+
+async def test_get_set_round_trip(make_cache):
+    cache = await make_cache()
+    await cache.set("interview:1", {"title": "Backend", "tags": ["a", "b"]})
+
+    assert await cache.get("interview:1") == {"title": "Backend", "tags": ["a", "b"]}
+    assert await cache.get("interview:2") is None
+
+
+async def test_values_survive_a_fresh_local_tier(make_cache):
+    writer = await make_cache()
+    reader = await make_cache()
+    await writer.set("interview:1", b"body")
+
+    assert await reader.local.get("interview:1") is None
+    assert await reader.get("interview:1") == b"body"
+    # read through into the local tier
+    assert await reader.local.get("interview:1") == b"body"
+
+
+async def test_ttl_is_set_on_the_server(make_cache):
+    cache = await make_cache(local_ttl=1)
+    await cache.set("interview:1", "v", ttl=30)
+
+    ttl = await cache.client.ttl("cache:interview:1")
+    assert 0 < ttl <= 30
+    # the local tier never outlives local_ttl
+    assert cache.local.store["interview:1"][1] <= time.time() + 1
+
+
+async def test_expired_keys_are_gone(make_cache, server):
+    cache = await make_cache(local_ttl=0)
+    await cache.set("interview:1", "v", ttl=1)
+    await cache.client.pexpire("cache:interview:1", 1)
+    await asyncio.sleep(0.01)
+
+    assert await cache.get("interview:1") is None
+
+
+async def test_invalidate_namespace_only_drops_its_keys(make_cache):
+    cache = await make_cache()
+    await cache.set("interviews:page1", 1)
+    await cache.set("interviews:page2", 2)
+    await cache.set("interview:1", 3)
+
+    await cache.invalidate_namespace("interviews")
+
+    assert await cache.get("interviews:page1") is None
+    assert await cache.get("interviews:page2") is None
+    assert await cache.get("interview:1") == 3
+    assert not await cache.client.exists("cache:interviews:page1", "cache:tag:interviews")
+
+
+async def test_invalidate_prefix(make_cache):
+    cache = await make_cache()
+    await cache.set("access:i1:a@x.com", True)
+    await cache.set("access:i1:b@x.com", True)
+    await cache.set("access:i2:a@x.com", True)
+
+    await cache.invalidate_prefix("access:i1:")
+
+    assert await cache.get("access:i1:a@x.com") is None
+    assert await cache.get("access:i1:b@x.com") is None
+    assert await cache.get("access:i2:a@x.com") is True
+
+
+async def test_delete_is_published_to_other_workers(make_cache):
+    a = await make_cache()
+    b = await make_cache()
+    await a.set("interview:1", "v")
+    assert await b.get("interview:1") == "v"
+
+    await a.delete("interview:1")
+
+    async def dropped():
+        return await b.local.get("interview:1") is None
+
+    await eventually(dropped)
+    assert await b.get("interview:1") is None
+
+
+async def test_namespace_invalidation_is_published_to_other_workers(make_cache):
+    a = await make_cache()
+    b = await make_cache()
+    await a.set("interviews:page1", 1)
+    assert await b.get("interviews:page1") == 1
+
+    await a.invalidate_namespace("interviews")
+
+    async def dropped():
+        return await b.local.get("interviews:page1") is None
+
+    await eventually(dropped)
+
+
+async def test_listener_restarts_after_close(make_cache):
+    a = await make_cache()
+    b = await make_cache()
+    await b.close()
+    await b.start()
+    await a.set("interview:1", "v")
+    await b.get("interview:1")
+
+    await a.clear()
+
+    async def dropped():
+        return await b.local.get("interview:1") is None
+
+    await eventually(dropped)
+
+
+async def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    await cache.set("interview:1", 1)
+    await cache.set("interview:2", 2)
+    await cache.get("interview:1")
+    await cache.set("interview:3", 3)
+
+    assert await cache.get("interview:2") is None
+    assert await cache.get("interview:1") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_lru_namespace_generation():
+    cache = LRUCache()
+    await cache.set("interviews:page1", 1)
+    await cache.set("interview:1", 2)
+
+    await cache.invalidate_namespace("interviews")
+
+    assert await cache.get("interviews:page1") is None
+    assert await cache.get("interview:1") == 2
+
+
+def test_backends_must_implement_the_interface():
+    from app.core.cache import CacheBackend
+
+    with pytest.raises(TypeError):
+        CacheBackend()
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import LRUCache, NullCache
+
+pytestmark = pytest.mark.anyio
+
+
+class Loader:
+    def __init__(self, delay: float = 0.02):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"v{self.calls}"
+
+
+@pytest.fixture
+def cache():
+    cache = LRUCache()
+    # deterministic: no probabilistic early refresh unless a test asks
+    cache.early_refresh_beta = 0
+    return cache
+
+
+async def test_concurrent_misses_share_one_load(cache):
+    loader = Loader()
+
+    results = await asyncio.gather(*(cache.get_or_load("interview:1", loader) for _ in range(20)))
+
+    assert loader.calls == 1
+    assert set(results) == {"v1"}
+    assert cache.load_stats()["coalesced"] == 19
+    # stored: the next read is a hit
+    assert await cache.get_or_load("interview:1", loader) == "v1"
+    assert loader.calls == 1
+
+
+async def test_stale_entry_is_served_while_one_refresh_runs(cache):
+    loader = Loader()
+    await cache.put("interview:1", "old", ttl=0)
+
+    results = await asyncio.gather(*(cache.get_or_load("interview:1", loader) for _ in range(5)))
+
+    assert results == ["old"] * 5
+    await asyncio.sleep(0.05)
+    assert loader.calls == 1
+    assert await cache.get_or_load("interview:1", loader) == "v1"
+    assert cache.load_stats()["stale_served"] == 5
+
+
+async def test_invalidation_during_a_load_is_not_overwritten(cache):
+    loader = Loader()
+    pending = asyncio.ensure_future(cache.get_or_load("interviews:page1", loader))
+    await asyncio.sleep(0.005)
+
+    await cache.invalidate_namespace("interviews")
+
+    # the waiter still gets its value, but it may predate the write
+    assert await pending == "v1"
+    assert await cache.get("interviews:page1") is None
+
+
+async def test_loader_errors_reach_every_waiter_and_are_not_cached(cache):
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("mongo down")
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("interview:1", boom) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert await cache.get("interview:1") is None
+    assert not cache._flights
+
+
+async def test_a_cancelled_waiter_does_not_cancel_the_load(cache):
+    loader = Loader(delay=0.05)
+    first = asyncio.ensure_future(cache.get_or_load("interview:1", loader))
+    second = asyncio.ensure_future(cache.get_or_load("interview:1", loader))
+    await asyncio.sleep(0.01)
+
+    first.cancel()
+
+    assert await second == "v1"
+    assert loader.calls == 1
+
+
+async def test_early_refresh_before_expiry(cache):
+    loader = Loader()
+    cache.early_refresh_beta = 1.0
+    # a 1s entry whose load took "100s" is always due for early refresh
+    await cache.put("interview:1", "old", ttl=1, load_seconds=100)
+
+    assert await cache.get_or_load("interview:1", loader) == "old"
+    await asyncio.sleep(0.05)
+    assert cache.load_stats()["early_refreshes"] == 1
+    assert await cache.get("interview:1") is not None
+    assert (await cache.get("interview:1"))["value"] == "v1"
+
+
+async def test_null_cache_still_coalesces():
+    cache = NullCache()
+    loader = Loader()
+
+    await asyncio.gather(*(cache.get_or_load("interview:1", loader) for _ in range(5)))
+
+    assert loader.calls == 1
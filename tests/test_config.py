@@ -0,0 +1,38 @@
+from app.core.config import get_settings, singleton, use_settings
+
+
+def test_singletons_are_built_on_first_use():
+    builds = []
+    value = singleton(lambda: builds.append(1) or {"n": len(builds)})
+
+    assert builds == []
+    assert value.get("n") == 1
+    assert value.get("n") == 1
+    assert builds == [1]
+
+
+def test_use_settings_rebuilds_singletons_from_the_new_settings():
+    current = get_settings()
+    name = singleton(lambda: type("Holder", (), {"app": get_settings().APP_NAME})())
+    assert name.app == current.APP_NAME
+
+    try:
+        use_settings(current.model_copy(update={"APP_NAME": "replaced"}))
+        assert name.app == "replaced"
+    finally:
+        use_settings(current)
+    assert name.app == current.APP_NAME
+
+
+def test_attributes_are_set_on_the_built_object():
+    holder = singleton(lambda: type("Holder", (), {})())
+    holder.listen = False
+    assert holder._resolve().listen is False
+
+
+def test_settings_module_objects_are_lazy():
+    from app.core import cache, ratelimit
+
+    assert isinstance(cache.cache, singleton)
+    use_settings(get_settings())
+    assert ratelimit.rate_limiter._value is None
@@ -0,0 +1,25 @@
+import pytest
+
+from app.db.indexes import INDEXES, query_shapes, verify_query_shapes
+
+pytestmark = pytest.mark.anyio
+
+
+def test_shape_names_are_unique():
+    names = [shape["name"] for shape in query_shapes()]
+    assert len(names) == len(set(names))
+
+
+def test_shapes_target_declared_collections():
+    assert {shape["collection"] for shape in query_shapes()} <= set(INDEXES)
+
+
+async def test_every_query_shape_uses_an_index(mongo_database):
+    report = await verify_query_shapes(mongo_database)
+
+    flagged = {
+        row["name"]: " > ".join(row["stages"])
+        for row in report
+        if not row["ok"]
+    }
+    assert not flagged, f"COLLSCAN or in-memory SORT: {flagged}"
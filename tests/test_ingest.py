@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.core.ingest import GroupCommitWriter
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingCollection:
+    """insert_many() that records its batches; fails past `fail_after` docs."""
+
+    def __init__(self, fail_after: int | None = None, delay: float = 0):
+        self.batches: list[list[dict]] = []
+        self.fail_after = fail_after
+        self.delay = delay
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(self.delay)
+        self.batches.append(list(docs))
+        if self.fail_after is not None and len(docs) > self.fail_after:
+            raise BulkWriteError({
+                "nInserted": self.fail_after,
+                "writeErrors": [{"index": self.fail_after, "code": 11000, "errmsg": "dup"}],
+            })
+
+
+async def test_concurrent_writes_share_one_insert():
+    collection = RecordingCollection()
+    writer = GroupCommitWriter(collection, max_batch=100, max_delay_ms=20)
+
+    await asyncio.gather(*(writer.write([{"n": n}]) for n in range(10)))
+
+    assert len(collection.batches) == 1
+    assert sorted(doc["n"] for doc in collection.batches[0]) == list(range(10))
+    assert writer.stats()["flushed_docs"] == 10
+    assert writer.stats()["queue_depth"] == 0
+    await writer.close()
+
+
+async def test_full_batch_flushes_without_waiting_for_the_delay():
+    collection = RecordingCollection()
+    writer = GroupCommitWriter(collection, max_batch=3, max_delay_ms=10_000)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(writer.write([{"n": n}]) for n in range(3))), timeout=1
+    )
+
+    assert [len(batch) for batch in collection.batches] == [3]
+    await writer.close()
+
+
+async def test_batches_are_capped_at_max_batch():
+    collection = RecordingCollection()
+    writer = GroupCommitWriter(collection, max_batch=4, max_delay_ms=5)
+
+    await asyncio.gather(*(writer.write([{"n": n}, {"n": n}]) for n in range(5)))
+
+    # requests are never split across batches
+    assert all(len(batch) <= 4 for batch in collection.batches)
+    assert sum(len(batch) for batch in collection.batches) == 10
+    await writer.close()
+
+
+async def test_only_writers_after_the_failure_see_it():
+    collection = RecordingCollection(fail_after=2)
+    writer = GroupCommitWriter(collection, max_batch=100, max_delay_ms=20)
+
+    results = await asyncio.gather(
+        *(writer.write([{"n": n}]) for n in range(3)), return_exceptions=True
+    )
+
+    # ordered insert: the first two documents were written
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], BulkWriteError)
+    assert writer.stats()["failed_docs"] == 1
+    await writer.close()
+
+
+async def test_other_errors_fail_the_whole_batch():
+    class Down:
+        async def insert_many(self, docs, ordered=True):
+            raise ConnectionError("mongo down")
+
+    writer = GroupCommitWriter(Down(), max_delay_ms=1)
+
+    with pytest.raises(ConnectionError):
+        await writer.write([{"n": 1}])
+    assert writer.stats()["failed_docs"] == 1
+    await writer.close()
+
+
+async def test_close_commits_queued_writes_and_finishes_the_flush():
+    collection = RecordingCollection(delay=0.05)
+    writer = GroupCommitWriter(collection, max_batch=2, max_delay_ms=1000)
+
+    first = asyncio.ensure_future(writer.write([{"n": 0}, {"n": 1}]))
+    await asyncio.sleep(0.01)  # the first batch is being inserted
+    second = asyncio.ensure_future(writer.write([{"n": 2}]))
+    await asyncio.sleep(0)
+
+    # well within the 1s batching delay the second write would get
+    await asyncio.wait_for(writer.close(), 0.5)
+
+    await asyncio.gather(first, second)
+    assert collection.batches == [[{"n": 0}, {"n": 1}], [{"n": 2}]]
+    assert writer.stats()["queue_depth"] == 0
+
+
+async def test_writes_after_close_start_a_new_flusher():
+    collection = RecordingCollection()
+    writer = GroupCommitWriter(collection, max_delay_ms=1)
+    await writer.write([{"n": 0}])
+    await writer.close()
+
+    await writer.write([{"n": 1}])
+    await writer.close()
+
+    assert [doc["n"] for batch in collection.batches for doc in batch] == [0, 1]
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from datetime import datetime
+
+import fakeredis
+import pytest
+
+from app.core.membership import MemoryMembershipIndex, RedisMembershipIndex
+
+pytestmark = pytest.mark.anyio
+
+
+def loader(*ids, calls=None):
+    async def load():
+        if calls is not None:
+            calls.append(1)
+        await asyncio.sleep(0)
+        return list(ids)
+
+    return load
+
+
+async def test_sets_are_loaded_once_and_updated_by_add():
+    index = MemoryMembershipIndex()
+    calls = []
+
+    assert await index.interview_ids("a@x.com", loader("i1", calls=calls)) == {"i1"}
+    await index.add("a@x.com", "i2")
+
+    assert await index.interview_ids("a@x.com", loader("i1", calls=calls)) == {"i1", "i2"}
+    assert len(calls) == 1
+
+
+async def test_expired_sets_are_reloaded():
+    index = MemoryMembershipIndex(ttl=0)
+    calls = []
+
+    await index.interview_ids("a@x.com", loader("i1", calls=calls))
+    await index.interview_ids("a@x.com", loader("i1", calls=calls))
+
+    assert len(calls) == 2
+
+
+async def test_least_recently_read_users_are_evicted():
+    index = MemoryMembershipIndex(max_users=2)
+    await index.interview_ids("a@x.com", loader("i1"))
+    await index.interview_ids("b@x.com", loader("i2"))
+    await index.interview_ids("a@x.com", loader("i1"))
+    await index.interview_ids("c@x.com", loader("i3"))
+
+    assert list(index.sets) == ["a@x.com", "c@x.com"]
+    assert index.evictions == 1
+
+
+async def test_adds_during_a_load_are_kept():
+    index = MemoryMembershipIndex()
+
+    async def slow_load():
+        await index.add("a@x.com", "i2")
+        return ["i1"]
+
+    assert await index.interview_ids("a@x.com", slow_load) == {"i1", "i2"}
+
+
+async def test_redis_sets_are_shared():
+    client = fakeredis.FakeAsyncRedis()
+    first, second = RedisMembershipIndex(client), RedisMembershipIndex(client)
+    calls = []
+
+    await first.interview_ids("a@x.com", loader("i1", calls=calls))
+    await first.add("a@x.com", "i2")
+    await first.add("b@x.com", "i2")
+
+    assert await second.interview_ids("a@x.com", loader("i1", calls=calls)) == {"i1", "i2"}
+    assert len(calls) == 1
+    # b's partial set (no sentinel) is completed by its first read
+    assert await second.interview_ids("b@x.com", loader("i3", calls=calls)) == {"i2", "i3"}
+
+
+async def test_my_interviews_pages_newest_first(monkeypatch, database):
+    from fastapi import HTTPException
+
+    from app.api.v1 import users
+
+    monkeypatch.setattr(users, "membership", MemoryMembershipIndex())
+    user = {"email": "a@x.com", "role": "candidate"}
+    ids = []
+    for n in range(5):
+        result = await database.interviews.insert_one({
+            "title": f"t{n}",
+            "interview_type": "technical",
+            "status": "completed" if n == 2 else "scheduled",
+            "scheduled_at": None,
+            "created_by": "admin@x.com",
+            "created_at": datetime(2026, 1, 1, 12, n),
+        })
+        ids.append(str(result.inserted_id))
+        await database.participants.insert_one({"interview_id": ids[-1], "user_email": user["email"]})
+    # not a member
+    await database.interviews.insert_one({"title": "other", "status": "scheduled"})
+
+    async def page(**params):
+        response = await users.my_interviews(current_user=user, **params)
+        return json.loads(response.body)
+
+    first = await page(limit=2, cursor=None, status=None)
+    assert [item["id"] for item in first["items"]] == [ids[4], ids[3]]
+    second = await page(limit=2, cursor=first["next_cursor"], status=None)
+    assert [item["id"] for item in second["items"]] == [ids[2], ids[1]]
+    last = await page(limit=2, cursor=second["next_cursor"], status=None)
+    assert [item["id"] for item in last["items"]] == [ids[0]]
+    assert last["next_cursor"] is None
+
+    scheduled = await page(limit=10, cursor=None, status="scheduled")
+    assert [item["id"] for item in scheduled["items"]] == [ids[4], ids[3], ids[1], ids[0]]
+
+    with pytest.raises(HTTPException) as exc:
+        await page(limit=2, cursor="bogus", status=None)
+    assert exc.value.status_code == 400
@@ -0,0 +1,97 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.requests import Request
+
+from app.api.v1.messages import _batch_cost, _export_chunks
+from app.core.archive import MessageArchiver
+from app.core.config import get_settings
+
+pytestmark = pytest.mark.anyio
+
+# naive, as documents come back from Mongo
+START = datetime(2026, 1, 1, 12)
+
+
+@pytest.fixture
+async def interview_id(database, monkeypatch):
+    # several chunks for five messages
+    monkeypatch.setattr(get_settings(), "MESSAGE_EXPORT_BATCH_SIZE", 2)
+    result = await database.interviews.insert_one({"status": "completed"})
+    interview_id = str(result.inserted_id)
+    await database.messages.insert_many([
+        {
+            "interview_id": interview_id,
+            "sender_email": "a@example.com",
+            "sender_role": "candidate",
+            "content": f"answer {n} – \"quoted\"",
+            "created_at": START + timedelta(minutes=n),
+        }
+        for n in range(5)
+    ])
+    return interview_id
+
+
+async def export(interview_id: str, compress: bool = False, archived: bool = False) -> bytes:
+    return b"".join([chunk async for chunk in _export_chunks(interview_id, compress, archived)])
+
+
+def assert_transcript(body: bytes, interview_id: str):
+    assert body.endswith(b"\n")
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert lines == [
+        {
+            "interview_id": interview_id,
+            "sender_email": "a@example.com",
+            "sender_role": "candidate",
+            "content": f"answer {n} – \"quoted\"",
+            # UTC with the same "Z" suffix as the JSON routes
+            "created_at": f"2026-01-01T12:0{n}:00Z",
+        }
+        for n in range(5)
+    ]
+
+
+async def test_export_is_ndjson(interview_id):
+    chunks = [chunk async for chunk in _export_chunks(interview_id, False)]
+    # one chunk per batch of MESSAGE_EXPORT_BATCH_SIZE lines
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+    assert_transcript(b"".join(chunks), interview_id)
+
+
+async def test_export_gzip(interview_id):
+    assert_transcript(gzip.decompress(await export(interview_id, compress=True)), interview_id)
+
+
+async def test_export_of_an_archived_interview(database, interview_id):
+    await MessageArchiver(bucket_messages=2).archive(database, interview_id)
+    assert await database.messages.count_documents({}) == 0
+
+    assert_transcript(await export(interview_id, archived=True), interview_id)
+    assert_transcript(
+        gzip.decompress(await export(interview_id, compress=True, archived=True)),
+        interview_id,
+    )
+
+
+async def test_export_of_an_empty_interview(database):
+    assert await export("none") == b""
+    assert gzip.decompress(await export("none", compress=True)) == b""
+
+
+@pytest.mark.parametrize("body, cost", [
+    ({"messages": [{"content": "a"}] * 7}, 7),
+    ({"messages": [{"content": "a"}] * 500}, 100),
+    ({"messages": []}, 1),
+    ({"messages": "not a list"}, 1),
+    ([1, 2, 3], 1),
+])
+async def test_batches_cost_a_token_per_message(monkeypatch, body, cost):
+    monkeypatch.setattr(get_settings(), "MESSAGE_BATCH_MAX_SIZE", 100)
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}
+
+    assert await _batch_cost(Request({"type": "http", "headers": []}, receive)) == cost
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.core.pagination import (
+    decode_cursor,
+    decode_id_cursor,
+    encode_cursor,
+    encode_id_cursor,
+    keyset_filter,
+    keyset_sort,
+    next_cursor,
+)
+
+
+def doc(minute: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "created_at": datetime(2026, 1, 1, 12, minute, tzinfo=timezone.utc),
+        "scheduled_at": datetime(2026, 2, 1, 9, minute, tzinfo=timezone.utc),
+    }
+
+
+def test_cursor_round_trip():
+    item = doc(5)
+    assert decode_cursor(encode_cursor(item)) == (item["created_at"], item["_id"])
+
+
+def test_cursor_is_url_safe():
+    token = encode_cursor(doc(5))
+    assert "=" not in token and "+" not in token and "/" not in token
+
+
+def test_cursor_tagged_with_its_sort_field():
+    item = doc(5)
+    token = encode_cursor(item, "scheduled_at")
+
+    assert decode_cursor(token, "scheduled_at") == (item["scheduled_at"], item["_id"])
+    # a scheduled_at cursor can't be replayed on a created_at listing
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor(item), "scheduled_at")
+
+
+def test_id_cursor_round_trip():
+    obj_id = ObjectId()
+    assert decode_id_cursor(encode_id_cursor(obj_id)) == obj_id
+    # not interchangeable with (field, _id) cursors
+    with pytest.raises(HTTPException):
+        decode_id_cursor(encode_cursor(doc(5)))
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_id_cursor(obj_id))
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "eyJ4IjogMX0", encode_cursor(doc(1))[:-4]])
+def test_invalid_cursor(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token)
+    assert exc.value.detail["error"]["code"] == "PAGINATION_INVALID_CURSOR"
+
+
+def test_keyset_filter_descending():
+    item = doc(5)
+    query = keyset_filter(encode_cursor(item), -1)
+    assert query == {
+        "created_at": {"$lte": item["created_at"]},
+        "$nor": [{"created_at": item["created_at"], "_id": {"$gte": item["_id"]}}],
+    }
+
+
+def test_keyset_filter_ascending_other_field():
+    item = doc(5)
+    query = keyset_filter(encode_cursor(item, "scheduled_at"), 1, "scheduled_at")
+    assert query == {
+        "scheduled_at": {"$gte": item["scheduled_at"]},
+        "$nor": [{"scheduled_at": item["scheduled_at"], "_id": {"$lte": item["_id"]}}],
+    }
+
+
+def test_keyset_sort_ends_with_id():
+    assert keyset_sort(-1) == [("created_at", -1), ("_id", -1)]
+    assert keyset_sort(1, "scheduled_at") == [("scheduled_at", 1), ("_id", 1)]
+
+
+def test_next_cursor_points_at_last_item_of_page():
+    docs = [doc(m) for m in range(4)]
+    # limit + 1 fetched: there is another page after docs[2]
+    assert decode_cursor(next_cursor(docs, 3)) == (docs[2]["created_at"], docs[2]["_id"])
+    assert next_cursor(docs[:3], 3) is None
+
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_pages_cover_every_document_once(direction):
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient().db.items
+    # ties on created_at are broken by _id
+    collection.insert_many([doc(m // 3) for m in range(10)])
+    ordered = list(collection.find({}).sort(keyset_sort(direction)))
+
+    seen, cursor = [], None
+    while True:
+        query = keyset_filter(cursor, direction) if cursor else {}
+        page = list(collection.find(query).sort(keyset_sort(direction)).limit(4))
+        seen.extend(page[:3])
+        cursor = next_cursor(page, 3)
+        if cursor is None:
+            break
+    assert [d["_id"] for d in seen] == [d["_id"] for d in ordered]
@@ -0,0 +1,127 @@
+import pytest
+from fastapi import HTTPException, Response
+from pymongo.errors import BulkWriteError
+
+from app.api.v1 import participants
+from app.core import authorization
+from app.core.authorization import resolve_interview_access
+from app.core.cache import LRUCache
+from app.core.membership import MemoryMembershipIndex
+from app.schemas.participant import ParticipantBulkCreate
+
+pytestmark = pytest.mark.anyio
+
+ADMIN = {"email": "admin@example.com", "role": "admin"}
+EMAILS = ["a@example.com", "b@example.com", "existing@example.com"]
+
+
+@pytest.fixture
+async def membership(monkeypatch):
+    membership = MemoryMembershipIndex()
+    monkeypatch.setattr(participants, "membership", membership)
+    monkeypatch.setattr(authorization, "cache", LRUCache())
+    # loaded sets, so add() has something to update
+    for email in EMAILS:
+        await member_of(membership, email)
+    return membership
+
+
+@pytest.fixture
+async def interview_id(database):
+    await database.participants.create_index(
+        [("interview_id", 1), ("user_email", 1)], unique=True
+    )
+    result = await database.interviews.insert_one({"title": "Backend", "status": "scheduled"})
+    interview_id = str(result.inserted_id)
+    await database.participants.insert_one({
+        "interview_id": interview_id,
+        "user_email": "existing@example.com",
+    })
+    return interview_id
+
+
+def panel(*emails: str) -> ParticipantBulkCreate:
+    return ParticipantBulkCreate(participants=[
+        {"user_email": email, "participant_role": "interviewer"} for email in emails
+    ])
+
+
+async def member_of(membership, email: str) -> set:
+    async def nothing_stored():
+        return []
+    return await membership.interview_ids(email, nothing_stored)
+
+
+async def has_access(interview_id: str, email: str) -> bool:
+    try:
+        await resolve_interview_access(interview_id, {"email": email, "role": "interviewer"})
+    except HTTPException as exc:
+        assert exc.status_code == 404
+        return False
+    return True
+
+
+async def test_duplicates_are_reported_and_the_rest_inserted(database, membership, interview_id):
+    response = Response()
+    result = await participants.add_participants_bulk(
+        interview_id,
+        panel("a@example.com", "existing@example.com", "b@example.com", "a@example.com"),
+        response,
+        current_user=ADMIN,
+    )
+
+    assert response.status_code == 200
+    assert [doc["user_email"] for doc in result["added"]] == ["a@example.com", "b@example.com"]
+    assert sorted(result["duplicates"]) == ["a@example.com", "existing@example.com"]
+    assert result["failed"] == []
+    assert await database.participants.count_documents({"interview_id": interview_id}) == 3
+
+    assert await member_of(membership, "a@example.com") == {interview_id}
+    assert await member_of(membership, "b@example.com") == {interview_id}
+    # the rejected row added nothing
+    assert await member_of(membership, "existing@example.com") == set()
+
+
+async def test_other_write_errors_answer_207_and_skip_the_caches(
+    database, membership, interview_id, monkeypatch
+):
+    collection = type(database.participants)
+    insert_many = collection.insert_many
+
+    async def reject_second(self, docs, ordered=True):
+        # row 1 fails validation server side, row 2 is a duplicate
+        await insert_many(self, [docs[0]], ordered=ordered)
+        raise BulkWriteError({
+            "nInserted": 1,
+            "writeErrors": [
+                {"index": 1, "code": 121, "errmsg": "Document failed validation"},
+                {"index": 2, "code": 11000, "errmsg": "E11000 duplicate key"},
+            ],
+        })
+
+    monkeypatch.setattr(collection, "insert_many", reject_second)
+    response = Response()
+    result = await participants.add_participants_bulk(
+        interview_id,
+        panel("a@example.com", "b@example.com", "existing@example.com"),
+        response,
+        current_user=ADMIN,
+    )
+
+    assert response.status_code == 207
+    assert [doc["user_email"] for doc in result["added"]] == ["a@example.com"]
+    assert result["failed"] == ["b@example.com"]
+    assert result["duplicates"] == ["existing@example.com"]
+
+    assert await member_of(membership, "a@example.com") == {interview_id}
+    assert await member_of(membership, "b@example.com") == set()
+    assert await has_access(interview_id, "a@example.com")
+    assert not await has_access(interview_id, "b@example.com")
+
+
+async def test_unknown_interview_is_404(database, membership):
+    with pytest.raises(HTTPException) as exc:
+        await participants.add_participants_bulk(
+            "65f000000000000000000000", panel("a@example.com"), Response(), current_user=ADMIN
+        )
+    assert exc.value.status_code == 404
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.profiling import ProfilingMiddleware, StackSampler, profile_store
+
+pytestmark = pytest.mark.anyio
+
+
+async def endpoint(scope, receive, send):
+    await asyncio.sleep(0.02)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call(app, headers: list[tuple[bytes, bytes]]):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": headers}
+    await app(scope, None, send)
+    return sent
+
+
+async def stored_after(count: int, timeout: float = 1.0) -> bool:
+    for _ in range(int(timeout / 0.01)):
+        if len(profile_store.profiles) > count:
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def middleware():
+    app = ProfilingMiddleware(endpoint)
+    app.interval = 0.001
+    app.secret = b"s3cret"
+    return app
+
+
+async def test_header_without_the_secret_is_ignored(middleware):
+    before = len(profile_store.profiles)
+    await call(middleware, [(b"x-profile", b"1")])
+    assert not await stored_after(before, timeout=0.1)
+
+
+async def test_header_is_ignored_when_no_secret_is_configured(middleware):
+    middleware.secret = None
+    before = len(profile_store.profiles)
+    await call(middleware, [(b"x-profile", b"s3cret")])
+    assert not await stored_after(before, timeout=0.1)
+
+
+async def test_header_with_the_secret_is_profiled(middleware):
+    before = len(profile_store.profiles)
+    sent = await call(middleware, [(b"x-profile", b"s3cret")])
+
+    assert sent[-1]["body"] == b"ok"
+    assert await stored_after(before)
+    profile = profile_store.profiles[-1]
+    assert profile["trigger"] == "header" and profile["samples"] > 0
+    assert middleware.active == 0
+
+
+async def test_stop_does_not_wait_for_the_sampler_thread():
+    sampler = StackSampler(0.005, asyncio.current_task())
+    sampler.start()
+    await asyncio.sleep(0.05)
+    done = threading.Event()
+
+    def slow_wrap_up(sampler):
+        time.sleep(0.3)
+        done.set()
+
+    start = time.perf_counter()
+    sampler.stop(slow_wrap_up)
+    assert time.perf_counter() - start < 0.1
+    assert await asyncio.to_thread(done.wait, 1)
+    assert sampler.samples >= 1 and sampler.collapsed()
+
+
+def spin(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def profiled_request():
+    spin(0.03)
+    await asyncio.sleep(0.03)
+
+
+async def other_request(stop: asyncio.Event):
+    while not stop.is_set():
+        spin(0.002)
+        await asyncio.sleep(0)
+
+
+async def test_only_the_request_task_is_sampled():
+    stop = asyncio.Event()
+    other = asyncio.create_task(other_request(stop))
+    await asyncio.sleep(0)
+
+    async def request():
+        sampler = StackSampler(0.001, asyncio.current_task())
+        sampler.start()
+        await profiled_request()
+        stopped = threading.Event()
+        sampler.stop(lambda sampler: stopped.set())
+        await asyncio.to_thread(stopped.wait, 1)
+        return sampler
+
+    sampler = await asyncio.create_task(request())
+    stop.set()
+    await other
+
+    stacks = dict(
+        line.rsplit(" ", 1) for line in sampler.collapsed().splitlines()
+    )
+    assert stacks
+    # on the loop: spin() under this request's coroutine
+    assert any(
+        stack.startswith("running;") and "profiled_request" in stack and stack.split(";")[-1].startswith("spin")
+        for stack in stacks
+    )
+    # parked: the await chain down to the sleep
+    assert any(
+        stack.startswith("waiting;") and "profiled_request" in stack and "sleep" in stack
+        for stack in stacks
+    )
+    # the other request shared the loop the whole time but never shows up
+    assert not any("other_request" in stack for stack in stacks)
@@ -0,0 +1,251 @@
+import ipaddress
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import ratelimit
+from app.core.ratelimit import (
+    MemoryRateLimiter,
+    RedisRateLimiter,
+    client_ip,
+    parse_limit,
+    rate_limit,
+)
+
+pytestmark = pytest.mark.anyio
+
+PROXIES = [ipaddress.ip_network("10.0.0.0/8")]
+
+
+def request(
+    peer: str = "203.0.113.7", forwarded: str | None = None, body: bytes = b"", **path_params
+) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({
+        "type": "http",
+        "headers": headers,
+        "client": (peer, 50000),
+        "path_params": path_params,
+    }, receive)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # runs the Lua script
+    return fakeredis.FakeAsyncRedis()
+
+
+def test_parse_limit():
+    assert parse_limit("60/minute") == (1.0, 60.0)
+    assert parse_limit("120/minute:30") == (2.0, 30.0)
+    assert parse_limit("1/second") == (1.0, 1.0)
+    for spec in ("60", "60/fortnight", "x/minute", "0/minute", "5/minute:0"):
+        with pytest.raises(ValueError):
+            parse_limit(spec)
+
+
+async def test_memory_bucket_empties_and_refills(clock):
+    limiter = MemoryRateLimiter()
+    rate, burst = parse_limit("60/minute:3")
+
+    assert [await limiter.hit("k", rate, burst) for _ in range(3)] == [0, 0, 0]
+    assert await limiter.hit("k", rate, burst) == pytest.approx(1.0)
+
+    clock[0] += 2.5
+    assert await limiter.hit("k", rate, burst) == 0
+    assert await limiter.hit("k", rate, burst) == 0
+    assert await limiter.hit("k", rate, burst) == pytest.approx(0.5)
+
+
+async def test_memory_buckets_evict_the_least_recent(clock):
+    limiter = MemoryRateLimiter(max_keys=2)
+    rate, burst = parse_limit("1/minute")
+
+    await limiter.hit("a", rate, burst)
+    await limiter.hit("b", rate, burst)
+    assert await limiter.hit("a", rate, burst) > 0  # refreshes a
+    await limiter.hit("c", rate, burst)  # evicts b
+
+    assert list(limiter.buckets) == ["a", "c"]
+    assert limiter.stats()["keys"] == 2
+    # a forgotten bucket restarts full
+    assert await limiter.hit("b", rate, burst) == 0
+
+
+async def test_costly_requests_take_several_tokens(clock):
+    limiter = MemoryRateLimiter()
+    rate, burst = parse_limit("60/minute:10")
+
+    assert await limiter.hit("k", rate, burst, cost=4) == 0
+    assert await limiter.hit("k", rate, burst, cost=4) == 0
+    # two tokens left: four more are two seconds away, one is there
+    assert await limiter.hit("k", rate, burst, cost=4) == pytest.approx(2.0)
+    assert await limiter.hit("k", rate, burst) == 0
+
+
+async def test_cost_above_the_burst_waits_for_a_full_bucket_then_owes(clock):
+    limiter = MemoryRateLimiter()
+    rate, burst = parse_limit("60/minute:10")
+
+    assert await limiter.hit("k", rate, burst, cost=25) == 0
+    # 15 tokens of debt, then one more to take
+    assert await limiter.hit("k", rate, burst) == pytest.approx(16.0)
+    clock[0] += 16
+    assert await limiter.hit("k", rate, burst) == 0
+    assert await limiter.hit("k", rate, burst, cost=25) == pytest.approx(10.0)
+
+
+async def test_check_raises_429_with_retry_after(clock):
+    limiter = MemoryRateLimiter({"login": parse_limit("2/minute")})
+
+    await limiter.check("login", "203.0.113.7")
+    await limiter.check("login", "203.0.113.7")
+    with pytest.raises(HTTPException) as exc:
+        await limiter.check("login", "203.0.113.7")
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "30"}
+    assert exc.value.detail["error"]["code"] == "RATE_LIMITED"
+    assert limiter.stats() == {"allowed": 2, "limited": 1, "errors": 0, "keys": 1}
+    # other keys and unconfigured routes are unaffected
+    await limiter.check("login", "198.51.100.1")
+    await limiter.check("unlisted", "203.0.113.7")
+
+
+async def test_redis_token_bucket(redis_client):
+    limiter = RedisRateLimiter(redis_client, {"login": parse_limit("60/minute:2")})
+
+    assert await limiter.hit("login:a", 1.0, 2.0) == 0
+    assert await limiter.hit("login:a", 1.0, 2.0) == 0
+    retry_after = await limiter.hit("login:a", 1.0, 2.0)
+    assert 0 < retry_after <= 1.0
+    assert await limiter.hit("login:b", 1.0, 2.0) == 0
+
+    # the state expires once the bucket would be full again
+    assert 0 < await redis_client.pttl("ratelimit:login:a") <= 2000
+
+    with pytest.raises(HTTPException) as exc:
+        await limiter.check("login", "a")
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "1"}
+    await limiter.close()
+
+
+async def test_redis_token_bucket_charges_the_cost(redis_client):
+    limiter = RedisRateLimiter(redis_client)
+
+    assert await limiter.hit("k", 1.0, 5.0, cost=3) == 0
+    assert 0.9 < await limiter.hit("k", 1.0, 5.0, cost=3) <= 1.0
+    assert await limiter.hit("k", 1.0, 5.0, cost=2) == 0
+    # above the burst: a full bucket, then the rest is owed
+    assert await limiter.hit("other", 1.0, 5.0, cost=8) == 0
+    assert 3.9 < await limiter.hit("other", 1.0, 5.0) <= 4.0
+    assert 7000 < await redis_client.pttl("ratelimit:other") <= 8000
+
+
+async def test_redis_buckets_are_shared(redis_client):
+    first = RedisRateLimiter(redis_client)
+    second = RedisRateLimiter(redis_client)
+
+    assert await first.hit("k", 1.0, 1.0) == 0
+    assert await second.hit("k", 1.0, 1.0) > 0
+
+
+async def test_redis_failures_let_requests_through(redis_client):
+    limiter = RedisRateLimiter(redis_client, {"login": parse_limit("1/minute")})
+
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    limiter.script = broken
+    for _ in range(3):
+        await limiter.check("login", "a")
+    assert limiter.stats() == {"allowed": 3, "limited": 0, "errors": 3}
+
+
+def test_client_ip_ignores_forwarded_for_from_untrusted_peers():
+    assert client_ip(request(forwarded="198.51.100.1"), []) == "203.0.113.7"
+    assert client_ip(request(forwarded="198.51.100.1"), PROXIES) == "203.0.113.7"
+
+
+def test_client_ip_behind_trusted_proxies():
+    # the client can prepend anything; the rightmost untrusted hop counts
+    spoofed = request("10.0.0.2", forwarded="1.1.1.1, 198.51.100.1, 10.0.0.1")
+    assert client_ip(spoofed, PROXIES) == "198.51.100.1"
+    assert client_ip(request("10.0.0.2", forwarded="10.0.0.9, 10.0.0.1"), PROXIES) == "10.0.0.9"
+    assert client_ip(request("10.0.0.2"), PROXIES) == "10.0.0.2"
+
+
+def test_interview_scope_needs_user_scope():
+    with pytest.raises(ValueError):
+        rate_limit("list_messages", "interview")
+    with pytest.raises(ValueError):
+        rate_limit("list_messages", "tenant")
+
+
+async def test_rotating_interview_ids_still_hit_the_user_cap(monkeypatch, clock):
+    limiter = MemoryRateLimiter({
+        "list_messages": parse_limit("10/minute"),
+        "list_messages_user": parse_limit("3/minute"),
+    })
+    monkeypatch.setattr(ratelimit, "rate_limiter", limiter)
+    dependency = rate_limit("list_messages", "user", "interview")
+    user = {"email": "a@example.com"}
+
+    for n in range(3):
+        await dependency(request(interview_id=f"id{n}"), current_user=user)
+    with pytest.raises(HTTPException) as exc:
+        await dependency(request(interview_id="id3"), current_user=user)
+    assert exc.value.status_code == 429
+
+    # another user has their own cap
+    await dependency(request(interview_id="id0"), current_user={"email": "b@example.com"})
+
+
+async def test_cost_is_charged_to_every_bucket(monkeypatch, clock):
+    limiter = MemoryRateLimiter({
+        "create_messages": parse_limit("60/minute:20"),
+        "create_messages_user": parse_limit("60/minute:30"),
+    })
+    monkeypatch.setattr(ratelimit, "rate_limiter", limiter)
+
+    async def cost(request):
+        return len(json.loads(await request.body()))
+
+    dependency = rate_limit("create_messages", "user", "interview", cost=cost)
+    user = {"email": "a@example.com"}
+
+    await dependency(request(body=b"[1, 2, 3, 4, 5]", interview_id="i1"), current_user=user)
+    assert limiter.buckets["create_messages:a@example.com:i1"][0] == 15
+    assert limiter.buckets["create_messages_user:a@example.com"][0] == 25
+    with pytest.raises(HTTPException):
+        await dependency(
+            request(body=json.dumps(list(range(16))).encode(), interview_id="i1"),
+            current_user=user,
+        )
+
+
+async def test_ip_scope_uses_the_forwarded_client(monkeypatch, clock):
+    limiter = MemoryRateLimiter({"auth_login": parse_limit("1/minute")}, trusted_proxies=PROXIES)
+    monkeypatch.setattr(ratelimit, "rate_limiter", limiter)
+    dependency = rate_limit("auth_login", "ip")
+
+    await dependency(request("10.0.0.1", forwarded="198.51.100.1"))
+    # a different client behind the same proxy has its own bucket
+    await dependency(request("10.0.0.1", forwarded="198.51.100.2"))
+    with pytest.raises(HTTPException):
+        await dependency(request("10.0.0.1", forwarded="198.51.100.1"))
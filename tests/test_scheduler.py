@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.core import scheduler
+from app.core.scheduler import LifecycleScheduler
+from app.core.stats import read_stats
+
+pytestmark = pytest.mark.anyio
+
+RULES = [("scheduled", "ongoing", timedelta(0))]
+
+
+class RecordingCache:
+    def __init__(self):
+        self.invalidated = []
+
+    async def invalidate_namespace(self, namespace: str):
+        self.invalidated.append(namespace)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = RecordingCache()
+    monkeypatch.setattr(scheduler, "cache", cache)
+    return cache
+
+
+async def interview(database, status: str, minutes_from_now: float) -> str:
+    result = await database.interviews.insert_one({
+        "status": status,
+        "scheduled_at": datetime.now(timezone.utc) + timedelta(minutes=minutes_from_now),
+    })
+    return str(result.inserted_id)
+
+
+async def status_of(database, interview_id: str) -> str:
+    return (await database.interviews.find_one({"_id": ObjectId(interview_id)}))["status"]
+
+
+def test_rules_must_be_allowed_transitions():
+    with pytest.raises(ValueError):
+        LifecycleScheduler([("completed", "scheduled", timedelta(0))])
+
+
+def test_push_is_a_no_op_before_start():
+    lifecycle = LifecycleScheduler(RULES)
+    lifecycle.push(str(ObjectId()), "scheduled", datetime.now(timezone.utc))
+    assert lifecycle.heap == []
+    assert lifecycle.stats() == {"queued": 0, "transitioned": 0}
+
+
+async def test_overdue_interviews_move_to_ongoing(database, cache):
+    overdue = await interview(database, "scheduled", -5)
+    upcoming = await interview(database, "scheduled", 30)
+    lifecycle = LifecycleScheduler(RULES)
+
+    await lifecycle.start(database)
+    try:
+        for _ in range(100):
+            if lifecycle.transitioned:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await lifecycle.close()
+
+    assert await status_of(database, overdue) == "ongoing"
+    assert await status_of(database, upcoming) == "scheduled"
+    # the upcoming one waits in the heap for its time
+    assert lifecycle.stats() == {"queued": 1, "transitioned": 1}
+    assert cache.invalidated == ["interviews", "interview"]
+    assert (await read_stats())["by_status"]["ongoing"] == 1
+
+
+async def test_concurrent_patch_is_not_overwritten(database, cache):
+    lifecycle = LifecycleScheduler(RULES)
+    lifecycle._wake = asyncio.Event()
+    interview_id = await interview(database, "scheduled", -1)
+    await lifecycle.load(database)
+    # cancelled by a PATCH after the entry was queued
+    await database.interviews.update_one(
+        {"_id": ObjectId(interview_id)}, {"$set": {"status": "cancelled"}}
+    )
+
+    entries = lifecycle._pop_due(datetime.now(timezone.utc))
+    assert await lifecycle.apply(database, entries) == 0
+
+    assert await status_of(database, interview_id) == "cancelled"
+    assert cache.invalidated == []
+    assert (await read_stats())["by_status"] == {}
+
+
+async def test_transitions_are_batched_and_chained(database, cache):
+    lifecycle = LifecycleScheduler(
+        RULES + [("ongoing", "completed", timedelta(minutes=60))], batch_size=2
+    )
+    lifecycle._wake = asyncio.Event()
+    ids = [await interview(database, "scheduled", -n) for n in range(1, 4)]
+    await lifecycle.load(database)
+
+    entries = lifecycle._pop_due(datetime.now(timezone.utc))
+    assert len(entries) == 2
+    assert await lifecycle.apply(database, entries) == 2
+    assert await lifecycle.apply(database, lifecycle._pop_due(datetime.now(timezone.utc))) == 1
+
+    assert [await status_of(database, i) for i in ids] == ["ongoing"] * 3
+    # ongoing -> completed an hour after scheduled_at, queued right away
+    assert sorted((entry[1], entry[3]) for entry in lifecycle.heap) == sorted(
+        (i, "completed") for i in ids
+    )
+    # invalidated once per applied batch, not per interview
+    assert cache.invalidated == ["interviews", "interview"] * 2
@@ -0,0 +1,172 @@
+import zlib
+from datetime import datetime
+
+import bson
+import pytest
+from bson import ObjectId
+
+from app.core.search import InvertedIndex, MongoTextSearch, SearchEngine, tokenize
+from app.db import mongo
+
+pytestmark = pytest.mark.anyio
+
+
+def build(messages: list[tuple[str, str]]) -> tuple[InvertedIndex, list[ObjectId]]:
+    index = InvertedIndex(refresh_seconds=0)
+    ids = []
+    for interview_id, content in messages:
+        message_id = ObjectId()
+        index.add(message_id, interview_id, content)
+        ids.append(message_id)
+    return index, ids
+
+
+def ranked_ids(index: InvertedIndex, q: str, interview_id: str | None = None, limit: int = 20):
+    return [index.message_id(doc) for _, doc in index.rank(q, interview_id, limit)]
+
+
+def test_tokenize_drops_stop_words_and_single_characters():
+    assert tokenize("The design of a Cache, v2!") == ["design", "cache", "v2"]
+
+
+def test_term_frequency_ranks_higher():
+    index, ids = build([
+        ("i1", "database design review"),
+        ("i1", "design design design of caches"),
+        ("i1", "lunch plans"),
+    ])
+    assert ranked_ids(index, "design") == [ids[1], ids[0]]
+
+
+def test_rare_terms_weigh_more():
+    index, ids = build([
+        ("i1", "design sharding"),
+        ("i1", "design review"),
+        ("i1", "design notes"),
+        ("i1", "design again"),
+    ])
+    # "sharding" appears once, "design" everywhere
+    assert ranked_ids(index, "design sharding")[0] == ids[0]
+
+
+def test_shorter_documents_win_ties():
+    index, ids = build([
+        ("i1", "caching strategy discussed at great length with many other words"),
+        ("i1", "caching strategy"),
+    ])
+    assert ranked_ids(index, "caching") == [ids[1], ids[0]]
+
+
+def test_scores_are_descending_and_limited():
+    index, _ = build([("i1", f"design {'word ' * n}") for n in range(10)])
+    ranked = index.rank("design", limit=3)
+    assert len(ranked) == 3
+    assert [score for score, _ in ranked] == sorted((score for score, _ in ranked), reverse=True)
+
+
+def test_interview_scope_only_returns_that_interview():
+    index, ids = build([
+        ("i1", "design review"),
+        ("i2", "design design design"),
+        ("i1", "unrelated"),
+    ])
+    assert ranked_ids(index, "design", "i1") == [ids[0]]
+    assert ranked_ids(index, "design", "i3") == []
+    # the same score it would get in an unscoped search
+    assert index.rank("design", "i1")[0] in index.rank("design")
+
+
+def test_unknown_terms_and_empty_index():
+    index, _ = build([("i1", "design review")])
+    assert index.rank("kubernetes") == []
+    assert InvertedIndex().rank("design") == []
+
+
+def test_messages_are_indexed_once():
+    index, ids = build([("i1", "design review")])
+    index.add(ids[0], "i1", "design review")
+    assert len(index) == 1
+
+
+def test_engines_must_implement_search():
+    with pytest.raises(TypeError):
+        SearchEngine()
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    """find() returns its documents whatever the query ($text included)."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return FakeCursor(list(self.docs))
+
+
+def packed(content: str) -> dict:
+    return {"_id": ObjectId(), "sender_email": "a@example.com", "sender_role": "candidate",
+            "content": content, "created_at": datetime(2026, 1, 1)}
+
+
+async def test_mongo_engine_ranks_archived_messages_with_live_ones(monkeypatch):
+    archived = [packed("design design review"), packed("lunch plans"), packed("design")]
+    live = {"_id": ObjectId(), "interview_id": "i1", "content": "design notes", "score": 0.75}
+    database = type("Database", (), {})()
+    database.messages = FakeCollection([live])
+    database.message_buckets = FakeCollection([{
+        "interview_id": "i1",
+        "codec": "zlib",
+        # a message caught mid-archive is in its bucket and in messages
+        "data": zlib.compress(bson.encode({"m": archived + [{**packed("design notes"), "_id": live["_id"]}]})),
+    }])
+    monkeypatch.setattr(mongo, "_db", database)
+
+    hits = await MongoTextSearch().search("design", "i1", limit=10)
+
+    assert [hit["content"] for hit in hits] == ["design design review", "design", "design notes"]
+    assert all(hit["interview_id"] == "i1" for hit in hits)
+    assert database.message_buckets.queries == [{"$text": {"$search": "design"}, "interview_id": "i1"}]
+
+
+async def test_mongo_engine_searches_across_interviews(monkeypatch):
+    live = [
+        {"_id": ObjectId(), "interview_id": "i1", "content": "design notes", "score": 0.75},
+        {"_id": ObjectId(), "interview_id": "i2", "content": "design", "score": 1.1},
+    ]
+    database = type("Database", (), {})()
+    database.messages = FakeCollection(live)
+    database.message_buckets = FakeCollection([{
+        "interview_id": "i3",
+        "codec": "zlib",
+        "data": zlib.compress(bson.encode({"m": [packed("design design review")]})),
+    }])
+    monkeypatch.setattr(mongo, "_db", database)
+
+    hits = await MongoTextSearch().search("design", limit=10)
+
+    assert [(hit["interview_id"], hit["content"]) for hit in hits] == [
+        ("i3", "design design review"), ("i2", "design"), ("i1", "design notes"),
+    ]
+    assert database.messages.queries == [{"$text": {"$search": "design"}}]
+    assert database.message_buckets.queries == [{"$text": {"$search": "design"}}]
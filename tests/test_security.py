@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import HashingPool
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def pool():
+    pool = HashingPool(workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+async def test_runs_off_the_event_loop(pool):
+    loop_thread = threading.get_ident()
+    assert await pool.run(threading.get_ident) != loop_thread
+
+
+async def test_sheds_load_past_capacity(pool):
+    release = threading.Event()
+    # one job running, one queued: the pool is at capacity
+    busy = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert pool.stats()["in_flight"] == 2
+
+    with pytest.raises(HTTPException) as exc:
+        await pool.run(release.wait, 5)
+    assert exc.value.status_code == 429
+    assert exc.value.detail["error"]["code"] == "AUTH_BUSY"
+    assert exc.value.headers["Retry-After"]
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    assert await asyncio.gather(*busy) == [True, True]
+    assert pool.stats()["in_flight"] == 0
+    # capacity is back once the jobs are done
+    assert await pool.run(lambda: "ok") == "ok"
+
+
+async def test_failed_jobs_release_their_slot(pool):
+    def boom():
+        raise ValueError("bad hash")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await pool.run(boom)
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_unknown_executor_kind():
+    with pytest.raises(ValueError):
+        HashingPool(workers=1, max_queue=1, kind="fiber")
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.core.config import get_settings
+from app.core.ingest import GroupCommitWriter, insert_messages
+from app.core.stats import (
+    read_stats,
+    reconcile,
+    record_interview_created,
+    record_messages,
+    record_status_change,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_counters_follow_writes(database):
+    await record_interview_created({"status": "scheduled", "interview_type": "tech"})
+    await record_interview_created({"status": "scheduled", "interview_type": "hr"})
+    await record_status_change("scheduled", "ongoing")
+    await record_messages([
+        {"interview_id": "i1"}, {"interview_id": "i1"}, {"interview_id": "i2"},
+    ])
+
+    stats = await read_stats()
+    assert stats["interviews"] == 2
+    assert stats["messages"] == 3
+    assert stats["by_status"] == {"scheduled": 1, "ongoing": 1}
+    assert stats["by_type"] == {"tech": 1, "hr": 1}
+    assert stats["top_interviews"] == [
+        {"interview_id": "i1", "messages": 2},
+        {"interview_id": "i2", "messages": 1},
+    ]
+
+
+async def test_failed_counter_update_is_logged_not_raised(database, monkeypatch, caplog):
+    async def unavailable(*args, **kwargs):
+        raise RuntimeError("primary stepped down")
+
+    monkeypatch.setattr(type(database.interview_counters), "bulk_write", unavailable)
+
+    with caplog.at_level(logging.ERROR, logger="app.core.stats"):
+        await record_interview_created({"status": "scheduled", "interview_type": "tech"})
+        await record_messages([{"interview_id": "i1"}])
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "counter update on interview_counters failed",
+        "counter update on message_counters failed",
+        "counter update on interview_counters failed",
+    ]
+
+
+async def test_direct_insert_counts_messages(database, monkeypatch):
+    monkeypatch.setattr(get_settings(), "MESSAGE_INGEST_MODE", "direct")
+
+    await insert_messages([{"interview_id": "i1", "content": "a"}])
+    await insert_messages([{"interview_id": "i1", "content": "b"}, {"interview_id": "i2", "content": "c"}])
+
+    stats = await read_stats()
+    assert stats["messages"] == 3
+    assert {row["interview_id"]: row["messages"] for row in stats["top_interviews"]} == {
+        "i1": 2, "i2": 1,
+    }
+
+
+async def test_group_commit_counts_each_batch_once(database):
+    calls = []
+
+    async def on_commit(docs):
+        calls.append([doc["n"] for doc in docs])
+        await record_messages(docs)
+
+    writer = GroupCommitWriter(database.messages, max_batch=100, max_delay_ms=20, on_commit=on_commit)
+    await asyncio.gather(*(writer.write([{"interview_id": "i1", "n": n}]) for n in range(5)))
+    await writer.close()
+
+    assert len(calls) == 1 and sorted(calls[0]) == list(range(5))
+    assert (await read_stats())["messages"] == 5
+
+
+async def test_reconcile_rebuilds_counters_from_the_collections(database):
+    await database.interviews.insert_many([
+        {"status": "completed", "interview_type": "tech"},
+        {"status": "ongoing", "interview_type": "tech"},
+        {"status": "ongoing", "interview_type": "hr"},
+    ])
+    await database.messages.insert_many([
+        {"interview_id": "i1"}, {"interview_id": "i1"}, {"interview_id": "i2"},
+    ])
+    await database.message_buckets.insert_one({"interview_id": "i1", "count": 4})
+    # drifted and stale counters from missed or duplicated increments
+    await database.interview_counters.insert_many([
+        {"_id": "total", "count": 99},
+        {"_id": "status:scheduled", "count": 5, "run": "earlier"},
+    ])
+    await database.message_counters.insert_one({"_id": "gone", "count": 3, "run": "earlier"})
+
+    counts = await reconcile(database)
+
+    assert counts["total"] == 3
+    assert counts["messages"] == 7
+    stats = await read_stats()
+    assert stats["interviews"] == 3
+    assert stats["messages"] == 7
+    assert stats["by_status"] == {"completed": 1, "ongoing": 2}
+    assert stats["by_type"] == {"tech": 2, "hr": 1}
+    assert stats["top_interviews"] == [
+        {"interview_id": "i1", "messages": 6},
+        {"interview_id": "i2", "messages": 1},
+    ]
+    assert stats["reconciled_at"] is not None